@@ -6,7 +6,7 @@
     "summary": """
         Develop your own high level REST APIs for Odoo thanks to this addon.
         """,
-    "version": "16.0.1.0.2",
+    "version": "16.0.1.1.0",
     "development_status": "Beta",
     "license": "LGPL-3",
     "author": "ACSONE SA/NV, " "Odoo Community Association (OCA)",
@@ -14,6 +14,8 @@
     "website": "https://github.com/OCA/rest-framework",
     "depends": ["component", "web"],
     "data": [
+        "data/ir_cron_data.xml",
+        "security/ir.model.access.csv",
         "views/openapi_template.xml",
         "views/base_rest_view.xml",
     ],
@@ -45,6 +45,8 @@ class RestMethodParamPlugin(BasePlugin):
         parameters = params.get("parameters", [])
         # add default paramters provided by the sevice
         parameters.extend(self._default_parameters)
+        if method == "get" and routing.get("sparse_fields"):
+            parameters.append(self._get_sparse_fields_parameter())
         input_param = routing.get("input_param")
         if input_param and isinstance(input_param, RestMethodParam):
             if method == "get":
@@ -58,11 +60,24 @@ class RestMethodParamPlugin(BasePlugin):
                 request_body.update(
                     input_param.to_openapi_requestbody(self._service, self.spec)
                 )
+                if routing.get("input_stream"):
+                    self._add_ndjson_request_body(request_body)
                 params["requestBody"] = request_body
             # sort paramters to ease comparison into unittests
             parameters.sort(key=lambda a: a["name"])
         return parameters
 
+    def _get_sparse_fields_parameter(self):
+        return {
+            "name": "fields",
+            "in": "query",
+            "required": False,
+            "description": "Comma separated list of the fields to return. "
+            "The fields of the nested objects are given by their dotted path "
+            "(ex: name,country.code)",
+            "schema": {"type": "string"},
+        }
+
     def _generate_responses(self, routing, method, params):
         responses = params.get("responses", {})
         # add default responses provided by the service
@@ -75,4 +90,25 @@ class RestMethodParamPlugin(BasePlugin):
             responses.update(
                 output_param.to_openapi_responses(self._service, self.spec)
             )
+            if routing.get("output_stream"):
+                self._add_ndjson_response(responses)
         return responses
+
+    def _add_ndjson_request_body(self, request_body):
+        """Streamed requests are read as NDJSON (one item by line)"""
+        content = request_body.get("content", {})
+        json_content = content.pop("application/json", None)
+        if not json_content:
+            return
+        schema = json_content["schema"]
+        content["application/x-ndjson"] = {"schema": schema.get("items", schema)}
+
+    def _add_ndjson_response(self, responses):
+        """Streamed responses can also be rendered as NDJSON (one item by
+        line)"""
+        content = responses.get("200", {}).get("content", {})
+        json_content = content.get("application/json")
+        if not json_content:
+            return
+        schema = json_content["schema"]
+        content["application/x-ndjson"] = {"schema": schema.get("items", schema)}
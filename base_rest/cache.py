@@ -0,0 +1,356 @@
+# Copyright 2026 ACSONE SA/NV
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+"""Server-side cache of the responses of the restapi methods declared with
+a ``cache`` option (see ``restapi.method``).
+
+The backend used to store the responses is given by the ``base_rest``
+section of the odoo config file:
+
+.. code-block:: ini
+
+    [base_rest]
+    response_cache_backend = sqlite
+    response_cache_path = /var/cache/odoo/rest_responses.sqlite
+    response_cache_size = 1000
+
+The ``memory`` backend (default) is a bounded LRU local to each worker. The
+invalidations of its entries are signaled to the other workers through a
+database sequence checked before reading the cache: a worker clears its
+cache once another worker invalidated some responses. The ``sqlite``
+backend stores the responses into a file shared by the workers of the host
+(by default into the data directory of odoo). Other backends can be
+registered into ``RESPONSE_CACHE_BACKENDS``.
+"""
+
+import collections
+import contextlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from odoo.tools.config import config
+
+from .tools import get_private_file_path
+
+_logger = logging.getLogger(__name__)
+
+# A cached response
+CachedResponse = collections.namedtuple("CachedResponse", ["body", "status", "headers"])
+
+# The cache options of a restapi method
+ResponseCacheOptions = collections.namedtuple(
+    "ResponseCacheOptions", ["ttl", "vary_by", "models"]
+)
+
+RESPONSE_CACHE_VARY_BY = ("user", "authenticated_partner_id", "lang", "params")
+
+# The sequence incremented each time responses are invalidated
+RESPONSE_CACHE_SIGNALING_SEQUENCE = "base_rest_response_cache_signaling"
+
+
+class ResponseCacheBackend(object):
+    """Interface of the response cache backends"""
+
+    # Whether the entries are shared by the workers. The invalidations of the
+    # entries of the other backends are signaled to the other workers.
+    shared = False
+
+    def get(self, key):
+        """Return the CachedResponse stored for the key or None"""
+        raise NotImplementedError()
+
+    def set(self, key, response, ttl, tags):
+        """Store the CachedResponse for ttl seconds
+
+        :param tags: the tags used to invalidate the entry
+        """
+        raise NotImplementedError()
+
+    def invalidate(self, tags):
+        """Remove the entries tagged with one of the given tags"""
+        raise NotImplementedError()
+
+    def clear(self):
+        raise NotImplementedError()
+
+
+class MemoryResponseCache(ResponseCacheBackend):
+    """Bounded LRU cache local to the worker process"""
+
+    def __init__(self, size=1000):
+        self.size = size
+        self._entries = collections.OrderedDict()
+        self._keys_by_tag = collections.defaultdict(set)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, tags, response = entry
+            if expires < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return response
+
+    def set(self, key, response, ttl, tags):
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, tags, response)
+            for tag in tags:
+                self._keys_by_tag[tag].add(key)
+            while len(self._entries) > self.size:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, tags):
+        with self._lock:
+            for tag in tags:
+                for key in list(self._keys_by_tag.get(tag, ())):
+                    self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_tag.clear()
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[1]:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+
+class SQLiteResponseCache(ResponseCacheBackend):
+    """Cache stored into a SQLite file shared by the workers of the host"""
+
+    shared = True
+
+    def __init__(self, path=None, size=1000):
+        self.path = path or get_private_file_path("responses.sqlite")
+        self.size = size
+        with self._connect() as cr:
+            cr.execute(
+                "CREATE TABLE IF NOT EXISTS response ("
+                "key TEXT PRIMARY KEY, expires REAL, body BLOB, status INTEGER, "
+                "headers TEXT)"
+            )
+            cr.execute("CREATE TABLE IF NOT EXISTS response_tag (key TEXT, tag TEXT)")
+            cr.execute(
+                "CREATE INDEX IF NOT EXISTS response_tag_tag ON response_tag (tag)"
+            )
+
+    @contextlib.contextmanager
+    def _connect(self):
+        cr = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        try:
+            yield cr
+        finally:
+            # an uncommitted transaction is rolled back
+            cr.close()
+
+    def get(self, key):
+        with self._connect() as cr:
+            row = cr.execute(
+                "SELECT body, status, headers FROM response "
+                "WHERE key = ? AND expires >= ?",
+                (key, time.time()),
+            ).fetchone()
+        if not row:
+            return None
+        body, status, headers = row
+        return CachedResponse(body, status, [tuple(h) for h in json.loads(headers)])
+
+    def set(self, key, response, ttl, tags):
+        with self._connect() as cr:
+            cr.execute("BEGIN IMMEDIATE")
+            cr.execute("DELETE FROM response_tag WHERE key = ?", (key,))
+            cr.execute(
+                "INSERT OR REPLACE INTO response VALUES (?, ?, ?, ?, ?)",
+                (
+                    key,
+                    time.time() + ttl,
+                    response.body,
+                    response.status,
+                    json.dumps(response.headers),
+                ),
+            )
+            cr.executemany(
+                "INSERT INTO response_tag VALUES (?, ?)", [(key, tag) for tag in tags]
+            )
+            # purge the expired entries and bound the size of the cache
+            cr.execute(
+                "DELETE FROM response WHERE expires < ? OR key NOT IN ("
+                "SELECT key FROM response ORDER BY expires DESC LIMIT ?)",
+                (time.time(), self.size),
+            )
+            cr.execute(
+                "DELETE FROM response_tag WHERE key NOT IN (SELECT key FROM response)"
+            )
+            cr.execute("COMMIT")
+
+    def invalidate(self, tags):
+        if not tags:
+            return
+        placeholders = ",".join("?" * len(tags))
+        with self._connect() as cr:
+            cr.execute("BEGIN IMMEDIATE")
+            cr.execute(
+                "DELETE FROM response WHERE key IN (SELECT key FROM response_tag "
+                "WHERE tag IN (%s))" % placeholders,
+                tuple(tags),
+            )
+            cr.execute(
+                "DELETE FROM response_tag WHERE tag IN (%s)" % placeholders,
+                tuple(tags),
+            )
+            cr.execute("COMMIT")
+
+    def clear(self):
+        with self._connect() as cr:
+            cr.execute("DELETE FROM response")
+            cr.execute("DELETE FROM response_tag")
+
+
+RESPONSE_CACHE_BACKENDS = {
+    "memory": MemoryResponseCache,
+    "sqlite": SQLiteResponseCache,
+}
+
+# the models declared into the cache options of the restapi methods. The
+# responses are tagged with these models to be invalidated when they are
+# written
+_response_cache_models = set()
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+# the last invalidation signal seen by the worker process by database
+_response_cache_signals = {}
+# the databases without signaling sequence (base_rest not updated)
+_response_cache_unsignaled_dbs = set()
+
+
+def get_response_cache():
+    """Return the response cache backend configured for the server"""
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                name = config.get_misc("base_rest", "response_cache_backend", "memory")
+                kwargs = {
+                    "size": int(
+                        config.get_misc("base_rest", "response_cache_size", 1000)
+                    )
+                }
+                path = config.get_misc("base_rest", "response_cache_path")
+                if path:
+                    kwargs["path"] = path
+                _logger.info("REST responses cached with the %s backend", name)
+                _response_cache = RESPONSE_CACHE_BACKENDS[name](**kwargs)
+    return _response_cache
+
+
+def get_response_cache_options(cache):
+    """Normalize the ``cache`` option of a restapi method
+
+    :param cache: the ttl in seconds or a dict with the keys 'ttl' (default
+                  60), 'vary_by' (a list of values into
+                  RESPONSE_CACHE_VARY_BY, all by default) and 'models' (the
+                  names of the models invalidating the responses when
+                  written)
+    :return: ResponseCacheOptions or None
+    """
+    if not cache:
+        return None
+    if not isinstance(cache, dict):
+        cache = {"ttl": cache}
+    vary_by = tuple(cache.get("vary_by", RESPONSE_CACHE_VARY_BY))
+    unknown = set(vary_by) - set(RESPONSE_CACHE_VARY_BY)
+    if unknown:
+        raise ValueError("Unknown cache vary_by values: %s" % ", ".join(unknown))
+    options = ResponseCacheOptions(
+        ttl=cache.get("ttl", 60),
+        vary_by=vary_by,
+        models=tuple(cache.get("models", ())),
+    )
+    _response_cache_models.update(options.models)
+    return options
+
+
+def get_response_cache_tag(dbname, model_name):
+    return "{}:{}".format(dbname, model_name)
+
+
+def invalidate_response_cache(dbname, model_names):
+    """Invalidate the responses depending on the given models"""
+    tags = [
+        get_response_cache_tag(dbname, model_name)
+        for model_name in model_names
+        if model_name in _response_cache_models
+    ]
+    if tags:
+        get_response_cache().invalidate(tags)
+
+
+def signal_response_cache_invalidation(registry):
+    """Signal to the other workers that responses have been invalidated
+
+    Called once the invalidation is committed. Only needed when the cache
+    is not shared by the workers.
+    """
+    if get_response_cache().shared:
+        return
+    with registry.cursor() as cr:
+        if not _has_signaling_sequence(cr):
+            return
+        cr.execute("SELECT nextval(%s)", (RESPONSE_CACHE_SIGNALING_SEQUENCE,))
+        signal = cr.fetchone()[0]
+    # the invalidation is already applied to the cache of the worker
+    if _response_cache_signals.get(registry.db_name) == signal - 1:
+        _response_cache_signals[registry.db_name] = signal
+
+
+def _has_signaling_sequence(cr):
+    """Whether the signaling sequence exists: it is created by the update of
+    base_rest, the code may be deployed before"""
+    cr.execute("SELECT to_regclass(%s)", (RESPONSE_CACHE_SIGNALING_SEQUENCE,))
+    if cr.fetchone()[0] is not None:
+        return True
+    if cr.dbname not in _response_cache_unsignaled_dbs:
+        _response_cache_unsignaled_dbs.add(cr.dbname)
+        _logger.warning(
+            "The REST responses are not cached: base_rest must be updated " "on %s",
+            cr.dbname,
+        )
+    return False
+
+
+def check_response_cache_signaling(cr):
+    """Clear the cache of the worker if another worker invalidated
+    responses since the last check
+
+    :return: whether the cache can be used (False if the signaling
+             sequence doesn't exist yet)
+    """
+    cache = get_response_cache()
+    if cache.shared:
+        return True
+    if cr.dbname not in _response_cache_signals and not _has_signaling_sequence(cr):
+        return False
+    cr.execute("SELECT last_value FROM %s" % RESPONSE_CACHE_SIGNALING_SEQUENCE)
+    signal = cr.fetchone()[0]
+    previous = _response_cache_signals.get(cr.dbname)
+    _response_cache_signals[cr.dbname] = signal
+    if previous is not None and previous != signal:
+        _logger.debug("REST responses invalidated by another worker")
+        cache.clear()
+    return True
@@ -2,19 +2,83 @@
 # License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
 
 
+import datetime
+import decimal
+import hashlib
+import json
 import logging
+import random
+from collections import namedtuple
 
-from werkzeug.exceptions import NotFound
+from psycopg2 import IntegrityError
+from werkzeug.exceptions import HTTPException, NotFound, UnsupportedMediaType
 
-from odoo.http import request
+from odoo import models
+from odoo.exceptions import UserError
+from odoo.http import Response, request
+from odoo.tools.config import config
 
 from odoo.addons.component.core import AbstractComponent
 
 from ..apispec.base_rest_service_apispec import BaseRestServiceAPISpec
+from ..cache import get_response_cache_options
+from ..core import _rest_services_cache
+from ..http import NDJSON_MIMETYPE, RestApiDispatcher, json_default
+from ..metrics import _metrics_registry, get_stage_timer
+from ..restapi import (
+    StreamedInput,
+    get_input_stream_options,
+    get_output_validation_policy,
+    parse_sparse_fields,
+)
+from ..single_flight import get_single_flight_options
 from ..tools import ROUTING_DECORATOR_ATTR
 
 _logger = logging.getLogger(__name__)
 
+# How a call is dispatched to a method of a service. Computed once per service
+# class and method (see BaseRestService._get_dispatch_plan)
+DispatchPlan = namedtuple(
+    "DispatchPlan",
+    [
+        "method_name",
+        "routing",
+        "input_param",
+        "output_param",
+        "skip_secure_params",
+        "skip_secure_response",
+        "output_stream",
+        "conditional",
+        "cache",
+        "output_validation",
+        "sparse_fields",
+        "run_async",
+        "input_stream",
+        "single_flight",
+    ],
+)
+
+# The (service class, method name) of the methods whose DispatchPlan has been
+# requested without plan (see BaseRestService._get_method_dispatch_plan)
+_plan_less_calls = set()
+
+_output_validation_samples = _metrics_registry.counter(
+    "base_rest_output_validation_samples_total",
+    "Number of sampled validations of the output of the REST methods",
+)
+_output_validation_failures = _metrics_registry.counter(
+    "base_rest_output_validation_failures_total",
+    "Number of failed sampled validations of the output of the REST methods",
+)
+
+
+def _etag_json_default(obj):
+    """Encode the dates and the decimals of the results hashed as ETag. The
+    other objects are rejected since their encoding (repr) isn't stable."""
+    if isinstance(obj, (datetime.date, decimal.Decimal)):
+        return json_default(obj)
+    raise TypeError("%s can't be hashed as ETag" % type(obj).__name__)
+
 
 def to_int(val):
     # The javascript VM ducktape only use float and so pass float
@@ -51,11 +115,27 @@ def skip_secure_response(func):
     return func
 
 
+def skip_validator_cache(func):
+    """
+    Used to decorate the validator methods returning a schema depending on the
+    request context (user, lang, ...). The cerberus validator built from
+    the schema returned by such a method is not cached.
+    :param func:
+    :return:
+    """
+    func.skip_validator_cache = True
+    return func
+
+
 class BaseRestService(AbstractComponent):
     _name = "base.rest.service"
 
     _description = None  # description included into the openapi doc
     _is_rest_service_component = True  # marker to retrieve REST components
+    # names of the methods for which a bulk route (POST /bulk_<name>) is
+    # generated (see RestApiMethodTransformer)
+    _bulk_methods = ()
+    _bulk_max_items = 1000  # maximum number of items of a bulk route
 
     def _prepare_extra_log(self, func, params, secure_params, res):
         httprequest = request.httprequest
@@ -74,14 +154,99 @@ class BaseRestService(AbstractComponent):
     def _log_call(self, func, params, secure_params, res):
         """If you want to enjoy the advanced log install the module
         logging_json"""
-        if request:
+        if request and _logger.isEnabledFor(logging.DEBUG):
             httprequest = request.httprequest
             extra = self._prepare_extra_log(func, params, secure_params, res)
             args = [httprequest.url, httprequest.method]
             message = "REST call url %s method %s"
             _logger.debug(message, *args, extra=extra)
 
-    def _prepare_input_params(self, method, params):
+    def _get_dispatch_plan(self, method_name):
+        """
+        Return the DispatchPlan of the given method. The plan is computed
+        once per service class and method until the registry is rebuilt.
+        :param method_name:
+        :return: DispatchPlan or None if the service has no such method
+        """
+        key = (
+            "dispatch.plan",
+            self.__class__,
+            method_name,
+            _rest_services_cache.generation,
+        )
+        plan = _rest_services_cache.get(key)
+        if plan is None:
+            method = getattr(self.__class__, method_name, None)
+            if not callable(method):
+                return None
+            plan = _rest_services_cache[key] = self._build_dispatch_plan(method)
+        return plan
+
+    def _get_method_dispatch_plan(self, method):
+        """
+        Return the DispatchPlan of a method given without its plan to
+        ``_prepare_input_params`` or ``_prepare_response``. A warning is
+        logged once per method.
+        :param method:
+        :return: DispatchPlan
+        """
+        key = (self.__class__, method.__name__)
+        if key not in _plan_less_calls:
+            _plan_less_calls.add(key)
+            _logger.warning(
+                "DEPRECATED: The DispatchPlan of method %s of service %s must be "
+                "given to _prepare_input_params and _prepare_response",
+                method.__name__,
+                self._name,
+            )
+        return self._get_dispatch_plan(method.__name__) or self._build_dispatch_plan(
+            method
+        )
+
+    def _build_dispatch_plan(self, method):
+        routing = getattr(method, ROUTING_DECORATOR_ATTR, None)
+        output_param = routing["output_param"] if routing else None
+        skip_secure_response = hasattr(method, "skip_secure_response")
+        if routing and not output_param and not skip_secure_response:
+            _logger.warning(
+                "DEPRECATED: You must define an output schema for method %s "
+                "in service %s",
+                method.__name__,
+                self._name,
+            )
+        if routing and routing.get("run_async"):
+            if routing.get("input_stream") or routing.get("output_stream"):
+                raise ValueError(
+                    "The method %s of service %s can't be run asynchronously: "
+                    "its input or its output is streamed"
+                    % (method.__name__, self._name)
+                )
+        return DispatchPlan(
+            method_name=method.__name__,
+            routing=routing,
+            input_param=routing["input_param"] if routing else None,
+            output_param=output_param,
+            skip_secure_params=hasattr(method, "skip_secure_params"),
+            skip_secure_response=skip_secure_response,
+            output_stream=bool(routing and routing.get("output_stream")),
+            conditional=routing.get("conditional") if routing else None,
+            cache=get_response_cache_options(routing.get("cache")) if routing else None,
+            output_validation=get_output_validation_policy(
+                routing.get("output_validation")
+            )
+            if routing
+            else None,
+            sparse_fields=bool(routing and routing.get("sparse_fields")),
+            run_async=bool(routing and routing.get("run_async")),
+            input_stream=get_input_stream_options(routing.get("input_stream"))
+            if routing
+            else None,
+            single_flight=get_single_flight_options(routing.get("single_flight"))
+            if routing
+            else None,
+        )
+
+    def _prepare_input_params(self, method, params, plan=None):
         """
         Internal method used to process the input_param parameter. The
         result will be used to call the final method. The processing is
@@ -89,25 +254,44 @@ class BaseRestService(AbstractComponent):
         restapi.method` decorator on the method.
         :param method:
         :param params:
+        :param plan: the DispatchPlan of the method
         :return:
         """
-        method_name = method.__name__
-        if hasattr(method, "skip_secure_params"):
+        plan = plan or self._get_method_dispatch_plan(method)
+        if plan.skip_secure_params:
             return params
-        routing = getattr(method, ROUTING_DECORATOR_ATTR, None)
-        if not routing:
+        if not plan.routing:
             _logger.warning(
                 "Method %s is not a public method of service %s",
-                method_name,
+                plan.method_name,
                 self._name,
             )
             raise NotFound()
-        input_param = routing["input_param"]
-        if input_param:
-            return input_param.from_params(self, params)
+        if plan.input_param:
+            return plan.input_param.from_params(self, params)
         return {}
 
-    def _prepare_response(self, method, result):
+    def _prepare_input_stream(self, plan):
+        """
+        Internal method used to process the NDJSON body of the requests to
+        the methods declared with ``input_stream``.
+        :return: a StreamedInput iterating over the items validated by the
+                 input_param
+        """
+        httprequest = request.httprequest
+        if httprequest.mimetype != NDJSON_MIMETYPE:
+            raise UnsupportedMediaType(
+                "The content type of the request must be %s" % NDJSON_MIMETYPE
+            )
+        return StreamedInput(
+            self,
+            plan.input_param,
+            iter(httprequest.stream.readline, b""),
+            plan.input_stream,
+            loads=request.dispatcher.json_codec.loads,
+        )
+
+    def _prepare_response(self, method, result, plan=None):
         """
         Internal method used to process the result of the method called by the
         controller. The result of this process is returned to the controller
@@ -116,24 +300,58 @@ class BaseRestService(AbstractComponent):
         specified by the `restapi.method` decorator on the method.
         :param method: method
         :param response:
+        :param plan: the DispatchPlan of the method
         :return: dict/json or `http.Response`
         """
-        method_name = method
-        if callable(method):
-            method_name = method.__name__
-        if hasattr(method, "skip_secure_response"):
+        plan = plan or self._get_method_dispatch_plan(method)
+        if plan.skip_secure_response or not plan.output_param:
             return result
-        routing = getattr(method, ROUTING_DECORATOR_ATTR, None)
-        output_param = routing["output_param"]
-        if not output_param:
-            _logger.warning(
-                "DEPRECATED: You must define an output schema for method %s "
-                "in service %s",
-                method_name,
+        if plan.output_stream:
+            items = plan.output_param.to_response_items(self, result)
+            return request.dispatcher.make_json_stream_response(items)
+        policy = self._get_output_validation_policy(plan)
+        if policy == "always":
+            return plan.output_param.to_response(self, result)
+        if policy == "off" or random.random() * 100 >= policy:
+            return plan.output_param.to_response_unvalidated(self, result)
+        labels = (
+            ("collection", self._collection),
+            ("usage", self._usage),
+            ("method", plan.method_name),
+        )
+        _output_validation_samples.inc(labels)
+        try:
+            return plan.output_param.to_response(self, result)
+        except Exception:
+            _logger.exception(
+                "Invalid response of method %s of service %s",
+                plan.method_name,
                 self._name,
             )
-            return result
-        return output_param.to_response(self, result)
+            _output_validation_failures.inc(labels)
+            return plan.output_param.to_response_unvalidated(self, result)
+
+    def _get_output_validation_policy(self, plan):
+        """
+        Return the validation policy of the output of the method: the
+        ``output_validation`` of the method, else the
+        ``_default_output_validation`` of the controller, else 'always'.
+        The output is always validated when the tests are enabled.
+        :return: 'always', 'off' or the percentage of the calls to validate
+        """
+        if self._is_output_validation_forced():
+            return "always"
+        policy = plan.output_validation
+        if policy is None:
+            controller = getattr(self.work, "controller", None)
+            policy = getattr(controller, "_default_output_validation", None)
+            policy = get_output_validation_policy(policy)
+        if policy is None:
+            return "always"
+        return policy
+
+    def _is_output_validation_forced(self):
+        return bool(config["test_enable"])
 
     def dispatch(self, method_name, *args, params=None):
         """
@@ -150,17 +368,249 @@ class BaseRestService(AbstractComponent):
                        to the method as keyword args.
         :return:
         """
-        method = getattr(self, method_name, object())
-        params = params or {}
-        secure_params = self._prepare_input_params(method, params)
+        plan = self._get_dispatch_plan(method_name)
+        if plan is None:
+            _logger.warning(
+                "Method %s is not a public method of service %s",
+                method_name,
+                self._name,
+            )
+            raise NotFound()
+        method = getattr(self, method_name)
+        params = job_params = params or {}
+        # the sparse fieldset requested for the output (see restapi.method)
+        sparse_fields = None
+        if plan.sparse_fields:
+            params = dict(params)
+            sparse_fields = parse_sparse_fields(params.pop("fields", None))
+        self.work.sparse_fields = sparse_fields
+        stage_timer = get_stage_timer()
+        with stage_timer.stage("input_validation"):
+            if plan.input_stream:
+                secure_params = self._prepare_input_stream(plan)
+            else:
+                secure_params = self._prepare_input_params(method, params, plan=plan)
+        if plan.run_async and not self._is_async_job():
+            return self._enqueue_async_job(method_name, args, job_params)
+        conditional = plan.conditional and self._is_conditional_dispatch()
+        etag = last_modified = None
+        if conditional and plan.conditional != "body":
+            validator = self._call_method(
+                getattr(self, plan.conditional), args, secure_params
+            )
+            etag, last_modified = self._get_conditional_validators(validator)
+            if request.dispatcher.is_not_modified(etag, last_modified):
+                return request.dispatcher.make_not_modified_response(
+                    etag, last_modified
+                )
+        with stage_timer.stage("method"):
+            res = self._call_method(method, args, secure_params)
+        self._log_call(method, params, secure_params, res)
+        if plan.input_stream and res is None:
+            return secure_params.get_report()
+        if conditional and plan.conditional == "body" and not plan.output_stream:
+            etag = self._get_body_etag(res)
+            if etag and request.dispatcher.is_not_modified(etag):
+                return request.dispatcher.make_not_modified_response(etag)
+        with stage_timer.stage("output_validation"):
+            response = self._prepare_response(method, res, plan=plan)
+        if conditional and (etag or last_modified):
+            if not isinstance(response, Response):
+                response = request.dispatcher.make_json_response(
+                    response, default=json_default
+                )
+            request.dispatcher.set_conditional_headers(response, etag, last_modified)
+        return response
+
+    def _is_async_job(self):
+        """Whether the service is running an asynchronous job"""
+        return getattr(self.work, "async_job", None) is not None
+
+    def _enqueue_async_job(self, method_name, args, params):
+        """
+        Store the call to a method declared with ``run_async=True`` as a job
+        run once the transaction is committed.
+        :return: a '202 Accepted' response with the state of the job
+        """
+        job = (
+            self.env["rest.async.job"]
+            .sudo()
+            ._create_job(self, method_name, args, params)
+        )
+        response = self.controller.make_response(job._get_status())
+        response.status_code = 202
+        response.headers["Location"] = job._get_status_path()
+        return response
+
+    def _dispatch_bulk(self, method_name, items):
+        """
+        Process the items received by the bulk route of a method (see
+        ``_bulk_methods``). The valid items are processed together by
+        ``_process_bulk_items``. If the processing fails, the items are split
+        into smaller groups to isolate the failing ones.
+        :param items: a list of restapi.BulkItem
+        :return: a dict with the list of the result or error of each item
+        """
+        results = [{"error": item.error} for item in items]
+        valid = [idx for idx, item in enumerate(items) if item.error is None]
+        if valid:
+            outputs = self._call_bulk(method_name, [items[idx] for idx in valid])
+            for idx, output in zip(valid, outputs):
+                results[idx] = output
+        return {"results": results}
+
+    def _call_bulk(self, method_name, items):
+        try:
+            with self.env.cr.savepoint():
+                results = self._process_bulk_items(method_name, items)
+        except (UserError, HTTPException, IntegrityError) as e:
+            if len(items) == 1:
+                return [{"error": self._get_bulk_error_message(e)}]
+            half = len(items) // 2
+            return self._call_bulk(method_name, items[:half]) + self._call_bulk(
+                method_name, items[half:]
+            )
+        method = getattr(self, method_name)
+        plan = self._get_dispatch_plan(method_name)
+        return [
+            {"result": self._prepare_response(method, result, plan=plan)}
+            for result in results
+        ]
+
+    def _process_bulk_items(self, method_name, items):
+        """
+        Call the method with the args and params of each item. Define a
+        ``_bulk_<method_name>(items)`` method on the service to process them
+        together (ex: with a multi-record ``create(vals_list)``).
+        :param items: a list of restapi.BulkItem
+        :return: the list of the results of the method for each item
+        """
+        handler = getattr(self, "_bulk_%s" % method_name, None)
+        if handler is not None:
+            return handler(items)
+        method = getattr(self, method_name)
+        return [self._call_method(method, item.args, item.params) for item in items]
+
+    def _get_bulk_error_message(self, exception):
+        if isinstance(exception, UserError):
+            return exception.args[0]
+        if isinstance(exception, HTTPException):
+            return exception.description or exception.name
+        return exception.diag.message_primary or str(exception)
+
+    def _get_response_cache_key(self, method_name, args, params):
+        """
+        Return the key of the response to the call of the method into the
+        response cache or None if the response must not be cached.
+        :return: str or None
+        """
+        plan = self._get_dispatch_plan(method_name)
+        if not plan or not plan.cache:
+            return None
+        return self._get_response_key(method_name, args, params, plan.cache.vary_by)
+
+    def _get_single_flight_key(self, method_name, args, params):
+        """
+        Return the key of the response to the call of the method shared with
+        the identical concurrent requests or None if the method is not
+        declared with a ``single_flight`` option.
+        :return: str or None
+        """
+        plan = self._get_dispatch_plan(method_name)
+        if not plan or not plan.single_flight:
+            return None
+        return self._get_response_key(
+            method_name, args, params, plan.single_flight.vary_by
+        )
+
+    def _get_response_key(self, method_name, args, params, vary_by):
+        """
+        Return a hash identifying the response to a GET request calling the
+        method or None for the other requests.
+        :param vary_by: the values into RESPONSE_CACHE_VARY_BY the response
+                        depends on
+        :return: str or None
+        """
+        if not request or request.httprequest.method not in ("GET", "HEAD"):
+            return None
+        context = self.env.context
+        key = [
+            self.env.cr.dbname,
+            self._collection,
+            self._usage,
+            method_name,
+            args,
+            self.env.uid if "user" in vary_by else None,
+            context.get("authenticated_partner_id")
+            if "authenticated_partner_id" in vary_by
+            else None,
+            context.get("lang") if "lang" in vary_by else None,
+            params if "params" in vary_by else None,
+            # the responses are stored once compressed
+            request.dispatcher.get_response_encoding()
+            if isinstance(request.dispatcher, RestApiDispatcher)
+            else None,
+        ]
+        key = json.dumps(key, sort_keys=True, default=str)
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def _call_method(self, method, args, secure_params):
         if isinstance(secure_params, dict):
             # for backward compatibility methods expecting json params
             # are declared as m(self, p1=None, p2=None) or m(self, **params)
-            res = method(*args, **secure_params)
-        else:
-            res = method(*args, secure_params)
-        self._log_call(method, params, secure_params, res)
-        return self._prepare_response(method, res)
+            return method(*args, **secure_params)
+        return method(*args, secure_params)
+
+    def _is_conditional_dispatch(self):
+        """Whether the response to the current request can carry validators
+        (ETag / Last-Modified) for the conditional requests"""
+        return (
+            bool(request)
+            and isinstance(request.dispatcher, RestApiDispatcher)
+            and request.httprequest.method in ("GET", "HEAD")
+        )
+
+    def _get_conditional_validators(self, validator):
+        """
+        Return the (etag, last_modified) validators of the response from the
+        value returned by the method given as `conditional` to the
+        `restapi.method` decorator.
+        The ETag also depends on the user, the lang and the authenticated
+        partner since the response of the method depends on them.
+        :param validator: datetime, recordset (max of the write_date) or str
+        :return: tuple(etag, last_modified)
+        """
+        if isinstance(validator, models.BaseModel):
+            validator = max(validator.mapped("write_date"), default=None)
+        if not validator:
+            return None, None
+        last_modified = None
+        if isinstance(validator, datetime.datetime):
+            last_modified = validator
+            validator = validator.isoformat()
+        key = "{}|{}|{}|{}".format(
+            validator,
+            self.env.uid,
+            self.env.context.get("lang"),
+            self.env.context.get("authenticated_partner_id"),
+        )
+        return hashlib.sha256(key.encode("utf-8")).hexdigest(), last_modified
+
+    def _get_body_etag(self, result):
+        """Return a hash of the result of a method used as ETag or None if
+        the result can't be encoded before the output validation. Only the
+        JSON values, the dates and the decimals are encoded: the other
+        objects (Datamodel, pydantic models, ...) have no stable
+        representation."""
+        if isinstance(result, Response):
+            return None
+        try:
+            data = request.dispatcher.json_codec.dumps(
+                result, sort_keys=True, default=_etag_json_default
+            )
+        except (TypeError, ValueError):
+            return None
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
 
     def _validator_delete(self):
         """
@@ -1,6 +1,7 @@
 # Copyright 2018 ACSONE SA/NV
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html).
 
+import hashlib
 import json
 from contextlib import contextmanager
 
@@ -8,18 +9,11 @@ from odoo.http import Controller, request, route
 
 from odoo.addons.component.core import WorkContext
 
-from ..core import _rest_services_databases
+from ..core import _rest_services_cache, _rest_services_databases
 from .main import _PseudoCollection
 
 
 class ApiDocsController(Controller):
-    def make_json_response(self, data, headers=None, cookies=None):
-        data = json.dumps(data)
-        if headers is None:
-            headers = {}
-        headers["Content-Type"] = "application/json"
-        return request.make_response(data, headers=headers, cookies=cookies)
-
     @route(
         ["/api-docs", "/api-docs/index.html"],
         methods=["GET"],
@@ -27,7 +21,6 @@ class ApiDocsController(Controller):
         auth="public",
     )
     def index(self, **params):
-        self._get_api_urls()
         primary_name = params.get("urls.primaryName")
         swagger_settings = {
             "urls": self._get_api_urls(),
@@ -38,32 +31,70 @@ class ApiDocsController(Controller):
 
     @route("/api-docs/<path:collection>/<string:service_name>.json", auth="public")
     def api(self, collection, service_name):
-        with self.service_and_controller_class(collection, service_name) as (
-            service,
-            controller_class,
-        ):
-            openapi_doc = service.to_openapi(
-                default_auth=controller_class._default_auth
-            )
-            return self.make_json_response(openapi_doc)
+        """Return the openapi document of the service
+
+        The serialized document is cached by lang until the registry is
+        rebuilt and is served with a strong ETag so that a client already having the
+        document gets a 304 Not Modified response.
+        """
+        base_url = request.env["ir.config_parameter"].sudo().get_param("web.base.url")
+        key = (
+            "openapi.document",
+            request.env.cr.dbname,
+            collection,
+            service_name,
+            base_url,
+            request.env.lang,
+            _rest_services_cache.generation,
+        )
+        cached = _rest_services_cache.get(key)
+        if cached is None:
+            with self.service_and_controller_class(collection, service_name) as (
+                service,
+                controller_class,
+            ):
+                openapi_doc = service.to_openapi(
+                    default_auth=controller_class._default_auth
+                )
+            body = json.dumps(openapi_doc)
+            cached = (body, hashlib.sha256(body.encode("utf-8")).hexdigest())
+            _rest_services_cache[key] = cached
+        body, etag = cached
+        response = request.make_response(
+            body, headers={"Content-Type": "application/json"}
+        )
+        response.set_etag(etag)
+        return response.make_conditional(request.httprequest)
 
     def _get_api_urls(self):
         """
         This method lookup into the dictionary of registered REST service
-        for the current database to built the list of available REST API
+        for the current database to built the list of available REST API.
+        The list is cached until the registry is rebuilt.
         :return:
         """
+        key = (
+            "openapi.urls",
+            request.env.cr.dbname,
+            _rest_services_cache.generation,
+        )
+        api_urls = _rest_services_cache.get(key)
+        if api_urls is None:
+            api_urls = self._compute_api_urls()
+            _rest_services_cache[key] = api_urls
+        return api_urls
+
+    def _compute_api_urls(self):
         services_registry = _rest_services_databases.get(request.env.cr.dbname, {})
         api_urls = []
         for rest_root_path, spec in list(services_registry.items()):
             collection_path = rest_root_path[1:-1]  # remove '/'
             collection_name = spec["collection_name"]
-            for service in self._get_service_in_collection(collection_name):
+            for usage in self._get_service_usages_in_collection(collection_name):
                 api_urls.append(
                     {
-                        "name": "{}: {}".format(collection_path, service._usage),
-                        "url": "/api-docs/%s/%s.json"
-                        % (collection_path, service._usage),
+                        "name": "{}: {}".format(collection_path, usage),
+                        "url": "/api-docs/%s/%s.json" % (collection_path, usage),
                     }
                 )
         api_urls = sorted(api_urls, key=lambda k: k["name"])
@@ -73,12 +104,13 @@ class ApiDocsController(Controller):
         reg_model = request.env["rest.service.registration"]
         return [c for c in components if reg_model._filter_service_component(c)]
 
-    def _get_service_in_collection(self, collection_name):
+    def _get_service_usages_in_collection(self, collection_name):
+        """Return the usages of the services of the collection without
+        instantiating the services"""
         with self.work_on_component(collection_name) as work:
             components = work.components_registry.lookup(collection_name)
             services = self._filter_service_components(components)
-            services = [work.component(usage=s._usage) for s in services]
-        return services
+        return list(dict.fromkeys(s._usage for s in services))
 
     @contextmanager
     def service_and_controller_class(self, collection_path, service_name):
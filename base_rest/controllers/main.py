@@ -4,14 +4,29 @@
 import logging
 from contextlib import contextmanager
 
-from werkzeug.exceptions import BadRequest
+from werkzeug.exceptions import BadRequest, Forbidden, HTTPException, NotFound
+from werkzeug.routing import Map, Rule
 
 from odoo import models
 from odoo.http import Controller, Response, request
 
-from odoo.addons.component.core import WorkContext, _get_addon_name
-
-from ..core import _rest_controllers_per_module
+from odoo.addons.component.core import AbstractComponent, WorkContext, _get_addon_name
+
+from ..cache import (
+    CachedResponse,
+    check_response_cache_signaling,
+    get_response_cache,
+    get_response_cache_tag,
+)
+from ..core import (
+    _rest_controllers_per_module,
+    _rest_generated_controllers,
+    _rest_services_cache,
+)
+from ..http import RestApiDispatcher, json_default
+from ..metrics import PROMETHEUS_CONTENT_TYPE, _metrics_registry, get_stage_timer
+from ..single_flight import _single_flight_group, _single_flight_requests
+from ..tools import ROUTING_DECORATOR_ATTR
 
 _logger = logging.getLogger(__name__)
 
@@ -79,6 +94,51 @@ class RestController(Controller):
                    default: False
     _default_save_session: Whether session should be saved into the session store
                            default: True
+    _default_json_codec: The name of the JSON codec used to decode the requests
+                         and encode the responses ('json', 'ujson', 'orjson').
+                         default: None (orjson if installed, json otherwise)
+    _default_output_validation: The validation policy of the output of the
+                                methods: 'always', 'off' or the percentage of
+                                the calls to validate.
+                                default: None ('always')
+    _default_metrics: Whether the duration of the stages of the processing of
+                      the requests is measured (see base_rest.metrics).
+                      default: None
+    _default_server_timing: Whether the duration of the stages of the
+                            processing of the requests is returned into a
+                            'Server-Timing' header.
+                            default: None
+    _default_compression: The compression of the JSON responses negotiated with
+                          the client (Accept-Encoding): True or a dict with the
+                          keys 'min_size' (default 1024 bytes), 'level'
+                          (default 5) and 'encodings' (see
+                          base_rest.http.get_compression_options).
+                          default: None (no compression)
+    _default_rate_limit: The rate limit of the routes by client: the number
+                         of requests per minute or a dict with the keys
+                         'requests', 'period' (default 60 seconds), 'burst'
+                         and 'key' ('api_key', 'partner' or 'ip') (see
+                         base_rest.rate_limit.get_rate_limit_options).
+                         default: None (no rate limit)
+
+    The following properties allow to serve a 'batch' route (POST
+    {_root_path}batch) processing a list of requests to the routes of the
+    services in one call:
+
+    _batch_enabled: Whether the batch route is generated.
+                    default: False
+    _batch_max_items: The maximum number of requests accepted by the batch
+                      route.
+                      default: 50
+
+    _metrics_route: Whether a 'metrics' route (GET {_root_path}metrics) exposing
+                    the metrics of the worker process in the Prometheus text
+                    format is generated.
+                    default: False
+
+    If a service declares a method with ``run_async=True``, a route (GET
+    {_root_path}async_job/<id>) returning the state and the result of the
+    asynchronous jobs is generated.
     """
 
     _root_path = None
@@ -91,6 +151,24 @@ class RestController(Controller):
     _default_csrf = False
     # Whether session should be saved into the session store
     _default_save_session = True
+    # The name of the JSON codec to use (None for the preferred available one)
+    _default_json_codec = None
+    # The validation policy of the output of the methods (None for 'always')
+    _default_output_validation = None
+    # Whether the duration of the stages of the requests is measured
+    _default_metrics = None
+    # Whether the duration of the stages is returned into a Server-Timing header
+    _default_server_timing = None
+    # The compression of the JSON responses (None to not compress them)
+    _default_compression = None
+    # The rate limit of the routes by client (None for no limit)
+    _default_rate_limit = None
+    # Whether the batch route is generated
+    _batch_enabled = False
+    # The maximum number of requests accepted by the batch route
+    _batch_max_items = 50
+    # Whether the metrics route is generated
+    _metrics_route = False
 
     _component_context_provider = "component_context_provider"
 
@@ -138,14 +216,46 @@ class RestController(Controller):
             request=request,
             controller=self,
         )
-        provider = work.component(usage=self._component_context_provider)
+        provider = self._get_component(work, self._component_context_provider)
         return provider._get_component_context()
 
+    def _get_component(self, work, usage):
+        """
+        Return the component for the given usage.
+
+        The class of the component is cached by collection and usage until
+        the registry is rebuilt, unless the lookup of the component depends
+        on the work context (a candidate component overrides
+        ``_component_match``). When cached, only the component instance is
+        built.
+        :return: an instance of the component
+        """
+        key = (
+            "component.class",
+            work.components_registry,
+            work.collection._name,
+            usage,
+            _rest_services_cache.generation,
+        )
+        component_class = _rest_services_cache.get(key)
+        if component_class is not None:
+            return component_class(work)
+        component = work.component(usage=usage)
+        candidates = work.components_registry.lookup(work.collection._name, usage=usage)
+        default_match = AbstractComponent._component_match.__func__
+        if all(c._component_match.__func__ is default_match for c in candidates):
+            _rest_services_cache[key] = component.__class__
+        return component
+
     def make_response(self, data):
         if isinstance(data, Response):
-            # The response has been build by the called method...
+            # The response has been build by the called method (BinaryData,
+            # ...) and is returned as is
             return data
         # By default return result as json
+        if isinstance(request.dispatcher, RestApiDispatcher):
+            # encode the result with the json codec of the route
+            return request.dispatcher.make_json_response(data, default=json_default)
         return request.make_json_response(data)
 
     @property
@@ -167,12 +277,19 @@ class RestController(Controller):
         collection = collection or self.default_collection
         component_ctx = self._get_component_context(collection=collection)
         env = collection.env
-        collection.env = env(
-            context=dict(
-                env.context,
-                authenticated_partner_id=component_ctx.get("authenticated_partner_id"),
+        authenticated_partner_id = component_ctx.get("authenticated_partner_id")
+        if isinstance(request.dispatcher, RestApiDispatcher):
+            request.dispatcher.check_partner_rate_limit(authenticated_partner_id)
+        if (
+            "authenticated_partner_id" not in env.context
+            or env.context["authenticated_partner_id"] != authenticated_partner_id
+        ):
+            collection.env = env(
+                context=dict(
+                    env.context,
+                    authenticated_partner_id=authenticated_partner_id,
+                )
             )
-        )
         yield WorkContext(model_name="rest.service.registration", **component_ctx)
 
     @contextmanager
@@ -184,7 +301,7 @@ class RestController(Controller):
         :return: an instance of base.rest.service component
         """
         with self.work_on_component(collection=collection) as work:
-            service = work.component(usage=service_name)
+            service = self._get_component(work, service_name)
             yield service
 
     def _validate_method_name(self, method_name):
@@ -203,6 +320,256 @@ class RestController(Controller):
         self._validate_method_name(method_name)
         if isinstance(collection, models.Model) and not collection:
             raise request.not_found()
+        stage_timer = get_stage_timer()
+        stage_timer.set_labels(self._collection_name, service_name, method_name)
+        stage_timer.start()
         with self.service_component(service_name, collection=collection) as service:
-            result = service.dispatch(method_name, *args, params=params)
-            return self.make_response(result)
+            stage_timer.stop("component_lookup")
+            cache_key = service._get_response_cache_key(method_name, args, params)
+            if cache_key and not check_response_cache_signaling(request.env.cr):
+                cache_key = None
+            if cache_key:
+                cached = get_response_cache().get(cache_key)
+                if cached is not None:
+                    return self._make_cached_response(cached)
+            flight_key = service._get_single_flight_key(method_name, args, params)
+            if flight_key:
+                return self._process_single_flight(
+                    flight_key, service, method_name, args, params, cache_key
+                )
+            return self._call_service_method(
+                service, method_name, args, params, cache_key
+            )
+
+    def _call_service_method(self, service, method_name, args, params, cache_key):
+        result = service.dispatch(method_name, *args, params=params)
+        with get_stage_timer().stage("encoding"):
+            response = self.make_response(result)
+        if cache_key:
+            self._cache_response(service, method_name, cache_key, response)
+        return response
+
+    def _process_single_flight(
+        self, flight_key, service, method_name, args, params, cache_key
+    ):
+        """Share the response of the first of the identical concurrent
+        requests with the others (see base_rest.single_flight)"""
+        flight, leader = _single_flight_group.join(flight_key)
+        if not leader:
+            options = service._get_dispatch_plan(method_name).single_flight
+            shared = flight.wait(options.timeout)
+            if shared is not None:
+                _single_flight_requests.inc((("role", "shared"),))
+                return self._make_cached_response(shared)
+            _single_flight_requests.inc((("role", "fallback"),))
+            return self._call_service_method(
+                service, method_name, args, params, cache_key
+            )
+        _single_flight_requests.inc((("role", "leader"),))
+        try:
+            response = self._call_service_method(
+                service, method_name, args, params, cache_key
+            )
+            flight.response = self._to_cached_response(response)
+            return response
+        finally:
+            _single_flight_group.leave(flight_key, flight)
+
+    def _to_cached_response(self, response):
+        """Return the CachedResponse of the response or None if it can't be
+        reused"""
+        if response.status_code != 200 or response.direct_passthrough:
+            return None
+        return CachedResponse(
+            body=response.get_data(),
+            status=response.status_code,
+            headers=[
+                (name, value)
+                for name, value in response.headers.items()
+                if name not in ("Content-Length", "Set-Cookie")
+            ],
+        )
+
+    def _cache_response(self, service, method_name, cache_key, response):
+        cached = self._to_cached_response(response)
+        if cached is None:
+            return
+        options = service._get_dispatch_plan(method_name).cache
+        dbname = request.env.cr.dbname
+        get_response_cache().set(
+            cache_key,
+            cached,
+            options.ttl,
+            [get_response_cache_tag(dbname, model) for model in options.models],
+        )
+
+    def _make_cached_response(self, cached):
+        response = Response(cached.body, status=cached.status, headers=cached.headers)
+        # answer the conditional requests from the cached validators
+        return response.make_conditional(request.httprequest)
+
+    def _dispatch_method(
+        self, service_name, method_name, *args, collection=None, params=None, work=None
+    ):
+        """Dispatch the call to the method of the service and return its
+        result
+
+        :param work: the WorkContext to use. By default, a new one is built
+                     from the component context.
+        """
+        self._validate_method_name(method_name)
+        if isinstance(collection, models.Model) and not collection:
+            raise request.not_found()
+        if work is not None:
+            service = self._get_component(work, service_name)
+            return service.dispatch(method_name, *args, params=params)
+        with self.service_component(service_name, collection=collection) as service:
+            return service.dispatch(method_name, *args, params=params)
+
+    def _process_batch(self, requests=None, collection=None, **params):
+        """Process a list of requests to the routes of the services
+
+        Each request is a dict with the http 'method' (GET by default), the
+        'path' relative to the root path of the controller and the 'params'
+        of the request. The component context is computed once for all the
+        requests and each request is processed into its own savepoint with
+        its own WorkContext. The methods are dispatched without the response
+        cache, the single flight and the metrics of ``_process_method`` and
+        only their JSON responses are accepted.
+        :return: a dict with the 'responses' as a list of dict with the
+                 'status' and the 'body' of the response to each request
+        """
+        if not isinstance(requests, list):
+            raise BadRequest("A list of requests is expected")
+        if len(requests) > self._batch_max_items:
+            raise BadRequest(
+                "Too many requests in the batch (%s > %s)"
+                % (len(requests), self._batch_max_items)
+            )
+        adapter = self._get_batch_routing_map().bind("")
+        responses = []
+        with self.work_on_component(collection=collection) as work:
+            for item in requests:
+                responses.append(
+                    self._process_batch_item(work, adapter, item, collection)
+                )
+        return self.make_response({"responses": responses})
+
+    def _process_batch_item(self, work, adapter, item, collection=None):
+        try:
+            with work.env.cr.savepoint():
+                if not isinstance(item, dict):
+                    raise BadRequest("A request must be a dict")
+                path = item.get("path") or ""
+                path = "{}/{}".format(self._root_path.rstrip("/"), path.lstrip("/"))
+                endpoint, args = adapter.match(
+                    path, method=(item.get("method") or "GET").upper()
+                )
+                routing = getattr(endpoint, ROUTING_DECORATOR_ATTR, {})
+                if not self._is_batch_item_auth_allowed(routing.get("auth")):
+                    raise Forbidden()
+                request.dispatcher.check_batch_item_rate_limit(
+                    routing, work.authenticated_partner_id
+                )
+                # the attributes set on the work context by a request
+                # (sparse_fields, keyset_page, ...) are not shared
+                result = self._dispatch_method(
+                    endpoint.rest_service_name,
+                    endpoint.rest_service_method_name,
+                    *[args[arg] for arg in endpoint.rest_args],
+                    collection=collection,
+                    params=dict(item.get("params") or {}),
+                    work=work.work_on()
+                )
+                # a response which can't be returned rolls back the request
+                return self._make_batch_item_response(result)
+        except Exception as e:
+            return self._make_batch_item_error(e)
+
+    def _is_batch_item_auth_allowed(self, auth):
+        """The requests of a batch are processed with the authentication of
+        the batch route. Only the routes requiring the same authentication or
+        a public one can be requested."""
+        return auth in (
+            None,
+            "none",
+            "public",
+            self._default_auth,
+            "public_or_%s" % self._default_auth,
+        )
+
+    def _make_batch_item_response(self, result):
+        if not isinstance(result, Response):
+            return {"status": 200, "body": result}
+        if result.mimetype != "application/json" or result.direct_passthrough:
+            raise BadRequest(
+                "The streamed or binary responses can't be returned by a batch"
+            )
+        body = request.dispatcher.json_codec.loads(result.get_data())
+        return {"status": result.status_code, "body": body}
+
+    def _make_batch_item_error(self, exception):
+        error = request.dispatcher.handle_error(exception)
+        if not isinstance(error, HTTPException):
+            raise exception
+        try:
+            body = request.dispatcher.json_codec.loads(error.get_body())
+        except ValueError:
+            body = {"code": error.code, "name": error.name}
+        return {"status": error.code, "body": body}
+
+    def _process_metrics(self, collection=None, **params):
+        """Return the metrics of the worker process in the Prometheus text
+        format"""
+        return Response(
+            _metrics_registry.to_prometheus(), content_type=PROMETHEUS_CONTENT_TYPE
+        )
+
+    def _process_async_job(self, job_id=None, collection=None, **params):
+        """Return the state of an asynchronous job and its result once done
+        (see restapi.method(run_async=True)). Only the user and the
+        authenticated partner who called the method have access to it."""
+        with self.work_on_component(collection=collection) as work:
+            job = (
+                request.env["rest.async.job"]
+                .sudo()
+                .search(
+                    [
+                        ("uuid", "=", job_id),
+                        ("user_id", "=", request.env.uid),
+                        (
+                            "authenticated_partner_id",
+                            "=",
+                            work.authenticated_partner_id or False,
+                        ),
+                    ],
+                    limit=1,
+                )
+            )
+            if not job:
+                raise NotFound()
+            return self.make_response(job._get_status())
+
+    def _get_batch_routing_map(self):
+        """Return a werkzeug Map of the routes generated for the services
+        served by the controller"""
+        generated = _rest_generated_controllers[request.env.cr.dbname].get(
+            self._root_path, {}
+        )
+        routing_map = generated.get("batch_routing_map")
+        if routing_map is None:
+            rules = []
+            for controller in generated.get("controllers", []):
+                for method in vars(controller).values():
+                    if not hasattr(method, "rest_service_name"):
+                        continue
+                    routing = getattr(method, ROUTING_DECORATOR_ATTR)
+                    for route in routing["routes"]:
+                        rules.append(
+                            Rule(route, endpoint=method, methods=routing["methods"])
+                        )
+            # the routes are matched with the converters of odoo
+            routing_map = generated["batch_routing_map"] = Map(
+                rules, converters=request.env["ir.http"]._get_converters()
+            )
+        return routing_map
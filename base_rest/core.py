@@ -14,9 +14,34 @@ _rest_services_routes = collections.defaultdict(set)
 
 _rest_controllers_per_module = collections.defaultdict(list)
 
+# controllers generated for each root path of each database, with the
+# definitions used to generate them
+_rest_generated_controllers = collections.defaultdict(dict)
+
 
 class RestServicesRegistry(dict):
     """Holds a registry of REST services where key is the root of the path on
     which the methods of your ` RestController`` are registred and value is the
     name of the collection on which your ``RestServiceComponent`` implementing
     the business logic of your service is registered."""
+
+
+class RestServicesCache(dict):
+    """Holds values computed from the definition of the REST services
+    (validators, ...) that are costly to rebuild on each request.
+
+    Keys must include the generation at which the value has been computed.
+    The cache is invalidated and a new generation is started each time a REST
+    services registry is (re)built.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.generation = 0
+
+    def invalidate(self):
+        self.generation += 1
+        self.clear()
+
+
+_rest_services_cache = RestServicesCache()
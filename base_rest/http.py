@@ -3,13 +3,16 @@
 # @author Sébastien BEAU <sebastien.beau@akretion.com>
 # License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
 
+import collections
 import datetime
 import decimal
+import gzip
 import json
 import logging
+import re
 import sys
+import tempfile
 import traceback
-from collections import defaultdict
 
 from markupsafe import escape
 from werkzeug.exceptions import (
@@ -20,6 +23,8 @@ from werkzeug.exceptions import (
     NotFound,
     Unauthorized,
 )
+from werkzeug.http import is_resource_modified
+from werkzeug.wsgi import wrap_file
 
 from odoo.exceptions import (
     AccessDenied,
@@ -32,20 +37,60 @@ from odoo.http import (
     CSRF_FREE_METHODS,
     MISSING_CSRF_WARNING,
     Dispatcher,
+    Response,
     SessionExpiredException,
     request,
 )
-from odoo.tools import ustr
+from odoo.tools import date_utils, ustr
 from odoo.tools.config import config
 
+from .metrics import NULL_STAGE_TIMER, StageTimer
+from .rate_limit import check_rate_limit, get_rate_limit_key, get_rate_limit_options
+
 _logger = logging.getLogger(__name__)
 
 try:
     import pyquerystring
-    from accept_language import parse_accept_language
 except (ImportError, IOError) as err:
     _logger.debug(err)
 
+try:
+    import ujson
+except (ImportError, IOError) as err:
+    ujson = None
+    _logger.debug(err)
+
+try:
+    import orjson
+except (ImportError, IOError) as err:
+    orjson = None
+    _logger.debug(err)
+
+try:
+    import brotli
+except (ImportError, IOError) as err:
+    brotli = None
+    _logger.debug(err)
+
+
+def json_default(obj):
+    """Return a serializable version of the objects not supported by the
+    json encoders. The values are encoded as by ``request.make_json_response``
+    (see ``odoo.tools.date_utils.json_default``)."""
+    return date_utils.json_default(obj)
+
+
+def dispatcher_json_default(obj):
+    """Return a serializable version of the objects not supported by the
+    json encoders as encoded by ``RestApiDispatcher.make_json_response`` and
+    the errors: ISO format for the dates and floats for the decimals (see
+    ``JSONEncoder``)."""
+    if isinstance(obj, (datetime.date, datetime.datetime)):
+        return obj.isoformat()
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    raise TypeError("Object of type %s is not JSON serializable" % type(obj).__name__)
+
 
 class JSONEncoder(json.JSONEncoder):
     def default(self, obj):  # pylint: disable=E0202,arguments-differ
@@ -58,16 +103,201 @@ class JSONEncoder(json.JSONEncoder):
         return super(JSONEncoder, self).default(obj)
 
 
+class JSONCodec(object):
+    """Codec used to decode the JSON requests and encode the JSON responses
+
+    This default codec relies on the json module of the standard library and
+    encodes the data as ``request.make_json_response``. The codecs relying on
+    a C-accelerated library fall back on it for the cases not supported by
+    the library.
+    """
+
+    name = "json"
+
+    def dumps(self, data, indent=None, sort_keys=False, default=json_default):
+        return json.dumps(
+            data,
+            ensure_ascii=False,
+            indent=indent,
+            sort_keys=sort_keys,
+            default=default,
+        )
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class UJSONCodec(JSONCodec):
+    """Codec relying on the ujson library
+
+    ujson natively encodes the decimals as numbers instead of strings. This
+    codec is therefore never used by default and must be selected explicitly.
+    A custom ``default`` function is delegated to the standard library.
+    """
+
+    name = "ujson"
+
+    def dumps(self, data, indent=None, sort_keys=False, default=json_default):
+        if default is not json_default:
+            return super().dumps(
+                data, indent=indent, sort_keys=sort_keys, default=default
+            )
+        try:
+            return ujson.dumps(
+                data,
+                ensure_ascii=False,
+                indent=indent or 0,
+                sort_keys=sort_keys,
+                default=default,
+                escape_forward_slashes=False,
+            )
+        except (TypeError, OverflowError):
+            return super().dumps(
+                data, indent=indent, sort_keys=sort_keys, default=default
+            )
+
+    def loads(self, data):
+        try:
+            return ujson.loads(data)
+        except ValueError:
+            # integer exceeding 64 bits, ...
+            return super().loads(data)
+
+
+# integers exceeding 64 bits are decoded as float by orjson
+_LONG_INTEGER = re.compile(r"\d{19}")
+_LONG_INTEGER_BYTES = re.compile(rb"\d{19}")
+
+
+class ORJSONCodec(JSONCodec):
+    """Codec relying on the orjson library
+
+    orjson only supports an indentation of 2 spaces. Others indentations are
+    delegated to the standard library as well as the decoding of the
+    documents which may contain integers exceeding 64 bits.
+    """
+
+    name = "orjson"
+
+    def dumps(self, data, indent=None, sort_keys=False, default=json_default):
+        if indent not in (None, 2):
+            return super().dumps(
+                data, indent=indent, sort_keys=sort_keys, default=default
+            )
+        option = (
+            orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_PASSTHROUGH_DATETIME
+            | orjson.OPT_PASSTHROUGH_DATACLASS
+        )
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(data, default=default, option=option).decode("utf-8")
+        except TypeError:
+            # orjson.JSONEncodeError: integer exceeding 64 bits, ...
+            return super().dumps(
+                data, indent=indent, sort_keys=sort_keys, default=default
+            )
+
+    def loads(self, data):
+        long_integer = _LONG_INTEGER_BYTES if isinstance(data, bytes) else _LONG_INTEGER
+        if long_integer.search(data):
+            return super().loads(data)
+        return orjson.loads(data)
+
+
+# available codecs by name, the first one is the preferred one
+JSON_CODECS = {}
+if orjson:
+    JSON_CODECS[ORJSONCodec.name] = ORJSONCodec()
+JSON_CODECS[JSONCodec.name] = JSONCodec()
+if ujson:
+    JSON_CODECS[UJSONCodec.name] = UJSONCodec()
+
+
+def get_json_codec(name=None):
+    """Return the JSON codec registered for the given name
+
+    If no name is given or if the library required by the codec is not
+    installed, the preferred available codec is returned.
+    """
+    codec = JSON_CODECS.get(name) if name else None
+    if codec is None:
+        if name:
+            _logger.debug("JSON codec %s is not available", name)
+        codec = next(iter(JSON_CODECS.values()))
+    return codec
+
+
+def _gzip_compress(data, level):
+    return gzip.compress(data, compresslevel=min(level, 9), mtime=0)
+
+
+def _brotli_compress(data, level):
+    return brotli.compress(data, quality=level)
+
+
+# Functions compressing the responses by content coding, by order of
+# preference
+COMPRESSORS = collections.OrderedDict()
+if brotli:
+    COMPRESSORS["br"] = _brotli_compress
+COMPRESSORS["gzip"] = _gzip_compress
+
+# The compression options of a route
+CompressionOptions = collections.namedtuple(
+    "CompressionOptions", ["min_size", "level", "encodings"]
+)
+
+
+def get_compression_options(compression):
+    """Normalize the ``compression`` option of a route
+
+    :param compression: True or a dict with the keys 'min_size' (the size in
+                        bytes under which the responses are not compressed,
+                        default 1024), 'level' (the gzip level and brotli
+                        quality, default 5) and 'encodings' (the content
+                        codings by order of preference, all the available
+                        ones by default)
+    :return: CompressionOptions or None
+    """
+    if not compression:
+        return None
+    if not isinstance(compression, dict):
+        compression = {}
+    encodings = [
+        encoding
+        for encoding in compression.get("encodings", COMPRESSORS)
+        if encoding in COMPRESSORS
+    ]
+    return CompressionOptions(
+        min_size=compression.get("min_size", 1024),
+        level=compression.get("level", 5),
+        encodings=encodings,
+    )
+
+
 BLACKLISTED_LOG_PARAMS = ("password",)
 
+# Size above which the encoded items of a streamed response are spooled to
+# disk.
+STREAM_SPOOL_MAX_SIZE = 1024 * 1024
+NDJSON_MIMETYPE = "application/x-ndjson"
+
 
-def wrapJsonException(exception, include_description=False, extra_info=None):
+def wrapJsonException(
+    exception, include_description=False, extra_info=None, json_codec=None
+):
     """Wrap exceptions to be rendered as JSON.
 
     :param exception: an instance of an exception
     :param include_description: include full description in payload
     :param extra_info: dict to provide extra keys to include in payload
+    :param json_codec: the JSONCodec used to encode the payload
     """
+    json_codec = json_codec or get_json_codec()
 
     get_original_headers = exception.get_headers
     exception.traceback = "".join(traceback.format_exception(*sys.exc_info()))
@@ -81,7 +311,7 @@ def wrapJsonException(exception, include_description=False, extra_info=None):
         elif include_description:
             res["description"] = description
         res.update(extra_info or {})
-        return JSONEncoder().encode(res)
+        return json_codec.dumps(res, default=dispatcher_json_default)
 
     def get_headers(environ=None, scope=None):
         """Get a list of headers."""
@@ -128,28 +358,98 @@ class RestApiDispatcher(Dispatcher):
 
     routing_type = "restapi"
 
+    def __init__(self, request):
+        super().__init__(request)
+        self.json_codec = get_json_codec()
+        # measure the stages of the processing of the request if the metrics
+        # are enabled on the route (see base_rest.metrics)
+        self.stage_timer = None
+        # the compression options of the route
+        self.compression = None
+        # the (options, route) of the rate limit not checked yet
+        self.rate_limit = None
+
+    def check_rate_limit(self, routing):
+        """Reject the request if the client exceeds the rate limit of the
+        route (see base_rest.rate_limit)
+
+        Called before the authentication of the request: only the limits by
+        IP are checked. The limits by API key and by authenticated partner
+        are checked once the client is authenticated (see
+        ``check_api_key_rate_limit`` and ``check_partner_rate_limit``).
+        """
+        options = get_rate_limit_options(routing.get("rate_limit"))
+        if not options:
+            return
+        if options.key == "ip":
+            self._consume_rate_limit(options, routing["routes"][0])
+        else:
+            self.rate_limit = (options, routing["routes"][0])
+
+    def check_api_key_rate_limit(self):
+        """Reject the request if the authenticated API key (or the IP if the
+        key isn't authenticated) exceeds the rate limit of the route"""
+        if self.rate_limit and self.rate_limit[0].key == "api_key":
+            (options, route), self.rate_limit = self.rate_limit, None
+            self._consume_rate_limit(options, route)
+
+    def check_partner_rate_limit(self, partner_id):
+        """Reject the request if the authenticated partner exceeds the rate
+        limit of the route"""
+        if self.rate_limit and self.rate_limit[0].key == "partner":
+            (options, route), self.rate_limit = self.rate_limit, None
+            self._consume_rate_limit(options, route, partner_id=partner_id)
+
+    def check_batch_item_rate_limit(self, routing, partner_id=None):
+        """Reject a request of a batch if the client exceeds the rate limit
+        of the route of the request: each request of a batch consumes a
+        token of its route"""
+        options = get_rate_limit_options(routing.get("rate_limit"))
+        if options:
+            self._consume_rate_limit(options, routing["routes"][0], partner_id)
+
+    def _consume_rate_limit(self, options, route, partner_id=None):
+        key = get_rate_limit_key(
+            options,
+            self.request.httprequest,
+            partner_id=partner_id,
+            # set by auth_api_key once the key is authenticated
+            api_key_id=getattr(self.request, "auth_api_key_id", None),
+        )
+        check_rate_limit(self.request.db, route, options, key)
+
     def pre_dispatch(self, rule, args):
         res = super().pre_dispatch(rule, args)
+        routing = rule.endpoint.routing
+        if routing.get("metrics") or routing.get("server_timing"):
+            self.stage_timer = StageTimer()
+        stage_timer = self.stage_timer or NULL_STAGE_TIMER
+        stage_timer.start()
         httprequest = self.request.httprequest
+        self.json_codec = get_json_codec(routing.get("json_codec"))
+        self.compression = get_compression_options(routing.get("compression"))
         self.request.params = args
         if httprequest.mimetype == "application/json":
             data = httprequest.get_data().decode(httprequest.charset)
             if data:
                 try:
-                    self.request.params.update(json.loads(data))
+                    self.request.params.update(self.json_codec.loads(data))
                 except (ValueError, json.decoder.JSONDecodeError) as e:
                     msg = "Invalid JSON data: %s" % str(e)
                     _logger.info("%s: %s", self.request.httprequest.path, msg)
                     raise BadRequest(msg) from e
         elif httprequest.mimetype == "multipart/form-data":
-            # Do not reassign self.params
-            pass
+            # The files are given as FileStorage whose stream is spooled to
+            # the disk by werkzeug when the request is larger than 500KB
+            self.request.params.update(httprequest.form.to_dict())
+            self.request.params.update(httprequest.files.to_dict())
         else:
             # We reparse the query_string in order to handle data structure
             # more information on https://github.com/aventurella/pyquerystring
             self.request.params.update(
                 pyquerystring.parse(httprequest.query_string.decode("utf-8"))
             )
+        stage_timer.stop("parse")
         self._determine_context_lang()
         return res
 
@@ -174,45 +474,35 @@ class RestApiDispatcher(Dispatcher):
                 raise BadRequest("Session expired (invalid CSRF token)")
 
         if self.request.db:
-            return self.request.registry["ir.http"]._dispatch(endpoint)
+            response = self.request.registry["ir.http"]._dispatch(endpoint)
         else:
-            return endpoint(**self.request.params)
+            response = endpoint(**self.request.params)
+        if self.stage_timer:
+            self._record_stage_timer(endpoint.routing, response)
+        return response
+
+    def _record_stage_timer(self, routing, response):
+        if routing.get("metrics"):
+            self.stage_timer.observe()
+        if routing.get("server_timing") and isinstance(response, Response):
+            response.headers["Server-Timing"] = self.stage_timer.server_timing()
 
     def _determine_context_lang(self):
         """
         In this function, we parse the preferred languages specified into the
         'Accept-language' http header. The lang into the context is initialized
         according to the priority of languages into the headers and those
-        available into Odoo.
+        available into Odoo. The resolution is cached by header value.
         """
         accepted_langs = self.request.httprequest.headers.get("Accept-language")
         if not accepted_langs:
             return
-        parsed_accepted_langs = parse_accept_language(accepted_langs)
-        installed_locale_langs = set()
-        installed_locale_by_lang = defaultdict(list)
-        for lang_code, _name in self.request.env["res.lang"].get_installed():
-            installed_locale_langs.add(lang_code)
-            installed_locale_by_lang[lang_code.split("_")[0]].append(lang_code)
-
-        # parsed_acccepted_langs is sorted by priority (higher first)
-        for lang in parsed_accepted_langs:
-            # we first check if a locale (en_GB) is available into the list of
-            # available locales into Odoo
-            locale = None
-            if lang.locale in installed_locale_langs:
-                locale = lang.locale
-            # if no locale language is installed, we look for an available
-            # locale for the given language (en). We return the first one
-            # found for this language.
-            else:
-                locales = installed_locale_by_lang.get(lang.language)
-                if locales:
-                    locale = locales[0]
-            if locale:
-                # reset the context to put our new lang.
-                self.request.update_context(lang=locale)
-                break
+        locale = self.request.env["res.lang"]._base_rest_get_lang_from_accept_language(
+            accepted_langs
+        )
+        if locale:
+            # reset the context to put our new lang.
+            self.request.update_context(lang=locale)
 
     @classmethod
     def is_compatible_with(cls, request):
@@ -222,31 +512,152 @@ class RestApiDispatcher(Dispatcher):
         """Called within an except block to allow converting exceptions
         to abitrary responses. Anything returned (except None) will
         be used as response."""
+        json_codec = self.json_codec
         if isinstance(exception, SessionExpiredException):
             # we don't want to return the login form as plain html page
             # we want to raise a proper exception
-            return wrapJsonException(Unauthorized(ustr(exception)))
+            return wrapJsonException(
+                Unauthorized(ustr(exception)), json_codec=json_codec
+            )
         if isinstance(exception, MissingError):
             extra_info = getattr(exception, "rest_json_info", None)
-            return wrapJsonException(NotFound(ustr(exception)), extra_info=extra_info)
+            return wrapJsonException(
+                NotFound(ustr(exception)), extra_info=extra_info, json_codec=json_codec
+            )
         if isinstance(exception, (AccessError, AccessDenied)):
             extra_info = getattr(exception, "rest_json_info", None)
-            return wrapJsonException(Forbidden(ustr(exception)), extra_info=extra_info)
+            return wrapJsonException(
+                Forbidden(ustr(exception)), extra_info=extra_info, json_codec=json_codec
+            )
         if isinstance(exception, (UserError, ValidationError)):
             extra_info = getattr(exception, "rest_json_info", None)
             return wrapJsonException(
                 BadRequest(exception.args[0]),
                 include_description=True,
                 extra_info=extra_info,
+                json_codec=json_codec,
             )
         if isinstance(exception, HTTPException):
             return exception
         extra_info = getattr(exception, "rest_json_info", None)
-        return wrapJsonException(InternalServerError(exception), extra_info=extra_info)
+        return wrapJsonException(
+            InternalServerError(exception), extra_info=extra_info, json_codec=json_codec
+        )
 
-    def make_json_response(self, data, headers=None, cookies=None):
-        data = JSONEncoder().encode(data)
+    def make_json_response(
+        self, data, headers=None, cookies=None, default=dispatcher_json_default
+    ):
+        """Return a response with the data encoded by the JSON codec of the
+        route
+
+        :param default: the function encoding the values not supported by
+                        the codec. By default, the dates are encoded in ISO
+                        format and the decimals as floats. The results of
+                        the services (see ``RestController.make_response``)
+                        are encoded with ``json_default`` as by
+                        ``request.make_json_response``.
+        """
+        data = self.json_codec.dumps(data, default=default)
         if headers is None:
             headers = {}
         headers["Content-Type"] = "application/json"
-        return self.make_response(data, headers=headers, cookies=cookies)
+        response = self.request.make_response(data, headers=headers, cookies=cookies)
+        return self.compress_response(response)
+
+    def get_response_encoding(self):
+        """Return the content coding of the responses of the route negotiated
+        with the client (Accept-Encoding header) or None"""
+        if not self.compression:
+            return None
+        accept_encodings = self.request.httprequest.accept_encodings
+        return accept_encodings.best_match(self.compression.encodings)
+
+    def compress_response(self, response):
+        """Compress the body of the response with the content coding
+        negotiated with the client if the compression is enabled on the
+        route and the body is large enough"""
+        if not self.compression or response.direct_passthrough:
+            return response
+        response.vary.add("Accept-Encoding")
+        encoding = self.get_response_encoding()
+        if not encoding or "Content-Encoding" in response.headers:
+            return response
+        data = response.get_data()
+        if len(data) < self.compression.min_size:
+            return response
+        response.set_data(COMPRESSORS[encoding](data, self.compression.level))
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+    def is_conditional_request(self):
+        """Whether the request can be answered with a 304 response"""
+        httprequest = self.request.httprequest
+        return httprequest.method in ("GET", "HEAD") and bool(
+            httprequest.if_none_match or httprequest.if_modified_since
+        )
+
+    def is_not_modified(self, etag=None, last_modified=None):
+        """Whether the copy of the client matches the given validators
+        (If-None-Match / If-Modified-Since headers)"""
+        return self.is_conditional_request() and not is_resource_modified(
+            self.request.httprequest.environ, etag=etag, last_modified=last_modified
+        )
+
+    def make_not_modified_response(self, etag=None, last_modified=None):
+        response = Response(status=304)
+        self.set_conditional_headers(response, etag, last_modified)
+        return response
+
+    def set_conditional_headers(self, response, etag=None, last_modified=None):
+        if etag:
+            # the representations of the resource in different content
+            # codings are semantically equivalent
+            response.set_etag(etag, weak=bool(self.get_response_encoding()))
+        if last_modified:
+            response.last_modified = last_modified
+        return response
+
+    def make_json_stream_response(self, items, headers=None, cookies=None):
+        """Encode the items one by one as a JSON array or as NDJSON if the
+        client prefers it (Accept header).
+
+        The cursor of the request is closed once the response is returned,
+        the items must therefore be consumed before. They are encoded into
+        a spooled temporary file streamed to the client so that only one
+        item is held into memory at a time.
+        """
+        accept = self.request.httprequest.accept_mimetypes
+        ndjson = (
+            accept.best_match(["application/json", NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+        )
+        dumps = self.json_codec.dumps
+        fp = tempfile.SpooledTemporaryFile(max_size=STREAM_SPOOL_MAX_SIZE)
+        try:
+            if ndjson:
+                for item in items:
+                    fp.write(dumps(item).encode("utf-8"))
+                    fp.write(b"\n")
+            else:
+                separator = b"["
+                for item in items:
+                    fp.write(separator)
+                    fp.write(dumps(item).encode("utf-8"))
+                    separator = b","
+                fp.write(b"]" if separator == b"," else b"[]")
+        except BaseException:
+            fp.close()
+            raise
+        content_length = fp.tell()
+        fp.seek(0)
+        if headers is None:
+            headers = {}
+        headers["Content-Type"] = NDJSON_MIMETYPE if ndjson else "application/json"
+        headers["Content-Length"] = content_length
+        response = Response(
+            wrap_file(self.request.httprequest.environ, fp),
+            headers=headers,
+            direct_passthrough=True,
+        )
+        for key, value in (cookies or {}).items():
+            response.set_cookie(key, value)
+        return response
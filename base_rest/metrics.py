@@ -0,0 +1,294 @@
+# Copyright 2026 ACSONE SA/NV
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+"""In-process metrics of the REST requests.
+
+The duration of each stage of the processing of the requests (parsing of the
+body, lookup of the service component, input validation, call of the method,
+output validation and encoding of the response) is measured for the routes of
+the controllers with ``_default_metrics`` set (or the methods declared with
+``metrics=True``). The metrics are kept per worker process and exposed in the
+Prometheus text format by the ``metrics`` route of the controllers with
+``_metrics_route`` set. Each sample is labelled with the ``pid`` of the
+process: in prefork mode (``workers > 0``), a scrape only returns the metrics
+of the worker answering it, so the complete metrics are only exposed by the
+threaded server (``workers = 0``).
+"""
+
+import math
+import os
+import threading
+import time
+
+from odoo.http import request
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    math.inf,
+)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_labels(labels, extra=()):
+    labels = tuple(labels) + tuple(extra)
+    if not labels:
+        return ""
+    return "{%s}" % ",".join(
+        '{}="{}"'.format(
+            key,
+            str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"),
+        )
+        for key, value in labels
+    )
+
+
+def _format_value(value):
+    if isinstance(value, int):
+        return str(value)
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value))
+
+
+class Counter(object):
+    """A counter of events by labels"""
+
+    type = "counter"
+
+    def __init__(self, name, description):
+        self.name = name
+        self.description = description
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), value=1):
+        """Increment the counter
+
+        :param labels: a tuple of (name, value) pairs
+        """
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + value
+
+    def get(self, labels=()):
+        return self._values.get(labels, 0)
+
+    def _samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            yield self.name, labels, (), value
+
+
+class Histogram(object):
+    """A histogram of observed values by labels"""
+
+    type = "histogram"
+
+    def __init__(self, name, description, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, labels=()):
+        """Observe a value
+
+        :param labels: a tuple of (name, value) pairs
+        """
+        with self._lock:
+            data = self._values.get(labels)
+            if data is None:
+                data = self._values[labels] = [[0] * len(self.buckets), 0.0, 0]
+            counts = data[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            data[1] += value
+            data[2] += 1
+
+    def get(self, labels=()):
+        """Return the (sum, count) of the observed values"""
+        data = self._values.get(labels)
+        return (data[1], data[2]) if data else (0.0, 0)
+
+    def _samples(self):
+        with self._lock:
+            values = [
+                (labels, list(counts), total, count)
+                for labels, (counts, total, count) in self._values.items()
+            ]
+        for labels, counts, total, count in values:
+            cumulated = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulated += bucket_count
+                yield self.name + "_bucket", labels, (
+                    ("le", _format_value(bound)),
+                ), cumulated
+            yield self.name + "_sum", labels, (), total
+            yield self.name + "_count", labels, (), count
+
+
+class MetricsRegistry(object):
+    """Holds the metrics of the worker process"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, description, **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = self._metrics[name] = cls(name, description, **kwargs)
+        return metric
+
+    def counter(self, name, description):
+        return self._get_or_create(Counter, name, description)
+
+    def histogram(self, name, description, buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(Histogram, name, description, buckets=buckets)
+
+    def to_prometheus(self):
+        """Return the metrics in the Prometheus text exposition format"""
+        # the process is read at each export as the registry is created
+        # before the workers are forked
+        process_labels = (("pid", os.getpid()),)
+        lines = []
+        for name in sorted(self._metrics):
+            metric = self._metrics[name]
+            lines.append("# HELP {} {}".format(name, metric.description))
+            lines.append("# TYPE {} {}".format(name, metric.type))
+            for sample_name, labels, extra, value in metric._samples():
+                lines.append(
+                    "{}{} {}".format(
+                        sample_name,
+                        _format_labels(process_labels + labels, extra),
+                        _format_value(value),
+                    )
+                )
+        return "\n".join(lines) + "\n"
+
+
+_metrics_registry = MetricsRegistry()
+
+STAGE_DURATION_METRIC = "base_rest_stage_duration_seconds"
+
+
+class StageTimer(object):
+    """Measure the duration of the stages of the processing of a request"""
+
+    def __init__(self):
+        self.labels = ()
+        self.durations = []
+        self._start = time.perf_counter()
+
+    def set_labels(self, collection, usage, method):
+        self.labels = (
+            ("collection", collection),
+            ("usage", usage),
+            ("method", method),
+        )
+
+    def start(self):
+        """Start the measure of a stage"""
+        self._start = time.perf_counter()
+
+    def stop(self, stage):
+        """Record the duration of the stage started by the last call to
+        ``start`` (or ``stop``)"""
+        now = time.perf_counter()
+        self.durations.append((stage, now - self._start))
+        self._start = now
+
+    def stage(self, stage):
+        """Return a context manager measuring the duration of a stage"""
+        return _Stage(self, stage)
+
+    def observe(self, registry=None):
+        """Add the recorded durations to the histograms of the registry"""
+        histogram = (registry or _metrics_registry).histogram(
+            STAGE_DURATION_METRIC,
+            "Duration of the stages of the processing of the REST requests",
+        )
+        for stage, duration in self.durations:
+            histogram.observe(duration, self.labels + (("stage", stage),))
+
+    def server_timing(self):
+        """Return the value of the Server-Timing header"""
+        return ", ".join(
+            "{};dur={:.3f}".format(stage, duration * 1000)
+            for stage, duration in self.durations
+        )
+
+
+class _Stage(object):
+    __slots__ = ("timer", "name")
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.timer.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.timer.stop(self.name)
+
+
+class _NullStage(object):
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+class NullStageTimer(object):
+    """Timer used when the metrics are disabled"""
+
+    __slots__ = ()
+    _stage = _NullStage()
+
+    def set_labels(self, collection, usage, method):
+        pass
+
+    def start(self):
+        pass
+
+    def stop(self, stage):
+        pass
+
+    def stage(self, stage):
+        return self._stage
+
+    def __bool__(self):
+        return False
+
+
+NULL_STAGE_TIMER = NullStageTimer()
+
+
+def get_stage_timer():
+    """Return the timer of the current request"""
+    if not request:
+        return NULL_STAGE_TIMER
+    dispatcher = getattr(request, "dispatcher", None)
+    return getattr(dispatcher, "stage_timer", None) or NULL_STAGE_TIMER
@@ -1,2 +1,6 @@
+from . import base
+from . import ir_http
 from . import ir_rule
+from . import res_lang
+from . import rest_async_job
 from . import rest_service_registration
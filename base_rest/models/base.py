@@ -0,0 +1,62 @@
+# Copyright 2026 ACSONE SA/NV
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+
+from odoo import api, models
+
+from ..cache import (
+    _response_cache_models,
+    invalidate_response_cache,
+    signal_response_cache_invalidation,
+)
+
+
+class Base(models.AbstractModel):
+    """Invalidate the cached REST responses depending on the written models
+
+    The methods are inherited by all the models: the models not declared
+    into the cache options of a restapi method only pay for a set lookup.
+    The stored computed fields are written through ``_write``.
+    """
+
+    _inherit = "base"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._invalidate_rest_response_cache()
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        self._invalidate_rest_response_cache()
+        return res
+
+    def _write(self, vals):
+        res = super()._write(vals)
+        self._invalidate_rest_response_cache()
+        return res
+
+    def unlink(self):
+        self._invalidate_rest_response_cache()
+        return super().unlink()
+
+    def _invalidate_rest_response_cache(self):
+        if self._name not in _response_cache_models:
+            return
+        dbname = self.env.cr.dbname
+        invalidate_response_cache(dbname, [self._name])
+        # the responses computed by concurrent transactions before the
+        # commit are also invalidated once committed
+        model_names = self.env.cr.postcommit.data.setdefault(
+            "base_rest.response_cache_models", set()
+        )
+        if not model_names:
+            registry = self.env.registry
+
+            @self.env.cr.postcommit.add
+            def invalidate():
+                invalidate_response_cache(dbname, model_names)
+                # the other workers clear their cache
+                signal_response_cache_invalidation(registry)
+
+        model_names.add(self._name)
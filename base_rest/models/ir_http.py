@@ -0,0 +1,24 @@
+# Copyright 2026 ACSONE SA/NV
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+
+from odoo import models
+from odoo.http import request
+
+from ..http import RestApiDispatcher
+
+
+class IrHttp(models.AbstractModel):
+    _inherit = "ir.http"
+
+    @classmethod
+    def _authenticate(cls, endpoint):
+        if not isinstance(request.dispatcher, RestApiDispatcher):
+            return super()._authenticate(endpoint)
+        # reject the requests exceeding the rate limit by IP of the route
+        # before the authentication
+        request.dispatcher.check_rate_limit(endpoint.routing)
+        try:
+            return super()._authenticate(endpoint)
+        finally:
+            # the failed authentications are counted by IP
+            request.dispatcher.check_api_key_rate_limit()
@@ -1,7 +1,63 @@
 # Copyright 2021 ACSONE SA/NV
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
-from odoo import api, models
+import ast
+
+from odoo import api, models, tools
+
+
+class _AuthenticatedPartnerPlaceholder(object):
+    """Stands for the authenticated partner into the domains of the record
+    rules computed once for all the partners"""
+
+    __slots__ = ()
+
+    def __repr__(self):
+        return "authenticated_partner_id"
+
+
+AUTHENTICATED_PARTNER_PLACEHOLDER = _AuthenticatedPartnerPlaceholder()
+
+
+def _is_bindable_domain(domain_force):
+    """Whether ``authenticated_partner_id`` is only used as the value (or an
+    item of the value) of the leaves of the domain of a rule"""
+    try:
+        node = ast.parse(domain_force.strip(), mode="eval").body
+    except SyntaxError:
+        return False
+    return _is_bindable_node(node, False)
+
+
+def _is_bindable_node(node, is_value):
+    if isinstance(node, ast.Name) and node.id == "authenticated_partner_id":
+        return is_value
+    if isinstance(node, (ast.List, ast.Tuple)):
+        if is_value:
+            return all(_is_bindable_node(elt, True) for elt in node.elts)
+        if _is_leaf_node(node):
+            return _is_bindable_node(node.elts[0], False) and _is_bindable_node(
+                node.elts[2], True
+            )
+    return all(_is_bindable_node(child, False) for child in ast.iter_child_nodes(node))
+
+
+def _is_leaf_node(node):
+    return (
+        len(node.elts) == 3
+        and isinstance(node.elts[1], ast.Constant)
+        and isinstance(node.elts[1].value, str)
+    )
+
+
+def _bind_authenticated_partner(domain, partner_id):
+    if domain is AUTHENTICATED_PARTNER_PLACEHOLDER:
+        return partner_id
+    if isinstance(domain, (list, tuple)):
+        return type(domain)(
+            _bind_authenticated_partner(item, partner_id) for item in domain
+        )
+    return domain
 
 
 class IrRule(models.Model):
@@ -9,6 +65,12 @@ class IrRule(models.Model):
 
     This come from the env context, which is populated by the base_rest service layer
     context provider.
+
+    When the authenticated partner is only used as the value of the leaves of
+    the domains of the rules (ex: ``[('partner_id', '=',
+    authenticated_partner_id)]``), the domains are computed and cached once
+    for all the partners with a placeholder bound to the authenticated partner
+    each time they are requested. Otherwise, they are cached by partner.
     """
 
     _inherit = "ir.rule"
@@ -22,6 +84,37 @@ class IrRule(models.Model):
             ]
         return ctx
 
-    def _compute_domain_keys(self):
-        """Return the list of context keys to use for caching ``_compute_domain``."""
-        return super()._compute_domain_keys() + ["authenticated_partner_id"]
+    @api.model
+    def _compute_domain(self, model_name, mode="read"):
+        partner_id = self.env.context.get("authenticated_partner_id")
+        if (
+            not partner_id
+            or partner_id is AUTHENTICATED_PARTNER_PLACEHOLDER
+            or not self._is_authenticated_partner_bindable()
+        ):
+            return super()._compute_domain(model_name, mode=mode)
+        domain = super(
+            IrRule,
+            self.with_context(
+                authenticated_partner_id=AUTHENTICATED_PARTNER_PLACEHOLDER
+            ),
+        )._compute_domain(model_name, mode=mode)
+        return _bind_authenticated_partner(domain, partner_id)
+
+    def _compute_domain_context_values(self):
+        yield from super()._compute_domain_context_values()
+        partner_id = self.env.context.get("authenticated_partner_id")
+        if partner_id is AUTHENTICATED_PARTNER_PLACEHOLDER:
+            # the same domains are computed for all the partners
+            partner_id = True
+        yield partner_id
+
+    @api.model
+    @tools.ormcache()
+    def _is_authenticated_partner_bindable(self):
+        """Whether the authenticated partner can be bound to the domains of
+        the rules computed once for all the partners"""
+        rules = self.sudo().search(
+            [("domain_force", "like", "authenticated_partner_id")]
+        )
+        return all(_is_bindable_domain(rule.domain_force) for rule in rules)
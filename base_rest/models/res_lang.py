@@ -0,0 +1,55 @@
+# Copyright 2026 ACSONE SA/NV
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+
+import logging
+from collections import defaultdict
+
+from odoo import api, models, tools
+
+_logger = logging.getLogger(__name__)
+
+try:
+    from accept_language import parse_accept_language
+except (ImportError, IOError) as err:
+    _logger.debug(err)
+
+
+class ResLang(models.Model):
+    _inherit = "res.lang"
+
+    @api.model
+    @tools.ormcache("accept_language")
+    def _base_rest_get_lang_from_accept_language(self, accept_language):
+        """Get the language from the Accept-Language header.
+
+        The result is cached. The cache is cleared when a language is
+        installed or modified.
+
+        :param accept_language: The Accept-Language header.
+        :return: The language code.
+        """
+        if not accept_language:
+            return
+        parsed_accepted_langs = parse_accept_language(accept_language)
+        installed_locale_langs = set()
+        installed_locale_by_lang = defaultdict(list)
+        for lang_code, _name in self.get_installed():
+            installed_locale_langs.add(lang_code)
+            installed_locale_by_lang[lang_code.split("_")[0]].append(lang_code)
+
+        # parsed_acccepted_langs is sorted by priority (higher first)
+        for lang in parsed_accepted_langs:
+            # we first check if a locale (en_GB) is available into the list of
+            # available locales into Odoo
+            locale = None
+            if lang.locale in installed_locale_langs:
+                locale = lang.locale
+            # if no locale language is installed, we look for an available
+            # locale for the given language (en). We return the first one
+            # found for this language.
+            else:
+                locales = installed_locale_by_lang.get(lang.language)
+                if locales:
+                    locale = locales[0]
+            if locale:
+                return locale
@@ -0,0 +1,313 @@
+# Copyright 2026 ACSONE SA/NV
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+"""
+
+REST Asynchronous Jobs
+======================
+
+The calls to the methods declared with ``restapi.method(run_async=True)`` are
+stored as ``rest.async.job`` records. In threaded mode, once the transaction
+of the request is committed, the job is submitted to a pool of threads of the
+server running it with its own cursor. The jobs left pending by a restarted
+server are run by a cron.
+
+In multi-process mode (``workers > 0``), the HTTP workers can be recycled at
+any time (request or memory limits): the jobs are not run by the HTTP worker
+but by the cron, triggered when the job is created.
+
+The jobs still started after ``async_job_timeout`` seconds (the process
+running them has been killed) are marked as failed by the cron.
+
+The size of the pool of threads and the timeout are configured into the
+'base_rest' section of the odoo config file::
+
+    [base_rest]
+    async_job_workers = 2
+    async_job_timeout = 3600
+
+"""
+import datetime
+import json
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.exceptions import BadRequest, HTTPException
+
+from odoo import SUPERUSER_ID, _, api, fields, models
+from odoo.exceptions import UserError
+from odoo.http import Response
+from odoo.modules.registry import Registry
+from odoo.tools.config import config
+
+from odoo.addons.component.core import WorkContext
+
+from ..controllers.main import _PseudoCollection
+from ..core import _rest_services_databases
+from ..http import json_default
+
+_logger = logging.getLogger(__name__)
+
+# the context keys given to the env of the jobs
+ASYNC_JOB_CONTEXT_KEYS = ("lang", "tz", "allowed_company_ids")
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=int(config.get_misc("base_rest", "async_job_workers", 2)),
+                thread_name_prefix="rest_async_job",
+            )
+        return _executor
+
+
+def _run_job(dbname, job_id):
+    threading.current_thread().dbname = dbname
+    try:
+        registry = Registry(dbname).check_signaling()
+        with registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            env["rest.async.job"].browse(job_id)._claim_and_run()
+        registry.signal_changes()
+    except Exception:
+        _logger.exception("Failed to run the REST asynchronous job %s", job_id)
+
+
+class RestAsyncJob(models.Model):
+    """Call to a REST method run asynchronously"""
+
+    _name = "rest.async.job"
+    _description = "REST Asynchronous Job"
+    _order = "id desc"
+
+    # number of days during which the finished jobs are kept
+    _retention_days = 7
+    # delay after which the pending jobs are run by the cron
+    _pending_delay = datetime.timedelta(minutes=1)
+
+    uuid = fields.Char(
+        required=True,
+        readonly=True,
+        index=True,
+        copy=False,
+        default=lambda self: str(uuid.uuid4()),
+    )
+    root_path = fields.Char(required=True, readonly=True)
+    collection_name = fields.Char(required=True, readonly=True)
+    usage = fields.Char(required=True, readonly=True)
+    method_name = fields.Char(required=True, readonly=True)
+    args = fields.Text(readonly=True)
+    params = fields.Text(readonly=True)
+    context = fields.Text(readonly=True)
+    user_id = fields.Many2one(
+        "res.users", required=True, readonly=True, ondelete="cascade"
+    )
+    authenticated_partner_id = fields.Many2one(
+        "res.partner", readonly=True, ondelete="cascade"
+    )
+    state = fields.Selection(
+        [
+            ("pending", "Pending"),
+            ("started", "Started"),
+            ("done", "Done"),
+            ("failed", "Failed"),
+        ],
+        required=True,
+        readonly=True,
+        index=True,
+        default="pending",
+    )
+    result = fields.Text(readonly=True)
+    error = fields.Text(readonly=True)
+    date_started = fields.Datetime(readonly=True)
+    date_done = fields.Datetime(readonly=True)
+
+    _sql_constraints = [("uuid_uniq", "unique(uuid)", "The job id must be unique")]
+
+    @api.model
+    def _create_job(self, service, method_name, args, params):
+        """Store the call to the method of the service and submit it to the
+        pool of threads once the transaction is committed"""
+        context = service.env.context
+        try:
+            args = json.dumps(list(args))
+            params = json.dumps(params)
+        except (TypeError, ValueError) as e:
+            raise BadRequest(
+                "The params of an asynchronous method must be JSON serializable"
+            ) from e
+        job = self.create(
+            {
+                "root_path": service.controller._root_path,
+                "collection_name": service._collection,
+                "usage": service._usage,
+                "method_name": method_name,
+                "args": args,
+                "params": params,
+                "context": json.dumps(
+                    {k: context[k] for k in ASYNC_JOB_CONTEXT_KEYS if k in context}
+                ),
+                "user_id": service.env.uid,
+                "authenticated_partner_id": getattr(
+                    service.work, "authenticated_partner_id", None
+                ),
+            }
+        )
+        if config["workers"]:
+            # run by the cron worker once the transaction is committed
+            self.env.ref(
+                "base_rest.ir_cron_run_pending_rest_async_jobs"
+            ).sudo()._trigger()
+            return job
+        dbname = self.env.cr.dbname
+        job_id = job.id
+        self.env.cr.postcommit.add(
+            lambda: _get_executor().submit(_run_job, dbname, job_id)
+        )
+        return job
+
+    def _claim_and_run(self):
+        """Run the job unless it has already been claimed by another worker"""
+        self.ensure_one()
+        self.env.cr.execute(
+            "UPDATE rest_async_job "
+            "SET state = 'started', date_started = now() at time zone 'UTC' "
+            "WHERE id = %s AND state = 'pending' RETURNING id",
+            (self.id,),
+        )
+        if not self.env.cr.fetchone():
+            return False
+        self.env.cr.commit()  # pylint: disable=invalid-commit
+        self.invalidate_recordset()
+        self._run()
+        return True
+
+    def _run(self):
+        self.ensure_one()
+        try:
+            with self.env.cr.savepoint():
+                result = self._dispatch()
+                if isinstance(result, Response):
+                    raise UserError(_("Asynchronous methods must return JSON"))
+                result = json.dumps(result, default=json_default)
+        except Exception as e:
+            _logger.info("REST asynchronous job %s failed", self.uuid, exc_info=True)
+            self.write(
+                {
+                    "state": "failed",
+                    "error": self._get_error_message(e),
+                    "date_done": fields.Datetime.now(),
+                }
+            )
+        else:
+            self.write(
+                {"state": "done", "result": result, "date_done": fields.Datetime.now()}
+            )
+
+    def _dispatch(self):
+        """Call the method of the service with the user, the context and the
+        authenticated partner of the request"""
+        services_registry = _rest_services_databases.get(self.env.cr.dbname, {})
+        controller_def = services_registry.get(self.root_path)
+        if not controller_def:
+            raise UserError(_("No REST controller served at %s") % self.root_path)
+        controller = controller_def["controller_class"]()
+        authenticated_partner_id = self.authenticated_partner_id.id or None
+        env = self.env(
+            user=self.user_id.id,
+            su=False,
+            context=dict(
+                json.loads(self.context or "{}"),
+                authenticated_partner_id=authenticated_partner_id,
+            ),
+        )
+        work = WorkContext(
+            model_name="rest.service.registration",
+            collection=_PseudoCollection(self.collection_name, env),
+            request=None,
+            controller=controller,
+            authenticated_partner_id=authenticated_partner_id,
+            async_job=self,
+        )
+        service = controller._get_component(work, self.usage)
+        return service.dispatch(
+            self.method_name,
+            *json.loads(self.args or "[]"),
+            params=json.loads(self.params or "{}")
+        )
+
+    def _get_error_message(self, exception):
+        if isinstance(exception, UserError):
+            return exception.args[0]
+        if isinstance(exception, HTTPException):
+            return exception.description or exception.name
+        return "Internal Server Error"
+
+    def _get_status(self):
+        """Return the state of the job and its result once done"""
+        self.ensure_one()
+        status = {"id": self.uuid, "state": self.state}
+        if self.state == "done":
+            status["result"] = json.loads(self.result)
+        elif self.state == "failed":
+            status["error"] = self.error
+        return status
+
+    def _get_status_path(self):
+        self.ensure_one()
+        return "{}/async_job/{}".format(self.root_path.rstrip("/"), self.uuid)
+
+    @api.model
+    def _get_started_timeout(self):
+        """Return the delay after which a started job is considered as
+        interrupted"""
+        return datetime.timedelta(
+            seconds=int(config.get_misc("base_rest", "async_job_timeout", 3600))
+        )
+
+    @api.model
+    def _cron_run_pending_jobs(self, limit=100):
+        """Run the pending jobs: all of them in multi-process mode, else the
+        ones left pending by a restarted server. The jobs interrupted while
+        started are marked as failed."""
+        now = fields.Datetime.now()
+        self._fail_interrupted_jobs(now - self._get_started_timeout())
+        domain = [("state", "=", "pending")]
+        if not config["workers"]:
+            domain.append(("create_date", "<", now - self._pending_delay))
+        jobs = self.search(domain, order="id", limit=limit)
+        for job in jobs:
+            job._claim_and_run()
+            self.env.cr.commit()  # pylint: disable=invalid-commit
+
+    @api.model
+    def _fail_interrupted_jobs(self, started_before):
+        jobs = self.search(
+            [("state", "=", "started"), ("date_started", "<", started_before)]
+        )
+        if jobs:
+            _logger.warning(
+                "REST asynchronous jobs interrupted: %s", ", ".join(jobs.mapped("uuid"))
+            )
+            jobs.write(
+                {
+                    "state": "failed",
+                    "error": _("The job has been interrupted"),
+                    "date_done": fields.Datetime.now(),
+                }
+            )
+
+    @api.autovacuum
+    def _gc_finished_jobs(self):
+        limit_date = fields.Datetime.now() - datetime.timedelta(
+            days=self._retention_days
+        )
+        self.search(
+            [("state", "in", ("done", "failed")), ("date_done", "<", limit_date)]
+        ).unlink()
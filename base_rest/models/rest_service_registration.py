@@ -12,8 +12,7 @@ This code is inspired by ``odoo.addons.component.builder.ComponentBuilder``
 """
 import inspect
 import logging
-
-from werkzeug.routing import Map, Rule
+import time
 
 import odoo
 from odoo import http, models
@@ -21,11 +20,15 @@ from odoo import http, models
 from odoo.addons.component.core import WorkContext
 
 from .. import restapi
+from ..apispec.restapi_method_route_plugin import RE_URL
+from ..cache import RESPONSE_CACHE_SIGNALING_SEQUENCE
 from ..components.service import BaseRestService
 from ..controllers.main import _PseudoCollection
 from ..core import (
     RestServicesRegistry,
     _rest_controllers_per_module,
+    _rest_generated_controllers,
+    _rest_services_cache,
     _rest_services_databases,
     _rest_services_routes,
 )
@@ -48,6 +51,22 @@ class RestServiceRegistration(models.AbstractModel):
     _name = "rest.service.registration"
     _description = "REST Services Registration Model"
 
+    def init(self):
+        # the sequence signaling the invalidations of the cached responses
+        # to the other workers (see base_rest.cache)
+        self.env.cr.execute(
+            "SELECT 1 FROM pg_class WHERE relkind = 'S' AND relname = %s",
+            (RESPONSE_CACHE_SIGNALING_SEQUENCE,),
+        )
+        if not self.env.cr.fetchone():
+            self.env.cr.execute(
+                "CREATE SEQUENCE %s INCREMENT BY 1 START WITH 1"
+                % RESPONSE_CACHE_SIGNALING_SEQUENCE
+            )
+            self.env.cr.execute(
+                "SELECT nextval(%s)", (RESPONSE_CACHE_SIGNALING_SEQUENCE,)
+            )
+
     def _register_hook(self):
         # This method is called by Odoo when the registry is built,
         # so in case the registry is rebuilt (cache invalidation, ...),
@@ -67,15 +86,134 @@ class RestServiceRegistration(models.AbstractModel):
         self._build_controllers_routes(services_registry)
 
     def _build_controllers_routes(self, services_registry):
+        """Generate the controllers serving the services of each collection
+
+        The controllers generated for a collection are kept as long as the
+        definitions of its controller and components are unchanged (same
+        installed addons). Only the collections impacted by a change are
+        regenerated when the registry is rebuilt.
+        """
+        generated_controllers = _rest_generated_controllers[self.env.cr.dbname]
         for controller_def in services_registry.values():
-            for service in self._get_services(controller_def["collection_name"]):
+            start = time.perf_counter()
+            root_path = controller_def["root_path"]
+            # an invalid default is rejected when the services are registered
+            restapi.get_output_validation_policy(
+                controller_def["controller_class"]._default_output_validation
+            )
+            services = self._get_services(controller_def["collection_name"])
+            for service in services:
                 self._prepare_non_decorated_endpoints(service)
-                self._build_controller(service, controller_def)
+                self._prepare_dispatch_plans(service)
+            signature = self._get_controllers_signature(controller_def, services)
+            previous = generated_controllers.get(root_path)
+            if (
+                previous
+                and previous["signature"] == signature
+                and self._are_controllers_registered(previous["controllers"])
+            ):
+                for controller in previous["controllers"]:
+                    self.env.registry._init_modules.add(controller._module)
+                _logger.info(
+                    "REST services of collection %s (%s) unchanged: "
+                    "%s controllers kept in %.1f ms",
+                    controller_def["collection_name"],
+                    root_path,
+                    len(previous["controllers"]),
+                    (time.perf_counter() - start) * 1000,
+                )
+                continue
+            if previous:
+                self._unregister_controllers(previous["controllers"])
+            controllers = [
+                self._build_controller(service, controller_def) for service in services
+            ]
+            controller_class = controller_def["controller_class"]
+            if controller_class._batch_enabled:
+                controllers.append(
+                    self._build_route_controller(
+                        controller_def, "batch", "POST", "_process_batch"
+                    )
+                )
+            if controller_class._metrics_route:
+                controllers.append(
+                    self._build_route_controller(
+                        controller_def, "metrics", "GET", "_process_metrics"
+                    )
+                )
+            if self._has_async_methods(services):
+                controllers.append(
+                    self._build_route_controller(
+                        controller_def,
+                        "async_job",
+                        "GET",
+                        "_process_async_job",
+                        path="async_job/<string:job_id>",
+                    )
+                )
+            generated_controllers[root_path] = {
+                "signature": signature,
+                "modules": sorted({cls._module for cls in signature[1]}),
+                "controllers": controllers,
+            }
+            _logger.info(
+                "REST services of collection %s (%s) registered in %.1f ms: "
+                "%s services",
+                controller_def["collection_name"],
+                root_path,
+                (time.perf_counter() - start) * 1000,
+                len(services),
+            )
+
+    def _has_async_methods(self, services):
+        return any(
+            getattr(method, ROUTING_DECORATOR_ATTR).get("run_async")
+            for service in services
+            for _name, method in _inspect_cached_methods(service.__class__)
+            if hasattr(method, ROUTING_DECORATOR_ATTR)
+        )
+
+    def _get_controllers_signature(self, controller_def, services):
+        """Return the definitions used to generate the controllers of a
+        collection: the base controller class and the component classes
+        defined into the addons from which the services and the validator
+        component are built. (The final component classes are rebuilt
+        each time the component registry is rebuilt.)
+        """
+        components = [service.__class__ for service in services]
+        if services:
+            validator = services[0].component(usage="cerberus.validator")
+            components.append(validator.__class__)
+        classes = frozenset(
+            cls
+            for component in components
+            for cls in component.__mro__
+            if getattr(cls, "_register", False)
+        )
+        return controller_def["controller_class"], classes
+
+    def _are_controllers_registered(self, controllers):
+        return all(
+            controller in http.Controller.children_classes.get(controller._module, [])
+            for controller in controllers
+        )
+
+    def _unregister_controllers(self, controllers):
+        for controller in controllers:
+            registered = http.Controller.children_classes.get(controller._module, [])
+            if controller in registered:
+                registered.remove(controller)
 
     def _prepare_non_decorated_endpoints(self, service):
         # Autogenerate routing info where missing
         RestApiMethodTransformer(service).fix()
 
+    def _prepare_dispatch_plans(self, service):
+        # Compute the dispatch plan of the exposed methods once for all
+        for name, method in _inspect_cached_methods(service.__class__):
+            if hasattr(method, ROUTING_DECORATOR_ATTR):
+                service._get_dispatch_plan(name)
+
     def _build_controller(self, service, controller_def):
         _logger.debug("Build service %s for controller_def %s", service, controller_def)
         base_controller_cls = controller_def["controller_class"]
@@ -86,23 +224,60 @@ class RestServiceRegistration(models.AbstractModel):
 
         # generate an addon name used to register our new controller for
         # the current database
-        addon_name = base_controller_cls._module
         identifier = "{}_{}_{}".format(
             self.env.cr.dbname,
             service._collection.replace(".", "_"),
             service._usage.replace(".", "_"),
         )
         base_controller_cls._identifier = identifier
+        self._register_controller(ctrl_cls, base_controller_cls)
+        # the methods of the base controller are inspected once, the
+        # generated ones are known
+        methods = _inspect_cached_methods(base_controller_cls) + sorted(
+            (name, method)
+            for name, method in vars(ctrl_cls).items()
+            if hasattr(method, ROUTING_DECORATOR_ATTR)
+        )
+        self._apply_defaults_to_controller_routes(
+            controller_class=ctrl_cls, methods=methods
+        )
+        return ctrl_cls
+
+    def _build_route_controller(
+        self, controller_def, name, http_method, process_method_name, path=None
+    ):
+        _logger.debug("Build %s route for controller_def %s", name, controller_def)
+        base_controller_cls = controller_def["controller_class"]
+        generator = RestApiRouteControllerGenerator(
+            base_controller_cls, name, http_method, process_method_name, path=path
+        )
+        ctrl_cls = generator.generate()
+        ctrl_cls._identifier = "{}_{}_{}".format(
+            self.env.cr.dbname,
+            controller_def["collection_name"].replace(".", "_"),
+            name,
+        )
+        self._register_controller(ctrl_cls, base_controller_cls)
+        methods = _inspect_cached_methods(base_controller_cls) + [
+            (generator.method_name, getattr(ctrl_cls, generator.method_name))
+        ]
+        self._apply_defaults_to_controller_routes(
+            controller_class=ctrl_cls, methods=methods
+        )
+        return ctrl_cls
+
+    def _register_controller(self, ctrl_cls, base_controller_cls):
+        addon_name = base_controller_cls._module
         # put our new controller into the new addon module
         ctrl_cls.__module__ = "odoo.addons.{}".format(addon_name)
 
         self.env.registry._init_modules.add(addon_name)
 
         # register our conroller into the list of available controllers
+        ctrl_cls._module = addon_name
         http.Controller.children_classes[addon_name].append(ctrl_cls)
-        self._apply_defaults_to_controller_routes(controller_class=ctrl_cls)
 
-    def _apply_defaults_to_controller_routes(self, controller_class):
+    def _apply_defaults_to_controller_routes(self, controller_class, methods=None):
         """
         Apply default routes properties defined on the controller_class to
         routes where properties are missing
@@ -112,21 +287,40 @@ class RestServiceRegistration(models.AbstractModel):
         applied on every routes (cfr @route odoo's decorator).
         This auth attribute should be applied only if the route doesn't already
         define it.
+        :param methods: list of (name, method) of the controller_class to
+                        process. All the methods of the class by default.
         :return:
         """
-        for _name, method in _inspect_methods(controller_class):
+        if methods is None:
+            methods = _inspect_methods(controller_class)
+        for _name, method in methods:
             routing = getattr(method, ROUTING_DECORATOR_ATTR, None)
             if not routing:
                 continue
             self._apply_default_auth_if_not_set(controller_class, routing)
             self._apply_default_if_not_set(controller_class, routing, "csrf")
             self._apply_default_if_not_set(controller_class, routing, "save_session")
+            for attr_name in (
+                "json_codec",
+                "metrics",
+                "server_timing",
+                "compression",
+                "rate_limit",
+            ):
+                self._apply_default_if_not_set(
+                    controller_class, routing, attr_name, ignore_none=True
+                )
             self._apply_default_cors_if_not_set(controller_class, routing)
 
-    def _apply_default_if_not_set(self, controller_class, routing, attr_name):
+    def _apply_default_if_not_set(
+        self, controller_class, routing, attr_name, ignore_none=False
+    ):
         default_attr_name = "_default_" + attr_name
         if hasattr(controller_class, default_attr_name) and attr_name not in routing:
-            routing[attr_name] = getattr(controller_class, default_attr_name)
+            default = getattr(controller_class, default_attr_name)
+            if default is None and ignore_none:
+                return
+            routing[attr_name] = default
 
     def _apply_default_auth_if_not_set(self, controller_class, routing):
         default_attr_name = "_default_auth"
@@ -235,6 +429,9 @@ class RestServiceRegistration(models.AbstractModel):
     def _init_global_registry(self):
         services_registry = RestServicesRegistry()
         _rest_services_databases[self.env.cr.dbname] = services_registry
+        # values computed from the previous services definitions are no
+        # more valid
+        _rest_services_cache.invalidate()
         return services_registry
 
     def _register_rest_route(self, route_path):
@@ -259,14 +456,19 @@ class RestApiMethodTransformer(object):
         self._service = service
 
     def fix(self):
+        service_cls = self._service.__class__
         methods_to_fix = []
-        for name, method in _inspect_methods(self._service.__class__):
+        for name, method in _inspect_cached_methods(service_cls):
             if not self._is_public_api_method(name):
                 continue
             if not hasattr(method, ROUTING_DECORATOR_ATTR):
                 methods_to_fix.append(method)
         for method in methods_to_fix:
             self._fix_method_decorator(method)
+        bulk_methods = self._add_bulk_methods()
+        if methods_to_fix or bulk_methods:
+            # refresh the inspected methods with the decorated ones
+            _reset_cached_methods(service_cls)
 
     def _is_public_api_method(self, method_name):
         if method_name.startswith("_"):
@@ -288,6 +490,55 @@ class RestApiMethodTransformer(object):
         )(getattr(self._service.__class__, method_name))
         setattr(self._service.__class__, method_name, decorated_method)
 
+    def _add_bulk_methods(self):
+        """Generate the bulk_<name> methods serving the bulk routes of the
+        methods listed into the ``_bulk_methods`` of the service
+        :return: the names of the generated methods
+        """
+        service_cls = self._service.__class__
+        added = []
+        for method_name in service_cls._bulk_methods:
+            bulk_method_name = "bulk_{}".format(method_name)
+            if hasattr(service_cls, bulk_method_name):
+                continue
+            method = getattr(service_cls, method_name, None)
+            routing = getattr(method, ROUTING_DECORATOR_ATTR, None)
+            if not routing:
+                _logger.warning(
+                    "No bulk route generated for %s of service %s: "
+                    "it's not a REST method",
+                    method_name,
+                    self._service._name,
+                )
+                continue
+            setattr(
+                service_cls,
+                bulk_method_name,
+                self._make_bulk_method(method_name, method, routing),
+            )
+            added.append(bulk_method_name)
+        return added
+
+    def _make_bulk_method(self, method_name, method, routing):
+        def bulk_method(self, items):
+            return self._dispatch_bulk(method_name, items)
+
+        bulk_method_name = "bulk_{}".format(method_name)
+        bulk_method.__name__ = bulk_method.__qualname__ = bulk_method_name
+        input_param = routing["input_param"]
+        return restapi.method(
+            [("/{}".format(bulk_method_name), "POST")],
+            input_param=restapi.BulkItems(
+                input_param
+                if isinstance(input_param, restapi.RestMethodParam)
+                else None,
+                with_id="_id" in inspect.signature(method).parameters,
+                max_items=self._service._bulk_max_items,
+            ),
+            output_param=restapi.CerberusValidator(restapi.BULK_RESULTS_SCHEMA),
+            **{key: routing[key] for key in ("auth", "cors", "csrf") if key in routing}
+        )(bulk_method)
+
     def _method_to_routes(self, method):
         """
         Generate the restapi.method's routes
@@ -386,42 +637,40 @@ class RestApiServiceControllerGenerator(object):
         :return: A dictionary of method name : method
         """
         methods = {}
-        _globals = {}
         root_path = self._base_controller._root_path
         path_sep = ""
         if root_path[-1] != "/":
             path_sep = "/"
         root_path = "{}{}{}".format(root_path, path_sep, self._service._usage)
-        for name, method in _inspect_methods(self._service.__class__):
+        for name, method in _inspect_cached_methods(self._service.__class__):
             routing = getattr(method, ROUTING_DECORATOR_ATTR, None)
             if routing is None:
                 continue
             for routes, http_method in routing["routes"]:
                 method_name = "{}_{}".format(http_method.lower(), name)
                 default_route = routes[0]
-                rule = Rule(default_route)
-                Map(rules=[rule])
-                if rule.arguments:
-                    method = METHOD_TMPL_WITH_ARGS.format(
-                        method_name=method_name,
-                        service_name=self._service_name,
-                        service_method_name=name,
-                        args=", ".join([c[1] for c in rule._trace if c[0]]),
-                    )
-                else:
-                    method = METHOD_TMPL.format(
-                        method_name=method_name,
-                        service_name=self._service_name,
-                        service_method_name=name,
-                    )
-                exec(method, _globals)
-                method_exec = _globals[method_name]
+                method_exec = _make_controller_method(
+                    method_name,
+                    self._service_name,
+                    name,
+                    tuple(RE_URL.findall(default_route)),
+                )
                 route_params = dict(
                     route=["{}{}".format(root_path, r) for r in routes],
                     methods=[http_method],
                     type="restapi",
                 )
-                for attr in {"auth", "cors", "csrf", "save_session"}:
+                for attr in {
+                    "auth",
+                    "cors",
+                    "csrf",
+                    "save_session",
+                    "json_codec",
+                    "metrics",
+                    "server_timing",
+                    "compression",
+                    "rate_limit",
+                }:
                     if attr in routing:
                         route_params[attr] = routing[attr]
                 method_exec = http.route(**route_params)(method_exec)
@@ -429,24 +678,107 @@ class RestApiServiceControllerGenerator(object):
         return methods
 
 
-METHOD_TMPL = """
-def {method_name}(self, collection=None, **kwargs):
-    return self._process_method(
-        "{service_name}",
-        "{service_method_name}",
-        collection=collection,
-        params=kwargs
-    )
-"""
+class RestApiRouteControllerGenerator(object):
+    """
+    An object helper used to generate the http.Controller serving a route
+    of a base controller processed by one of its methods (the batch route,
+    the metrics route, ...)
+
+    :param path: the path of the route relative to the root path of the
+                 controller (the name of the route by default). The
+                 arguments extracted from the path are given to the method
+                 as keyword args.
+    """
+
+    def __init__(
+        self, base_controller, name, http_method, process_method_name, path=None
+    ):
+        self._base_controller = base_controller
+        self._name = name
+        self._http_method = http_method
+        self._process_method_name = process_method_name
+        self._path = path or name
 
+    @property
+    def method_name(self):
+        return "{}_{}".format(self._http_method.lower(), self._name)
 
-METHOD_TMPL_WITH_ARGS = """
-def {method_name}(self, {args}, collection=None, **kwargs):
-    return self._process_method(
-        "{service_name}",
-        "{service_method_name}",
-        *[{args}],
-        collection=collection,
-        params=kwargs
+    def generate(self):
+        """
+        :return: A new controller child of base_controller defining the
+        route {root_path}{path}.
+        """
+        root_path = self._base_controller._root_path
+        path_sep = ""
+        if root_path[-1] != "/":
+            path_sep = "/"
+        process_method_name = self._process_method_name
+
+        def method(self, collection=None, **kwargs):
+            return getattr(self, process_method_name)(collection=collection, **kwargs)
+
+        method.__name__ = method.__qualname__ = self.method_name
+        method = http.route(
+            route="{}{}{}".format(root_path, path_sep, self._path),
+            methods=[self._http_method],
+            type="restapi",
+        )(method)
+        controller = type(
+            "{}{}".format(self._base_controller.__name__, self._name.title()),
+            (self._base_controller,),
+            {self.method_name: method},
+        )
+        controller._generated = True
+        return controller
+
+
+def _make_controller_method(method_name, service_name, service_method_name, args):
+    """Return a controller method forwarding the requests to the service method
+
+    :param args: names of the arguments extracted from the route path. Their
+                 values are given to the service method as positional args.
+    """
+    if args:
+
+        def method(self, collection=None, **kwargs):
+            return self._process_method(
+                service_name,
+                service_method_name,
+                *[kwargs.pop(arg) for arg in args],
+                collection=collection,
+                params=kwargs
+            )
+
+    else:
+
+        def method(self, collection=None, **kwargs):
+            return self._process_method(
+                service_name,
+                service_method_name,
+                collection=collection,
+                params=kwargs,
+            )
+
+    method.__name__ = method.__qualname__ = method_name
+    # used to dispatch the requests of a batch (see RestController._process_batch)
+    method.rest_service_name = service_name
+    method.rest_service_method_name = service_method_name
+    method.rest_args = args
+    return method
+
+
+def _inspect_cached_methods(cls):
+    """Return all methods of a given class as (name, value) pairs sorted by
+    name (see ``_inspect_methods``). The result is cached until the registry
+    is rebuilt."""
+    key = ("inspect.methods", cls, _rest_services_cache.generation)
+    methods = _rest_services_cache.get(key)
+    if methods is None:
+        methods = _rest_services_cache[key] = _inspect_methods(cls)
+    return methods
+
+
+def _reset_cached_methods(cls):
+    _rest_services_cache.pop(
+        ("inspect.methods", cls, _rest_services_cache.generation), None
     )
-"""
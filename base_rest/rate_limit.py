@@ -0,0 +1,270 @@
+# Copyright 2026 ACSONE SA/NV
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+"""Rate limiting of the routes of the REST controllers with a
+``_default_rate_limit`` (or of the methods declared with a ``rate_limit``
+option, see ``restapi.method``).
+
+The requests are counted by route and by client (API key, authenticated
+partner or IP) into token buckets: a bucket holds at most ``burst`` tokens,
+is refilled with ``requests`` tokens per ``period`` seconds and each request
+consumes one token (each request of a batch consumes a token of the route of
+the request). The requests finding an empty bucket are rejected with a
+'429 Too Many Requests' response and a 'Retry-After' header. The requests are
+allowed if the backend fails (the error is logged).
+
+The limits by IP are checked before the authentication of the request. The
+limits by API key are checked once the key is authenticated (by
+``auth_api_key``): the requests are counted by IP if the key is unknown or
+invalid, a client can't get a new bucket by sending random keys. The limits
+by partner are checked once the authenticated partner is known.
+
+The backend used to store the buckets is given by the ``base_rest`` section
+of the odoo config file:
+
+.. code-block:: ini
+
+    [base_rest]
+    rate_limit_backend = sqlite
+    rate_limit_path = /var/run/odoo/rest_rate_limit.sqlite
+
+The ``sqlite`` backend (default in multi-process mode) stores the buckets
+into a file shared by the workers of the host (by default
+``base_rest/rate_limit.sqlite`` into the data directory of odoo, only
+accessible by the user running odoo). The ``memory`` backend
+(default in threaded mode) keeps them into the memory of the worker process.
+Other backends can be registered into ``RATE_LIMIT_BACKENDS``.
+"""
+
+import collections
+import contextlib
+import logging
+import math
+import sqlite3
+import threading
+import time
+
+from werkzeug.exceptions import TooManyRequests
+
+from odoo.tools.config import config
+
+from .metrics import _metrics_registry
+from .tools import get_private_file_path
+
+_logger = logging.getLogger(__name__)
+
+# The rate limit options of a route
+RateLimitOptions = collections.namedtuple(
+    "RateLimitOptions", ["requests", "period", "burst", "key"]
+)
+
+RATE_LIMIT_KEYS = ("api_key", "partner", "ip")
+
+_rate_limit_requests = _metrics_registry.counter(
+    "base_rest_rate_limit_requests_total",
+    "Number of REST requests checked against a rate limit by route and result",
+)
+
+
+class RateLimitBackend(object):
+    """Interface of the rate limit backends"""
+
+    def consume(self, key, rate, burst):
+        """Take a token from the bucket of the key
+
+        :param rate: the number of tokens added to the bucket per second
+        :param burst: the capacity of the bucket
+        :return: 0 if a token has been taken or the number of seconds to wait
+                 for the next token
+        """
+        raise NotImplementedError()
+
+    def clear(self):
+        raise NotImplementedError()
+
+
+def _take_token(tokens, updated, now, rate, burst):
+    """Refill the bucket since its last update and take a token
+
+    :return: the (tokens, retry_after) of the bucket
+    """
+    tokens = min(burst, tokens + (now - updated) * rate)
+    if tokens >= 1:
+        return tokens - 1, 0
+    return tokens, (1 - tokens) / rate
+
+
+class MemoryRateLimit(RateLimitBackend):
+    """Buckets local to the worker process
+
+    The least recently used buckets are dropped above ``size`` buckets (the
+    next requests of their clients find a full bucket).
+    """
+
+    def __init__(self, size=100000):
+        self.size = size
+        self._buckets = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, rate, burst):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (burst, now))
+            tokens, retry_after = _take_token(tokens, updated, now, rate, burst)
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.size:
+                self._buckets.popitem(last=False)
+        return retry_after
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class SQLiteRateLimit(RateLimitBackend):
+    """Buckets stored into a SQLite file shared by the workers of the host"""
+
+    # number of calls between two purges of the full buckets
+    _purge_every = 1000
+
+    def __init__(self, path=None):
+        self.path = path or get_private_file_path("rate_limit.sqlite")
+        self._calls = 0
+        with self._connect() as cr:
+            # the buckets are transient: no need to wait for the disk
+            cr.execute("PRAGMA journal_mode=WAL")
+            cr.execute(
+                "CREATE TABLE IF NOT EXISTS bucket ("
+                "key TEXT PRIMARY KEY, tokens REAL, updated REAL, full REAL)"
+            )
+            cr.execute("CREATE INDEX IF NOT EXISTS bucket_full ON bucket (full)")
+
+    @contextlib.contextmanager
+    def _connect(self):
+        cr = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        try:
+            cr.execute("PRAGMA synchronous=OFF")
+            yield cr
+        finally:
+            # an uncommitted transaction is rolled back
+            cr.close()
+
+    def consume(self, key, rate, burst):
+        now = time.time()
+        self._calls += 1
+        with self._connect() as cr:
+            cr.execute("BEGIN IMMEDIATE")
+            row = cr.execute(
+                "SELECT tokens, updated FROM bucket WHERE key = ?", (key,)
+            ).fetchone()
+            tokens, updated = row or (burst, now)
+            tokens, retry_after = _take_token(tokens, updated, now, rate, burst)
+            cr.execute(
+                "INSERT OR REPLACE INTO bucket VALUES (?, ?, ?, ?)",
+                (key, tokens, now, now + (burst - tokens) / rate),
+            )
+            if self._calls % self._purge_every == 0:
+                # a full bucket is the same as no bucket
+                cr.execute("DELETE FROM bucket WHERE full < ?", (now,))
+            cr.execute("COMMIT")
+        return retry_after
+
+    def clear(self):
+        with self._connect() as cr:
+            cr.execute("DELETE FROM bucket")
+
+
+RATE_LIMIT_BACKENDS = {
+    "memory": MemoryRateLimit,
+    "sqlite": SQLiteRateLimit,
+}
+
+_rate_limit = None
+_rate_limit_lock = threading.Lock()
+
+
+def get_rate_limit():
+    """Return the rate limit backend configured for the server"""
+    global _rate_limit
+    if _rate_limit is None:
+        with _rate_limit_lock:
+            if _rate_limit is None:
+                name = config.get_misc(
+                    "base_rest",
+                    "rate_limit_backend",
+                    "sqlite" if config["workers"] else "memory",
+                )
+                kwargs = {}
+                path = config.get_misc("base_rest", "rate_limit_path")
+                if path:
+                    kwargs["path"] = path
+                _logger.info("REST rate limits stored with the %s backend", name)
+                _rate_limit = RATE_LIMIT_BACKENDS[name](**kwargs)
+    return _rate_limit
+
+
+def get_rate_limit_options(rate_limit):
+    """Normalize the ``rate_limit`` option of a route
+
+    :param rate_limit: the number of requests per minute or a dict with the
+                       keys 'requests', 'period' (in seconds, default 60),
+                       'burst' (the number of requests accepted at once,
+                       default 'requests') and 'key' (the client the
+                       requests are counted for: 'api_key' (default),
+                       'partner' or 'ip')
+    :return: RateLimitOptions or None
+    """
+    if not rate_limit:
+        return None
+    if not isinstance(rate_limit, dict):
+        rate_limit = {"requests": rate_limit}
+    key = rate_limit.get("key", "api_key")
+    if key not in RATE_LIMIT_KEYS:
+        raise ValueError("Unknown rate limit key: %s" % key)
+    return RateLimitOptions(
+        requests=rate_limit["requests"],
+        period=rate_limit.get("period", 60),
+        burst=rate_limit.get("burst", rate_limit["requests"]),
+        key=key,
+    )
+
+
+def get_rate_limit_key(options, httprequest, partner_id=None, api_key_id=None):
+    """Return the client the requests are counted for
+
+    The requests without authenticated API key (or authenticated partner)
+    are counted by IP.
+
+    :param api_key_id: the id of the ``auth.api.key`` authenticating the
+                       request
+    """
+    if options.key == "api_key":
+        if api_key_id:
+            return "api_key:%s" % api_key_id
+    elif options.key == "partner" and partner_id:
+        return "partner:%s" % partner_id
+    return "ip:%s" % httprequest.remote_addr
+
+
+def check_rate_limit(dbname, route, options, key):
+    """Take a token from the bucket of the client for the route or raise
+    TooManyRequests with the number of seconds to wait
+
+    The request is allowed if the backend fails: the rate limit must not
+    make the routes unavailable.
+    """
+    try:
+        retry_after = get_rate_limit().consume(
+            "{}:{}:{}".format(dbname, route, key),
+            options.requests / options.period,
+            options.burst,
+        )
+    except Exception:
+        _logger.exception("Failed to check the rate limit of %s", route)
+        _rate_limit_requests.inc((("route", route), ("result", "error")))
+        return
+    if retry_after:
+        _rate_limit_requests.inc((("route", route), ("result", "rejected")))
+        raise TooManyRequests(
+            "Rate limit exceeded", retry_after=max(1, math.ceil(retry_after))
+        )
+    _rate_limit_requests.inc((("route", route), ("result", "allowed")))
@@ -2,15 +2,147 @@
 # License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
 
 import abc
+import base64
+import collections
+import copy
 import functools
+import io
 import json
+import re
+import shutil
+import tempfile
+import threading
+from collections.abc import Mapping
 
 from cerberus import Validator
+from werkzeug.datastructures import FileStorage
+from werkzeug.wsgi import wrap_file
 
-from odoo import _, http
+from odoo import _, fields, http
 from odoo.exceptions import UserError, ValidationError
-
-from .tools import ROUTING_DECORATOR_ATTR, cerberus_to_json
+from odoo.osv import expression
+from odoo.tools import config, str2bool
+
+from .core import _rest_services_cache
+from .tools import (
+    ROUTING_DECORATOR_ATTR,
+    CompiledCerberusValidator,
+    cerberus_to_json,
+    compile_cerberus_validator,
+    prune_cerberus_schema,
+    prune_document,
+)
+
+# marker stored into the validators cache for handlers opting out of the cache
+_NO_CACHE = object()
+
+SPARSE_FIELD_NAME_RE = re.compile(r"^\w+$")
+# maximum number of validators pruned to a sparse fieldset kept by validator
+SPARSE_VALIDATORS_CACHE_SIZE = 128
+# size of the chunks read from the binary streams (uploads and downloads)
+BINARY_CHUNK_SIZE = 64 * 1024
+
+# An item of a bulk route: the args (the id of the record) and the params
+# given to the method or the error raised by their validation
+BulkItem = collections.namedtuple("BulkItem", ["args", "params", "error"])
+
+# The output of the bulk routes: the result or the error of each item
+BULK_RESULTS_SCHEMA = {
+    "results": {
+        "type": "list",
+        "required": True,
+        "schema": {
+            "type": "dict",
+            "schema": {"result": {"nullable": True}, "error": {"type": "string"}},
+        },
+    }
+}
+
+# The options of the methods declared with ``input_stream``
+InputStreamOptions = collections.namedtuple(
+    "InputStreamOptions", ["commit_every", "max_errors"]
+)
+
+
+def parse_sparse_fields(value):
+    """Parse the ``fields`` parameter of the methods declared with
+    ``sparse_fields=True``
+
+    :param value: a comma separated list of field names (or a list of field
+                  names) where the fields of the nested documents are given by
+                  their dotted path (ex: 'name,country.code')
+    :return: the sparse fieldset: a dict of field name: True (the whole field)
+             or the sparse fieldset of the nested documents
+             (ex: {'name': True, 'country': {'code': True}}), None if all the
+             fields are requested
+    """
+    if not value:
+        return None
+    if isinstance(value, str):
+        value = value.split(",")
+    if not isinstance(value, (list, tuple)):
+        raise UserError(_("Invalid fields %s") % value)
+    fields = {}
+    for path in value:
+        names = path.strip().split(".") if isinstance(path, str) else [None]
+        if names == [""]:
+            continue
+        if not all(name and SPARSE_FIELD_NAME_RE.match(name) for name in names):
+            raise UserError(_("Invalid fields %s") % path)
+        node = fields
+        for name in names[:-1]:
+            if node.get(name) is True:
+                # the whole field is already requested
+                break
+            node = node.setdefault(name, {})
+        else:
+            node[names[-1]] = True
+    return fields or None
+
+
+def get_input_stream_options(input_stream):
+    """Normalize the ``input_stream`` option of a method
+
+    :param input_stream: True or a dict with the keys 'commit_every' (the
+                         number of items after which the transaction is
+                         committed, default None: never) and 'max_errors'
+                         (the maximum number of errors detailed into the
+                         report, default 100)
+    :return: InputStreamOptions or None
+    """
+    if not input_stream:
+        return None
+    if not isinstance(input_stream, dict):
+        input_stream = {}
+    return InputStreamOptions(
+        commit_every=input_stream.get("commit_every"),
+        max_errors=input_stream.get("max_errors", 100),
+    )
+
+
+def get_output_validation_policy(output_validation):
+    """Normalize the ``output_validation`` option of a method
+
+    :param output_validation: 'always', 'off' or the percentage of the calls
+                              to validate (a number between 0 and 100)
+    :return: 'always', 'off', the percentage as a float or None
+    """
+    if output_validation is None or output_validation in ("always", "off"):
+        return output_validation
+    if isinstance(output_validation, bool):
+        raise ValueError("Invalid output validation policy: %s" % output_validation)
+    try:
+        percentage = float(output_validation)
+    except (TypeError, ValueError) as e:
+        raise ValueError(
+            "Invalid output validation policy: %s" % output_validation
+        ) from e
+    if not 0 <= percentage <= 100:
+        raise ValueError(
+            "The percentage of the validated outputs must be between 0 and 100: "
+            "%s" % output_validation
+        )
+    return percentage
 
 
 def method(routes, input_param=None, output_param=None, **kw):
@@ -78,6 +210,117 @@ def method(routes, input_param=None, output_param=None, **kw):
                         Defaults to ``False``
       :param bool save_session: Whether HTTP session should be saved into the
                                 session store: Default to ``True``
+      :param bool output_stream: When set, the method can return a generator
+                         of items. The items are validated one by one by the
+                         ``to_response_items`` method of the output_param and
+                         written to the response as a JSON array or as NDJSON
+                         if requested by the Accept header. Only one item is
+                         kept into memory at a time.
+      :param json_codec: The name of the JSON codec used to decode the request
+                         and encode the response ('json', 'ujson', 'orjson').
+                         Defaults to the ``_default_json_codec`` of the
+                         controller or to orjson if installed (json
+                         otherwise). The ujson codec encodes the decimals as
+                         numbers instead of strings.
+      :param conditional: Enable the conditional GET requests
+                         (If-None-Match / If-Modified-Since) on the method.
+                         The value is either 'body' or the name of a method
+                         of the service. With 'body', the ETag is a hash of
+                         the result of the method and a 304 response is
+                         returned without validating and encoding the output.
+                         Otherwise the named method is called with the same
+                         arguments than the decorated method and must return
+                         a cheap validator: a datetime (the ``write_date`` of
+                         the records involved), a recordset (the max of its
+                         ``write_date`` is used) or a string used as ETag. If
+                         the client's copy is up to date, a 304 response is
+                         returned without calling the decorated method.
+      :param output_validation: The validation policy of the result of the
+                    method by the output_param: 'always', 'off' or the
+                    percentage of the calls to validate (sampling). The
+                    failures of the sampled validations are logged and
+                    counted (base_rest_output_validation_failures_total
+                    metric) instead of resulting into an error. Defaults to
+                    the ``_default_output_validation`` of the controller or
+                    to 'always'. The result is always validated when the
+                    tests are enabled.
+      :param bool metrics: Whether the duration of the stages of the
+                           processing of the requests is measured (see
+                           ``base_rest.metrics``). Defaults to the
+                           ``_default_metrics`` of the controller.
+      :param bool server_timing: Whether the duration of the stages is returned
+                                 into a 'Server-Timing' header. Defaults to the
+                                 ``_default_server_timing`` of the controller.
+      :param cache: Cache the encoded responses to the GET requests. The
+                    value is the time to live in seconds or a dict with the
+                    keys 'ttl' (default 60), 'vary_by' (a list of 'user',
+                    'authenticated_partner_id', 'lang' and 'params', all by
+                    default) and 'models' (the names of the models whose
+                    changes invalidate the cached responses). The responses
+                    are stored by the backend configured in the 'base_rest'
+                    section of the odoo config file (see ``base_rest.cache``).
+      :param compression: Compress the JSON responses with the content coding
+                    negotiated with the client (Accept-Encoding: br, gzip).
+                    The value is True or a dict with the keys 'min_size'
+                    (default 1024 bytes), 'level' (default 5) and
+                    'encodings'. Defaults to the ``_default_compression`` of
+                    the controller. The responses built by the method
+                    (BinaryData, ...) are never compressed.
+      :param rate_limit: Limit the rate of the requests of each client to
+                    the method. The value is the number of requests per
+                    minute or a dict with the keys 'requests', 'period'
+                    (default 60 seconds), 'burst' (the number of requests
+                    accepted at once, default 'requests') and 'key' (the
+                    client the requests are counted for: 'api_key' (the
+                    API key authenticating the request, default), 'partner'
+                    (the authenticated partner) or 'ip'). The requests
+                    without authenticated client are counted by IP. The
+                    requests exceeding the limit are rejected with a '429
+                    Too Many Requests' response (before the authentication
+                    for the limits by IP). Defaults
+                    to the ``_default_rate_limit`` of the controller (see
+                    ``base_rest.rate_limit``).
+      :param single_flight: Coalesce the identical concurrent GET requests
+                    to the method received by a worker process: the first
+                    one calls the method and its encoded response is shared
+                    with the others instead of running the same queries.
+                    The value is True or a dict with the keys 'vary_by' (as
+                    for ``cache``, all by default) and 'timeout' (the number
+                    of seconds the identical requests wait for the response
+                    before calling the method themselves, default 5). The
+                    waiting requests hold their database connection. The
+                    requests are only coalesced in threaded mode (see
+                    ``base_rest.single_flight``).
+      :param bool sparse_fields: Whether the client can restrict the fields of
+                    the response with a ``fields`` parameter (ex:
+                    'name,country.code'). The output_param prunes its schema
+                    to the requested fields and the requested fieldset is
+                    given to the service into the ``sparse_fields``
+                    attribute of its work context to restrict the data read
+                    (see ``parse_sparse_fields``).
+      :param bool run_async: Whether the method is run asynchronously. The
+                    input is validated and the call is stored as a
+                    ``rest.async.job`` run once the transaction is
+                    committed (by a pool of threads of the server in
+                    threaded mode, else by the cron). It can't be combined
+                    with input_stream or output_stream. The client gets a
+                    '202 Accepted' response with the id of the job and the
+                    path of the generated route returning its state and its
+                    output-validated result (GET
+                    {_root_path}async_job/<id>). The params and the result
+                    of the method must be JSON serializable.
+      :param input_stream: Read the items of the request one by one from a
+                    NDJSON body (application/x-ndjson, one JSON document by
+                    line). The items are validated one by one by the
+                    ``from_params_items`` method of the input_param and the
+                    method receives a ``StreamedInput`` iterating over the
+                    valid ones. The invalid lines are skipped and reported.
+                    The value is True or a dict with the keys
+                    'commit_every' (commit the transaction every N items)
+                    and 'max_errors' (see ``get_input_stream_options``). If
+                    the method returns None, the response is the report of
+                    the processing of the lines (see
+                    ``StreamedInput.get_report``).
 
     """
 
@@ -135,6 +378,56 @@ class RestMethodParam(abc.ABC):
         :return: http.Response or JSON dict
         """
 
+    def to_response_unvalidated(self, service, result):
+        """
+        This method is called instead of `to_response` when the output
+        validation is disabled or not sampled for the call (see the
+        ``output_validation`` argument of ``restapi.method``). It must
+        convert the result into the format expected by the controller
+        without validating it. By default, the result is validated anyway.
+        :param service:
+        :param result:
+        :return: http.Response or JSON dict
+        """
+        return self.to_response(service, result)
+
+    def _get_sparse_fields(self, service):
+        """
+        Return the sparse fieldset requested by the client for the output of
+        the method (see the ``sparse_fields`` argument of
+        ``restapi.method``) or None if all the fields are requested.
+        """
+        fields = getattr(getattr(service, "work", None), "sparse_fields", None)
+        return fields if isinstance(fields, dict) else None
+
+    def to_response_items(self, service, result):
+        """
+        This method is called instead of `to_response` for the methods
+        declared with ``output_stream=True``. It must iterate over the items
+        of the result, validating and sanitizing them one by one.
+        :param service:
+        :param result: an iterable of items
+        :return: an iterator of JSON dict
+        """
+        raise NotImplementedError(
+            _("%s doesn't support streamed responses") % self.__class__.__name__
+        )
+
+    def from_params_items(self, service, items):
+        """
+        This method is called instead of `from_params` for the methods
+        declared with ``input_stream``. It must validate the items of the
+        request one by one.
+        :param service:
+        :param items: an iterator of JSON dict
+        :return: an iterator of (document, errors) tuples, one by item, with
+                 the value expected by the method or the errors if the item
+                 is not valid
+        """
+        raise NotImplementedError(
+            _("%s doesn't support streamed requests") % self.__class__.__name__
+        )
+
     @abc.abstractmethod
     def to_openapi_query_parameters(self, service, spec) -> dict:
         return {}
@@ -152,12 +445,107 @@ class RestMethodParam(abc.ABC):
         return {}
 
 
+class StreamedInput(object):
+    """Iterator over the valid items of a NDJSON request given to the
+    methods declared with ``input_stream``
+
+    The lines are read, decoded and validated one by one while the method
+    iterates. The invalid lines are skipped and reported. If the
+    ``commit_every`` option is set, the transaction is committed each time
+    the given number of items has been processed.
+    """
+
+    def __init__(self, service, param, lines, options, loads=json.loads):
+        """
+        :param param: the input_param of the method
+        :param lines: an iterator of the lines of the request
+        :param options: InputStreamOptions
+        :param loads: the function decoding a line
+        """
+        self._service = service
+        self._param = param
+        self._lines = lines
+        self._options = options
+        self._loads = loads
+        self.line = 0
+        self.processed = 0
+        self.committed = 0
+        self.failed = 0
+        self.errors = []
+
+    def __iter__(self):
+        commit_every = self._options.commit_every
+        items = self._param.from_params_items(self._service, self._iter_items())
+        for document, errors in items:
+            if errors is not None:
+                self._add_error(errors)
+                continue
+            if commit_every and self.processed - self.committed >= commit_every:
+                # the previous items have been processed by the method
+                self._commit()
+            yield document
+            self.processed += 1
+
+    def _iter_items(self):
+        for line in self._lines:
+            self.line += 1
+            if not line.strip():
+                continue
+            try:
+                item = self._loads(line)
+            except ValueError as e:
+                self._add_error(_("Invalid JSON: %s") % e)
+                continue
+            if not isinstance(item, dict):
+                self._add_error(_("A JSON object is expected"))
+                continue
+            yield item
+
+    def _add_error(self, errors):
+        self.failed += 1
+        if len(self.errors) < self._options.max_errors:
+            self.errors.append({"line": self.line, "errors": errors})
+
+    def _commit(self):
+        self._service.env.cr.commit()  # pylint: disable=invalid-commit
+        self.committed = self.processed
+
+    def get_report(self):
+        """Return the report of the processing of the lines: the number of
+        items processed, committed and failed and the errors by line"""
+        return {
+            "processed": self.processed,
+            "committed": self.committed,
+            "failed": self.failed,
+            "errors": self.errors,
+        }
+
+
 class BinaryData(RestMethodParam):
-    def __init__(self, mediatypes="*/*", required=False):
+    def __init__(self, mediatypes="*/*", required=False, spool_max_size=None):
+        """
+
+        :param mediatypes: the media type(s) of the binary content
+        :param required: if True, an empty request body is refused
+        :param spool_max_size: if given, the body of the request is handed
+                               over to the method as a FileStorage whose
+                               stream is a temporary file kept in memory up
+                               to ``spool_max_size`` bytes and rolled over to
+                               the disk above. Otherwise, the method receives
+                               the params of the request.
+
+        The method can return the content to download as bytes, as a file
+        like object or as an iterator of bytes chunks. File like objects are
+        streamed to the client by chunks and the Range requests are supported
+        if they are seekable. Iterators are sent with a chunked transfer
+        encoding. Since the cursor of the request is closed once the response
+        is returned, they must not read from the database.
+        """
         if not isinstance(mediatypes, list):
             mediatypes = [mediatypes]
         self._mediatypes = mediatypes
         self._required = required
+        self._spool_max_size = spool_max_size
 
     def to_json_schema(self, service, spec, direction):
         return {
@@ -191,7 +579,28 @@ class BinaryData(RestMethodParam):
         return result
 
     def from_params(self, service, params):
-        return params
+        # the files sent into a multipart request are already spooled by
+        # werkzeug
+        if self._spool_max_size is None or not isinstance(params, dict):
+            return params
+        return self._spool_request_body()
+
+    def _spool_request_body(self):
+        httprequest = http.request.httprequest
+        fp = tempfile.SpooledTemporaryFile(max_size=self._spool_max_size)
+        try:
+            shutil.copyfileobj(httprequest.stream, fp, BINARY_CHUNK_SIZE)
+            if self._required and not fp.tell():
+                raise UserError(_("The request body is empty"))
+        except BaseException:
+            fp.close()
+            raise
+        fp.seek(0)
+        return FileStorage(
+            stream=fp,
+            content_type=httprequest.headers.get("Content-Type"),
+            content_length=httprequest.content_length,
+        )
 
     def _to_http_response(self, result):
         mediatype = self._mediatypes[0] if len(self._mediatypes) == 1 else "*/*"
@@ -199,20 +608,62 @@ class BinaryData(RestMethodParam):
             ("Content-Type", mediatype),
             ("X-Content-Type-Options", "nosniff"),
             ("Content-Disposition", http.content_disposition("file")),
-            ("Content-Length", len(result)),
         ]
-        return http.request.make_response(result, headers)
+        httprequest = http.request.httprequest
+        if isinstance(result, (bytes, bytearray, str)):
+            response = http.request.make_response(result, headers)
+            complete_length = response.content_length
+        elif hasattr(result, "read"):
+            complete_length = self._get_stream_length(result)
+            response = http.Response(
+                wrap_file(httprequest.environ, result, BINARY_CHUNK_SIZE),
+                headers=headers,
+                direct_passthrough=True,
+            )
+            if complete_length is not None:
+                response.content_length = complete_length
+        else:
+            # iterator of chunks: the length is unknown, the content is sent
+            # with a chunked transfer encoding
+            return http.Response(result, headers=headers, direct_passthrough=True)
+        if complete_length is None:
+            return response
+        return response.make_conditional(
+            httprequest, accept_ranges=True, complete_length=complete_length
+        )
+
+    def _get_stream_length(self, stream):
+        """Return the length of a file like object if it is seekable and
+        positioned at its start (the ranges are absolute offsets)"""
+        try:
+            if stream.tell():
+                return None
+            stream.seek(0, io.SEEK_END)
+            length = stream.tell()
+            stream.seek(0)
+        except (AttributeError, OSError, ValueError):
+            return None
+        return length
 
 
 class CerberusValidator(RestMethodParam):
-    def __init__(self, schema):
+    def __init__(self, schema, compiled=None):
         """
 
         :param schema: can be dict as cerberus schema, an instance of
                        cerberus.Validator or a sting with the method name to
                        call on the service to get the schema or the validator
+        :param compiled: if True, the schemas given as dict are compiled to
+                         Python functions (see ``compile_cerberus_schema``).
+                         By default, the ``compile_cerberus_schemas`` option
+                         of the ``base_rest`` section of the config file is
+                         used.
         """
         self._schema = schema
+        self._validator = None
+        self._compiled = compiled
+        self._sparse_validators = collections.OrderedDict()
+        self._sparse_validators_lock = threading.Lock()
 
     def from_params(self, service, params):
         validator = self.get_cerberus_validator(service, "input")
@@ -221,11 +672,29 @@ class CerberusValidator(RestMethodParam):
         raise UserError(_("BadRequest %s") % validator.errors)
 
     def to_response(self, service, result):
-        validator = self.get_cerberus_validator(service, "output")
+        validator = self.get_cerberus_validator(
+            service, "output", fields=self._get_sparse_fields(service)
+        )
         if validator.validate(result):
             return validator.document
         raise SystemError(_("Invalid Response %s") % validator.errors)
 
+    def to_response_unvalidated(self, service, result):
+        fields = self._get_sparse_fields(service)
+        validator = self.get_cerberus_validator(service, "output", fields=fields)
+        return self._normalize(validator, result, fields)
+
+    def _normalize(self, validator, document, fields=None):
+        """Normalize the document with the validator (unknown fields purged,
+        values coerced, defaults set, ...) without applying its validation
+        rules"""
+        if not isinstance(document, Mapping):
+            raise SystemError(_("Invalid Response %s") % document)
+        document = validator.normalized(document, always_return_document=True)
+        if fields:
+            return prune_document(document, fields)
+        return document
+
     def to_openapi_query_parameters(self, service, spec):
         json_schema = self.to_json_schema(service, spec, "input")
         parameters = []
@@ -263,27 +732,137 @@ class CerberusValidator(RestMethodParam):
         json_schema = self.to_json_schema(service, spec, "output")
         return {"200": {"content": {"application/json": {"schema": json_schema}}}}
 
-    def get_cerberus_validator(self, service, direction):
+    def get_cerberus_validator(self, service, direction, fields=None):
+        """Return the cerberus validator to use for the given direction
+
+        :param fields: the sparse fieldset to which the schema is pruned (see
+                       ``parse_sparse_fields``)
+        """
+        validator = self._get_cerberus_validator(service, direction)
+        if fields:
+            return self._get_sparse_validator(service, direction, validator, fields)
+        return validator
+
+    def _get_cerberus_validator(self, service, direction):
+        """Return the cerberus validator to use for the given direction
+
+        Building a validator normalizes and checks the schema which is costly.
+        The validator is therefore built once and kept into a cache. Since a
+        validator holds the state of the last validation, a shallow copy of
+        the cached validator is returned on each call.
+
+        When the schema is a method name, the validator is cached by service
+        class, method name, direction and registry generation. A validator
+        handler depending on the request context (user, lang, ...) can opt out
+        of the cache by being decorated with ``skip_validator_cache``.
+        """
         assert direction in ("input", "output")
-        schema = self._schema
+        if isinstance(self._schema, Validator):
+            return copy.copy(self._schema)
         if isinstance(self._schema, str):
-            validator_component = service.component(usage="cerberus.validator")
-            schema = validator_component.get_validator_handler(
-                service, self._schema, direction
-            )()
+            key = self._get_validator_cache_key(service, direction)
+            validator = _rest_services_cache.get(key)
+            if validator is None or validator is _NO_CACHE:
+                handler = self._get_validator_handler(service, direction)
+                validator = self._build_cerberus_validator(handler())
+                if hasattr(handler, "skip_validator_cache"):
+                    _rest_services_cache[key] = _NO_CACHE
+                    return validator
+                _rest_services_cache[key] = validator
+            return copy.copy(validator)
+        if isinstance(self._schema, dict):
+            if self._validator is None:
+                self._validator = self._build_cerberus_validator(self._schema)
+            return copy.copy(self._validator)
+        raise Exception(_("Unable to get cerberus schema from %s") % self._schema)
+
+    def _get_validator_cache_key(self, service, direction):
+        return (
+            "cerberus.validator",
+            service.__class__,
+            self._schema,
+            direction,
+            _rest_services_cache.generation,
+        )
+
+    def _get_sparse_validator(self, service, direction, validator, fields):
+        """Return the validator pruned to a sparse fieldset. The pruned
+        validators are kept into a bounded cache unless the validator is not
+        cached itself."""
+        if isinstance(self._schema, str) and (
+            _rest_services_cache.get(self._get_validator_cache_key(service, direction))
+            is _NO_CACHE
+        ):
+            return self._build_sparse_validator(validator, fields)
+        key = (
+            service.__class__,
+            direction,
+            repr(sorted(fields.items())),
+            _rest_services_cache.generation,
+        )
+        with self._sparse_validators_lock:
+            sparse_validator = self._sparse_validators.get(key)
+            if sparse_validator is not None:
+                self._sparse_validators.move_to_end(key)
+        if sparse_validator is None:
+            sparse_validator = self._build_sparse_validator(validator, fields)
+            with self._sparse_validators_lock:
+                self._sparse_validators[key] = sparse_validator
+                while len(self._sparse_validators) > SPARSE_VALIDATORS_CACHE_SIZE:
+                    self._sparse_validators.popitem(last=False)
+        return copy.copy(sparse_validator)
+
+    def _build_sparse_validator(self, validator, fields):
+        compiled = isinstance(validator, CompiledCerberusValidator)
+        if compiled:
+            validator = validator.validator
+        sparse_validator = validator.__class__(
+            **dict(
+                validator._config,
+                schema=prune_cerberus_schema(validator.schema, fields),
+            )
+        )
+        if compiled:
+            return compile_cerberus_validator(sparse_validator) or sparse_validator
+        return sparse_validator
+
+    def _get_validator_handler(self, service, direction):
+        validator_component = service.component(usage="cerberus.validator")
+        return validator_component.get_validator_handler(
+            service, self._schema, direction
+        )
+
+    def _build_cerberus_validator(self, schema):
         if isinstance(schema, Validator):
             return schema
         if isinstance(schema, dict):
-            return Validator(schema, purge_unknown=True)
+            validator = Validator(schema, purge_unknown=True)
+            if self._is_compiled():
+                return compile_cerberus_validator(validator) or validator
+            return validator
         raise Exception(_("Unable to get cerberus schema from %s") % self._schema)
 
+    def _is_compiled(self):
+        if self._compiled is not None:
+            return self._compiled
+        return str2bool(
+            config.get_misc("base_rest", "compile_cerberus_schemas", "0"), False
+        )
+
     def to_json_schema(self, service, spec, direction):
         schema = self.get_cerberus_validator(service, direction).schema
         return cerberus_to_json(schema)
 
 
 class CerberusListValidator(CerberusValidator):
-    def __init__(self, schema, min_items=None, max_items=None, unique_items=None):
+    def __init__(
+        self,
+        schema,
+        min_items=None,
+        max_items=None,
+        unique_items=None,
+        compiled=None,
+    ):
         """
         :param schema: Cerberus list item schema
                        can be dict as cerberus schema, an instance of
@@ -298,8 +877,9 @@ class CerberusListValidator(CerberusValidator):
         :param unique_items: Used to document that the list should only
                              contain unique items.
                              (Not enforced at validation time)
+        :param compiled: see CerberusValidator
         """
-        super(CerberusListValidator, self).__init__(schema=schema)
+        super(CerberusListValidator, self).__init__(schema=schema, compiled=compiled)
         self._min_items = min_items
         self._max_items = max_items
         self._unique_items = unique_items
@@ -310,14 +890,49 @@ class CerberusListValidator(CerberusValidator):
     def to_response(self, service, result):
         return self._do_validate(service, data=result, direction="output")
 
+    def to_response_items(self, service, result):
+        return self._iter_validate(service, data=result, direction="output")
+
+    def to_response_unvalidated(self, service, result):
+        fields = self._get_sparse_fields(service)
+        validator = self.get_cerberus_validator(service, "output", fields=fields)
+        return [self._normalize(validator, item, fields) for item in result]
+
+    def from_params_items(self, service, items):
+        validator = self.get_cerberus_validator(service, "input")
+        count = 0
+        for item in items:
+            if not validator.validate(item):
+                yield None, validator.errors
+                continue
+            count += 1
+            if self._max_items is not None and count > self._max_items:
+                raise UserError(
+                    _(
+                        "BadRequest: Too many items in the list (%(current)s > %(expected)s)",
+                        current=count,
+                        expected=self._max_items,
+                    )
+                )
+            yield validator.document, None
+
     def to_openapi_query_parameters(self, service, spec):
         raise NotImplementedError("List are not (?yet?) supported as query paramters")
 
-    # pylint: disable=W8120,W8115
     def _do_validate(self, service, data, direction):
-        validator = self.get_cerberus_validator(service, direction)
-        values = []
+        return list(self._iter_validate(service, data, direction))
+
+    # pylint: disable=W8120,W8115
+    def _iter_validate(self, service, data, direction):
+        """Validate the items of data one by one and yield the validated
+        documents"""
+        validator = self.get_cerberus_validator(
+            service,
+            direction,
+            fields=self._get_sparse_fields(service) if direction == "output" else None,
+        )
         ExceptionClass = UserError if direction == "input" else SystemError
+        count = 0
         for idx, p in enumerate(data):
             if not validator.validate(p):
                 raise ExceptionClass(
@@ -327,24 +942,24 @@ class CerberusListValidator(CerberusValidator):
                         errors=validator.errors,
                     )
                 )
-            values.append(validator.document)
-        if self._min_items is not None and len(values) < self._min_items:
+            count += 1
+            if self._max_items is not None and count > self._max_items:
+                raise ExceptionClass(
+                    _(
+                        "BadRequest: Too many items in the list (%(current)s > %(expected)s)",
+                        current=len(data) if hasattr(data, "__len__") else count,
+                        expected=self._max_items,
+                    )
+                )
+            yield validator.document
+        if self._min_items is not None and count < self._min_items:
             raise ExceptionClass(
                 _(
                     "BadRequest: Not enough items in the list (%(current)s < %(expected)s)",
-                    current=len(values),
+                    current=count,
                     expected=self._min_items,
                 )
             )
-        if self._max_items is not None and len(values) > self._max_items:
-            raise ExceptionClass(
-                _(
-                    "BadRequest: Too many items in the list (%(current)s > %(expected)s)",
-                    current=len(values),
-                    expected=self._max_items,
-                )
-            )
-        return values
 
     def to_json_schema(self, service, spec, direction):
         cerberus_schema = self.get_cerberus_validator(service, direction).schema
@@ -431,3 +1046,414 @@ class MultipartFormData(RestMethodParam):
 
     def to_response(self, service, result):
         raise NotImplementedError()
+
+
+class BulkItems(RestMethodParam):
+    def __init__(self, param=None, with_id=False, max_items=None):
+        """
+        Input param of the bulk routes generated for the methods listed into
+        the ``_bulk_methods`` of a service. The params are a dict with the
+        list of the ``items`` to process. Each item is validated by the input
+        param of the method and given to the service as a ``BulkItem``.
+        The invalid items are not rejected but carry their error.
+
+        :param param: the input param of the method
+        :param with_id: whether the items carry the ``id`` of the record given
+                        as first argument to the method (update, delete, ...)
+        :param max_items: the maximum number of items
+        """
+        self._param = param
+        self._with_id = with_id
+        self._max_items = max_items
+
+    def from_params(self, service, params):
+        items = params.get("items") if isinstance(params, dict) else None
+        if not isinstance(items, list):
+            raise UserError(_("BadRequest: A list of items is expected"))
+        if self._max_items is not None and len(items) > self._max_items:
+            raise UserError(
+                _(
+                    "BadRequest: Too many items in the list (%(current)s > %(expected)s)",
+                    current=len(items),
+                    expected=self._max_items,
+                )
+            )
+        return [self._from_item(service, item) for item in items]
+
+    def _from_item(self, service, item):
+        if not isinstance(item, dict):
+            return BulkItem((), None, _("A JSON object is expected"))
+        args = ()
+        if self._with_id:
+            item = dict(item)
+            _id = item.pop("id", None)
+            if not isinstance(_id, int) or isinstance(_id, bool):
+                return BulkItem((), None, _("An integer id is expected"))
+            args = (_id,)
+        if self._param is None:
+            return BulkItem(args, {}, None)
+        try:
+            params = self._param.from_params(service, item)
+        except UserError as e:
+            return BulkItem(args, None, e.args[0])
+        return BulkItem(args, params, None)
+
+    def to_response(self, service, result):
+        raise NotImplementedError()
+
+    def to_openapi_query_parameters(self, service, spec):
+        raise NotImplementedError("List are not (?yet?) supported as query paramters")
+
+    def to_openapi_requestbody(self, service, spec):
+        json_schema = self.to_json_schema(service, spec, "input")
+        return {"content": {"application/json": {"schema": json_schema}}}
+
+    def to_openapi_responses(self, service, spec):
+        raise NotImplementedError()
+
+    def to_json_schema(self, service, spec, direction):
+        if self._param is not None:
+            item_schema = self._param.to_json_schema(service, spec, direction)
+        else:
+            item_schema = {"type": "object"}
+        if self._with_id:
+            id_schema = {
+                "type": "object",
+                "properties": {"id": {"type": "integer"}},
+                "required": ["id"],
+            }
+            item_schema = {"allOf": [item_schema, id_schema]}
+        items_schema = {"type": "array", "items": item_schema}
+        if self._max_items is not None:
+            items_schema["maxItems"] = self._max_items
+        return {
+            "type": "object",
+            "properties": {"items": items_schema},
+            "required": ["items"],
+        }
+
+
+class KeysetPage(object):
+    """The page of records requested with a keyset (cursor) pagination.
+
+    The records are sorted by a list of stored fields always ending with the
+    id. The cursor is an opaque string encoding the values of these fields for
+    the last record of the previous page: the next page is read by adding a
+    domain on these values instead of an offset, so that the deep pages cost
+    the same as the first one (given an index on the sort fields).
+    """
+
+    def __init__(self, order, limit, cursor=None):
+        """
+        :param order: list of (field name, descending)
+        :param limit: the maximum number of records of the page
+        :param cursor: the cursor returned with the previous page
+        """
+        self.order = order
+        self.limit = limit
+        self.cursor = cursor
+        self.values = self._decode_cursor(cursor) if cursor else None
+        # the cursor of the next page, set by ``search``
+        self.next_cursor = None
+
+    @property
+    def order_spec(self):
+        return ", ".join(
+            "{} {}".format(name, "desc" if descending else "asc")
+            for name, descending in self.order
+        )
+
+    def _encode_cursor(self, values):
+        data = json.dumps({"o": self.order_spec, "v": values}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(data.encode("utf-8")).decode("ascii")
+
+    def _decode_cursor(self, cursor):
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            values = data["v"]
+            valid = (
+                data["o"] == self.order_spec
+                and isinstance(values, list)
+                and len(values) == len(self.order)
+                and all(
+                    value is None or isinstance(value, (str, int, float))
+                    for value in values
+                )
+            )
+        except (ValueError, TypeError, KeyError, AttributeError):
+            valid = False
+        if not valid:
+            raise UserError(_("Invalid cursor %s") % cursor)
+        return values
+
+    def get_domain(self, model=None):
+        """Return the domain selecting the records after the cursor
+
+        :param model: the model of the records, used to take the type of the
+                      sort fields into account
+        """
+        if self.values is None:
+            return []
+        domains = []
+        equal = []
+        for (name, descending), value in zip(self.order, self.values):
+            field = model._fields.get(name) if model is not None else None
+            domains.append(
+                expression.AND([equal, self._after(name, descending, value, field)])
+            )
+            equal = expression.AND(
+                [equal, [(name, "=", value if value is not None else False)]]
+            )
+        return expression.OR(domains)
+
+    def _after(self, name, descending, value, field=None):
+        if field is not None and field.type == "boolean":
+            # the null values are sorted as False and are equal to False
+            # into the domains
+            value = bool(value)
+            if value == descending:
+                return [(name, "=", not value)]
+            return expression.FALSE_DOMAIN
+        # the null values are sorted after the other ones in ascending order
+        # and before them in descending order (PostgreSQL's default)
+        if descending:
+            if value is None:
+                return [(name, "!=", False)]
+            return [(name, "<", value)]
+        if value is None:
+            return expression.FALSE_DOMAIN
+        return ["|", (name, ">", value), (name, "=", False)]
+
+    def _check_order(self, model):
+        for name, _descending in self.order:
+            field = model._fields.get(name)
+            if (
+                not field
+                or not field.store
+                or field.translate
+                or field.type in ("many2one", "one2many", "many2many", "binary")
+            ):
+                raise UserError(
+                    _("%(field)s can't be used to paginate %(model)s")
+                    % {"field": name, "model": model._name}
+                )
+
+    def _get_null_numeric_fields(self, record):
+        """Return the numeric sort fields whose value is NULL in the database
+
+        The ORM reads a NULL integer or float as 0 but PostgreSQL sorts the
+        NULL values after the other ones, the cursor must tell them apart.
+        """
+        names = [
+            name
+            for name, _descending in self.order
+            if record._fields[name].type in ("integer", "float", "monetary")
+            and not record[name]
+        ]
+        if not names:
+            return set()
+        record.flush_recordset(names)
+        record.env.cr.execute(
+            'SELECT %s FROM "%s" WHERE id = %%s'
+            % (", ".join('"%s" IS NULL' % name for name in names), record._table),
+            (record.id,),
+        )
+        return {
+            name for name, is_null in zip(names, record.env.cr.fetchone()) if is_null
+        }
+
+    def _get_cursor_values(self, record):
+        null_fields = self._get_null_numeric_fields(record)
+        values = []
+        for name, _descending in self.order:
+            field = record._fields[name]
+            value = record[name]
+            if field.type == "datetime" and value:
+                value = fields.Datetime.to_string(value)
+            elif field.type == "date" and value:
+                value = fields.Date.to_string(value)
+            elif (value is False and field.type != "boolean") or name in null_fields:
+                value = None
+            values.append(value)
+        return values
+
+    def search(self, model, domain=None):
+        """Search the records of the page and compute the next cursor
+
+        :param model: the model (or recordset) to search
+        :param domain: the domain of the records to paginate
+        :return: the records of the page
+        """
+        self._check_order(model)
+        records = model.search(
+            expression.AND([domain or [], self.get_domain(model)]),
+            order=self.order_spec,
+            limit=self.limit + 1,
+        )
+        self.next_cursor = None
+        if len(records) > self.limit:
+            records = records[: self.limit]
+            self.next_cursor = self._encode_cursor(self._get_cursor_values(records[-1]))
+        return records
+
+
+class KeysetPagination(RestMethodParam):
+    def __init__(self, param=None, order="id", default_limit=100, max_limit=1000):
+        """Input param adding a keyset (cursor) pagination to the input of a
+        method.
+
+        The 'cursor' and 'limit' parameters are removed from the params
+        given to the wrapped param. The requested page is made available to
+        the service as a KeysetPage into the ``keyset_page`` attribute of its
+        work context. Its ``search`` method returns the records of the page.
+
+        :param param: the RestMethodParam processing the other parameters
+                      (CerberusValidator, Datamodel, PydanticModel, ...)
+        :param order: the stored fields used to sort the records (ex:
+                      'name desc, id'). The id is always added last.
+        :param default_limit: the number of records of a page if no limit is
+                              requested
+        :param max_limit: the maximum number of records of a page
+        """
+        self._param = param
+        self._order = self._parse_order(order)
+        self._default_limit = default_limit
+        self._max_limit = max_limit
+
+    @staticmethod
+    def _parse_order(order):
+        result = []
+        for item in order.split(","):
+            parts = item.split()
+            if not parts:
+                continue
+            if len(parts) > 2 or (
+                len(parts) == 2 and parts[1].lower() not in ("asc", "desc")
+            ):
+                raise ValueError("Invalid order %s" % order)
+            result.append((parts[0], len(parts) == 2 and parts[1].lower() == "desc"))
+        if "id" not in [name for name, _descending in result]:
+            result.append(("id", False))
+        return result
+
+    def from_params(self, service, params):
+        params = dict(params)
+        cursor = params.pop("cursor", None) or None
+        limit = params.pop("limit", None)
+        if limit in (None, ""):
+            limit = self._default_limit
+        try:
+            limit = int(limit)
+        except (TypeError, ValueError):
+            limit = 0
+        if not 0 < limit <= self._max_limit:
+            raise UserError(
+                _("The limit must be an integer between 1 and %s") % self._max_limit
+            )
+        if cursor is not None and not isinstance(cursor, str):
+            raise UserError(_("Invalid cursor %s") % cursor)
+        service.work.keyset_page = KeysetPage(self._order, limit, cursor=cursor)
+        if self._param is None:
+            return {}
+        return self._param.from_params(service, params)
+
+    def to_response(self, service, result):
+        raise NotImplementedError()
+
+    def _get_pagination_parameters_schema(self):
+        return {
+            "cursor": {"type": "string", "nullable": True},
+            "limit": {
+                "type": "integer",
+                "minimum": 1,
+                "maximum": self._max_limit,
+                "default": self._default_limit,
+            },
+        }
+
+    def to_openapi_query_parameters(self, service, spec):
+        parameters = []
+        if self._param is not None:
+            parameters = list(self._param.to_openapi_query_parameters(service, spec))
+        for name, schema in self._get_pagination_parameters_schema().items():
+            parameters.append(
+                {"name": name, "in": "query", "required": False, "schema": schema}
+            )
+        return parameters
+
+    def to_openapi_requestbody(self, service, spec):
+        return {
+            "content": {
+                "application/json": {
+                    "schema": self.to_json_schema(service, spec, "input")
+                }
+            }
+        }
+
+    def to_openapi_responses(self, service, spec):
+        raise NotImplementedError()
+
+    def to_json_schema(self, service, spec, direction):
+        schema = {
+            "type": "object",
+            "properties": self._get_pagination_parameters_schema(),
+        }
+        if self._param is None:
+            return schema
+        return {"allOf": [self._param.to_json_schema(service, spec, direction), schema]}
+
+
+class KeysetPaginatedList(RestMethodParam):
+    def __init__(self, param):
+        """Output param returning the result of a method paginated with
+        KeysetPagination into an envelope with the cursor of the next page:
+        {"items": [...], "next_cursor": "..."}. The next cursor is null on
+        the last page.
+
+        :param param: the RestMethodParam processing the list of items
+                      (CerberusListValidator, Datamodel with is_list,
+                      PydanticModelList, ...)
+        """
+        self._param = param
+
+    def _make_envelope(self, service, items):
+        page = getattr(service.work, "keyset_page", None)
+        return {"items": items, "next_cursor": page.next_cursor if page else None}
+
+    def from_params(self, service, params):
+        raise NotImplementedError()
+
+    def to_response(self, service, result):
+        return self._make_envelope(service, self._param.to_response(service, result))
+
+    def to_response_unvalidated(self, service, result):
+        return self._make_envelope(
+            service, self._param.to_response_unvalidated(service, result)
+        )
+
+    def to_openapi_query_parameters(self, service, spec):
+        raise NotImplementedError()
+
+    def to_openapi_requestbody(self, service, spec):
+        raise NotImplementedError()
+
+    def to_openapi_responses(self, service, spec):
+        return {
+            "200": {
+                "content": {
+                    "application/json": {
+                        "schema": self.to_json_schema(service, spec, "output")
+                    }
+                }
+            }
+        }
+
+    def to_json_schema(self, service, spec, direction):
+        return {
+            "type": "object",
+            "required": ["items"],
+            "properties": {
+                "items": self._param.to_json_schema(service, spec, direction),
+                "next_cursor": {"type": "string", "nullable": True},
+            },
+        }
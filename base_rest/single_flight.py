@@ -0,0 +1,108 @@
+# Copyright 2026 ACSONE SA/NV
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+"""Coalescing of the identical concurrent GET requests to the restapi
+methods declared with a ``single_flight`` option (see ``restapi.method``).
+
+The first request (the leader) calls the method while the identical requests
+received in the meantime by the same worker process wait for its encoded
+response instead of running the same queries. If the leader fails, times out
+or returns a response which can't be shared (not a 200 response, a streamed
+response, ...), the waiting requests call the method themselves.
+
+The requests are only coalesced between the threads of a process: in
+multi-process mode, each worker processes one request at a time.
+
+The waiting requests hold their database cursor (and its connection of the
+pool limited by ``db_maxconn``) while waiting: the default timeout is short
+and a burst of identical requests needs as many connections as without
+coalescing.
+"""
+
+import collections
+import threading
+
+from .cache import RESPONSE_CACHE_VARY_BY
+from .metrics import _metrics_registry
+
+# The single flight options of a restapi method
+SingleFlightOptions = collections.namedtuple(
+    "SingleFlightOptions", ["vary_by", "timeout"]
+)
+
+_single_flight_requests = _metrics_registry.counter(
+    "base_rest_single_flight_requests_total",
+    "Number of coalesced REST requests by role (leader, shared or fallback)",
+)
+
+
+class Flight(object):
+    """A call in flight whose response is shared with the identical
+    requests"""
+
+    __slots__ = ("_event", "response")
+
+    def __init__(self):
+        self._event = threading.Event()
+        # the CachedResponse shared with the waiting requests
+        self.response = None
+
+    def wait(self, timeout=None):
+        """Wait for the end of the call
+
+        :return: the CachedResponse of the call or None if it can't be shared
+        """
+        if not self._event.wait(timeout):
+            return None
+        return self.response
+
+    def _land(self):
+        self._event.set()
+
+
+class SingleFlightGroup(object):
+    """The calls in flight of the worker process by key"""
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def join(self, key):
+        """Return the (flight, leader) of the key. The leader must call
+        ``leave`` once the response of the flight is set."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                return flight, False
+            flight = self._flights[key] = Flight()
+            return flight, True
+
+    def leave(self, key, flight):
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        flight._land()
+
+
+_single_flight_group = SingleFlightGroup()
+
+
+def get_single_flight_options(single_flight):
+    """Normalize the ``single_flight`` option of a restapi method
+
+    :param single_flight: True or a dict with the keys 'vary_by' (a list of
+                          values into RESPONSE_CACHE_VARY_BY, all by default)
+                          and 'timeout' (the number of seconds the identical
+                          requests wait for the response, default 5)
+    :return: SingleFlightOptions or None
+    """
+    if not single_flight:
+        return None
+    if not isinstance(single_flight, dict):
+        single_flight = {}
+    vary_by = tuple(single_flight.get("vary_by", RESPONSE_CACHE_VARY_BY))
+    unknown = set(vary_by) - set(RESPONSE_CACHE_VARY_BY)
+    if unknown:
+        raise ValueError(
+            "Unknown single_flight vary_by values: %s" % ", ".join(unknown)
+        )
+    return SingleFlightOptions(vary_by=vary_by, timeout=single_flight.get("timeout", 5))
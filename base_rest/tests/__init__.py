@@ -1,6 +1,25 @@
 from . import common
+from . import test_api_docs
+from . import test_async_job
+from . import test_batch
+from . import test_binary_data
+from . import test_bulk
+from . import test_cerberus_compiler
 from . import test_cerberus_list_validator
 from . import test_cerberus_validator
+from . import test_compression
+from . import test_conditional_request
 from . import test_controller_builder
+from . import test_dispatch_plan
+from . import test_ir_rule
+from . import test_json_codec
+from . import test_keyset_pagination
+from . import test_metrics
 from . import test_openapi_generator
+from . import test_output_validation
+from . import test_rate_limit
+from . import test_res_lang
+from . import test_response_cache
 from . import test_service_context_provider
+from . import test_single_flight
+from . import test_sparse_fields
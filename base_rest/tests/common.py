@@ -5,6 +5,12 @@
 # License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
 
 import copy
+from contextlib import contextmanager
+from unittest import mock
+
+from werkzeug.exceptions import NotFound
+from werkzeug.test import EnvironBuilder
+from werkzeug.wrappers import Request
 
 from odoo import http
 from odoo.tests.common import TransactionCase, get_db_name
@@ -26,9 +32,49 @@ from ..core import (
     _rest_controllers_per_module,
     _rest_services_databases,
 )
+from ..http import RestApiDispatcher
 from ..tools import ROUTING_DECORATOR_ATTR, _inspect_methods
 
 
+@contextmanager
+def mock_rest_request(env, path="/", method="GET", headers=None, **kwargs):
+    """Push a mocked request to a restapi route on the request stack
+
+    The http request is a werkzeug request built from the given path,
+    method, headers and EnvironBuilder arguments and the request is
+    dispatched by a RestApiDispatcher.
+    """
+    environ_base = {"REMOTE_ADDR": "127.0.0.1"}
+    httprequest = Request(
+        EnvironBuilder(
+            path=path,
+            method=method,
+            headers=headers,
+            environ_base=environ_base,
+            **kwargs
+        ).get_environ()
+    )
+    request = mock.Mock(
+        env=env,
+        db=env.cr.dbname,
+        registry=env.registry,
+        httprequest=httprequest,
+        params={},
+    )
+    request.make_response = (
+        lambda data, headers=None, cookies=None, status=200: http.Response(
+            data, headers=headers, status=status
+        )
+    )
+    request.not_found = NotFound
+    request.dispatcher = RestApiDispatcher(request)
+    http._request_stack.push(request)
+    try:
+        yield request
+    finally:
+        http._request_stack.pop()
+
+
 class RegistryMixin(object):
     @classmethod
     def setUpRegistry(cls):
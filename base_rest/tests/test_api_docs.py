@@ -0,0 +1,90 @@
+# Copyright 2026 ACSONE SA/NV
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+from unittest import mock
+
+from odoo.tests.common import get_db_name
+
+from odoo.addons.component.core import Component
+
+from .. import restapi
+from ..controllers.api_docs import ApiDocsController
+from ..core import _rest_services_cache, _rest_services_databases
+from .common import TransactionRestServiceRegistryCase, mock_rest_request
+
+
+class TestApiDocs(TransactionRestServiceRegistryCase):
+    """Test the cache and the conditional responses of the openapi
+    documents"""
+
+    def setUp(self):
+        super().setUp()
+        self._setup_registry(self)
+
+        # pylint: disable=R7980
+        class TestService(Component):
+            _inherit = "base.rest.service"
+            _name = "test.partner.service"
+            _usage = "partner"
+            _collection = self._collection_name
+            _description = "test"
+
+            @restapi.method([(["/<int:id>"], "GET")], auth="public")
+            def get(self, _id):
+                return {"name": self.env["res.partner"].browse(_id).name}
+
+        self._build_services(self, TestService)
+        self.service_class = TestService
+        _rest_services_cache.invalidate()
+
+    def tearDown(self):
+        self._teardown_registry(self)
+        super().tearDown()
+
+    def _get_document(self, headers=None, lang="en_US"):
+        env = self.env(context=dict(self.env.context, lang=lang))
+        with mock_rest_request(env, headers=headers):
+            return ApiDocsController().api("test_controller", "partner")
+
+    def _count_to_openapi_calls(self):
+        return mock.patch.object(
+            self.service_class,
+            "to_openapi",
+            autospec=True,
+            side_effect=self.service_class.to_openapi,
+        )
+
+    def test_etag(self):
+        response = self._get_document()
+        self.assertEqual(response.status_code, 200)
+        etag = response.get_etag()[0]
+        self.assertTrue(etag)
+        self.assertIn("/{id}", response.get_json()["paths"])
+        response = self._get_document(headers={"If-None-Match": '"%s"' % etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(response.get_data())
+        self.assertEqual(response.get_etag()[0], etag)
+        response = self._get_document(headers={"If-None-Match": '"other"'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_cache(self):
+        self.env["res.lang"]._activate_lang("fr_FR")
+        with self._count_to_openapi_calls() as to_openapi:
+            etag = self._get_document().get_etag()[0]
+            self.assertEqual(self._get_document().get_etag()[0], etag)
+            self.assertEqual(to_openapi.call_count, 1)
+            # the document is cached by lang
+            self._get_document(lang="fr_FR")
+            self.assertEqual(to_openapi.call_count, 2)
+            self._get_document(lang="fr_FR")
+            self.assertEqual(to_openapi.call_count, 2)
+
+    def test_registry_reload(self):
+        with self._count_to_openapi_calls() as to_openapi:
+            self._get_document()
+            # the cache is invalidated when the services registry is rebuilt
+            generation = _rest_services_cache.generation
+            self.env["rest.service.registration"]._init_global_registry()
+            _rest_services_databases[get_db_name()] = self._service_registry
+            self.assertEqual(_rest_services_cache.generation, generation + 1)
+            self._get_document()
+            self.assertEqual(to_openapi.call_count, 2)
@@ -0,0 +1,181 @@
+# Copyright 2026 ACSONE SA/NV
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+import datetime
+import json
+from unittest import mock
+
+from werkzeug.exceptions import NotFound
+
+from odoo import fields, http
+from odoo.tools.config import config
+
+from odoo.addons.component.core import Component
+
+from .. import restapi
+from ..tools import ROUTING_DECORATOR_ATTR
+from .common import TransactionRestServiceRegistryCase, mock_rest_request
+
+
+class TestAsyncJob(TransactionRestServiceRegistryCase):
+    def setUp(self):
+        super().setUp()
+        self._setup_registry(self)
+
+        # pylint: disable=R7980
+        class TestService(Component):
+            _inherit = "base.rest.service"
+            _name = "test.partner.service"
+            _usage = "partner"
+            _collection = self._collection_name
+            _description = "test"
+
+            @restapi.method(
+                [(["/<int:id>/rename"], "POST")],
+                input_param=restapi.CerberusValidator(
+                    {"name": {"type": "string", "required": True}}
+                ),
+                output_param=restapi.CerberusValidator(
+                    {"name": {"type": "string", "required": True}}
+                ),
+                run_async=True,
+            )
+            def rename(self, _id, name):
+                partner = self.env["res.partner"].browse(_id)
+                partner.name = name
+                return {"name": partner.name}
+
+        self._build_services(self, TestService)
+        self.service_class = TestService
+        self.controller = self._get_controller_for(TestService)()
+        self.partner = self.env["res.partner"].create({"name": "Partner"})
+
+    def tearDown(self):
+        self._teardown_registry(self)
+        super().tearDown()
+
+    def _create_job(self, params):
+        return self.env["rest.async.job"].create(
+            {
+                "root_path": self._BaseTestController._root_path,
+                "collection_name": self._collection_name,
+                "usage": "partner",
+                "method_name": "rename",
+                "args": json.dumps([self.partner.id]),
+                "params": json.dumps(params),
+                "user_id": self.env.uid,
+            }
+        )
+
+    def test_plan_and_route(self):
+        service = self._get_service_component(self, "partner")
+        self.assertTrue(service._get_dispatch_plan("rename").run_async)
+        controllers = [
+            ctrl
+            for ctrl in http.Controller.children_classes["base_rest"]
+            if "get_async_job" in vars(ctrl)
+        ]
+        self.assertEqual(len(controllers), 1)
+        routing = getattr(controllers[0].get_async_job, ROUTING_DECORATOR_ATTR)
+        self.assertEqual(
+            routing["routes"], ["/test_controller/async_job/<string:job_id>"]
+        )
+        self.assertEqual(routing["methods"], ["GET"])
+
+    def test_run(self):
+        job = self._create_job({"name": "Renamed"})
+        self.assertEqual(job._get_status(), {"id": job.uuid, "state": "pending"})
+        self.assertEqual(
+            job._get_status_path(), "/test_controller/async_job/%s" % job.uuid
+        )
+        job._run()
+        self.assertEqual(self.partner.name, "Renamed")
+        self.assertEqual(
+            job._get_status(),
+            {"id": job.uuid, "state": "done", "result": {"name": "Renamed"}},
+        )
+
+    def test_run_failed(self):
+        job = self._create_job({"name": 10})
+        job._run()
+        self.assertEqual(job.state, "failed")
+        self.assertIn("name", job._get_status()["error"])
+        self.assertEqual(self.partner.name, "Partner")
+
+    def _enqueue(self, name):
+        path = "/test_controller/partner/%s/rename" % self.partner.id
+        with mock_rest_request(self.env, path, "POST"):
+            return self.controller._process_method(
+                "partner", "rename", self.partner.id, params={"name": name}
+            )
+
+    def test_enqueue(self):
+        response = self._enqueue("Renamed")
+        self.assertEqual(response.status_code, 202)
+        job = self.env["rest.async.job"].search([], order="id desc", limit=1)
+        self.assertEqual(response.get_json(), {"id": job.uuid, "state": "pending"})
+        self.assertEqual(response.headers["Location"], job._get_status_path())
+        self.assertEqual(json.loads(job.params), {"name": "Renamed"})
+        # the method is run by the job
+        self.assertEqual(self.partner.name, "Partner")
+
+    def test_enqueue_multi_process(self):
+        """The jobs are run by the cron in multi-process mode"""
+        cron = self.env.ref("base_rest.ir_cron_run_pending_rest_async_jobs")
+        triggers = self.env["ir.cron.trigger"].search([("cron_id", "=", cron.id)])
+        with mock.patch.dict(config.options, {"workers": 2}):
+            self.assertEqual(self._enqueue("Renamed").status_code, 202)
+        self.assertGreater(
+            self.env["ir.cron.trigger"].search([("cron_id", "=", cron.id)]), triggers
+        )
+
+    def test_process_async_job(self):
+        self._enqueue("Renamed")
+        job = self.env["rest.async.job"].search([], order="id desc", limit=1)
+        with mock_rest_request(self.env, job._get_status_path()):
+            response = self.controller._process_async_job(job_id=job.uuid)
+            self.assertEqual(response.get_json(), job._get_status())
+            # only the owner of the job has access to it
+            job.authenticated_partner_id = self.partner
+            with self.assertRaises(NotFound):
+                self.controller._process_async_job(job_id=job.uuid)
+            job.write(
+                {
+                    "authenticated_partner_id": False,
+                    "user_id": self.env.ref("base.public_user").id,
+                }
+            )
+            with self.assertRaises(NotFound):
+                self.controller._process_async_job(job_id=job.uuid)
+
+    def test_interrupted(self):
+        """The jobs started for too long are marked as failed by the cron"""
+        job = self._create_job({"name": "Renamed"})
+        started = self._create_job({"name": "Renamed"})
+        started.write(
+            {
+                "state": "started",
+                "date_started": fields.Datetime.now() - datetime.timedelta(minutes=5),
+            }
+        )
+        job.write(
+            {
+                "state": "started",
+                "date_started": fields.Datetime.now() - datetime.timedelta(hours=2),
+            }
+        )
+        self.env["rest.async.job"]._cron_run_pending_jobs()
+        self.assertEqual(job.state, "failed")
+        self.assertTrue(job.error)
+        self.assertEqual(started.state, "started")
+
+    def test_stream_not_async(self):
+        """The methods with a streamed input or output can't be run
+        asynchronously"""
+        service = self._get_service_component(self, "partner")
+
+        @restapi.method([(["/export"], "GET")], output_stream=True, run_async=True)
+        def export(self):
+            return iter([])
+
+        with self.assertRaises(ValueError):
+            service._build_dispatch_plan(export)
@@ -0,0 +1,237 @@
+# Copyright 2026 ACSONE SA/NV
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+import json
+
+from werkzeug.exceptions import BadRequest
+
+from odoo.exceptions import MissingError, UserError
+from odoo.http import Response
+from odoo.tools import mute_logger
+
+from odoo.addons.component.core import Component
+
+from .. import restapi
+from .common import TransactionRestServiceRegistryCase, mock_rest_request
+
+
+class TestBatch(TransactionRestServiceRegistryCase):
+    """Test the processing of the requests of the batch route"""
+
+    def setUp(self):
+        super().setUp()
+        self._setup_registry(self)
+        self._BaseTestController._batch_enabled = True
+        self._BaseTestController._batch_max_items = 3
+
+        # pylint: disable=R7980
+        class TestService(Component):
+            _inherit = "base.rest.service"
+            _name = "test.partner.service"
+            _usage = "partner"
+            _collection = self._collection_name
+            _description = "test"
+
+            @restapi.method(
+                [(["/<int:id>"], "GET")],
+                output_param=restapi.CerberusValidator({"name": {"type": "string"}}),
+            )
+            def get(self, _id):
+                partner = self.env["res.partner"].browse(_id)
+                if not partner.exists():
+                    raise MissingError("Partner %s not found" % _id)
+                return {"name": partner.name}
+
+            @restapi.method(
+                [(["/<int:id>/rename"], "POST")],
+                input_param=restapi.CerberusValidator(
+                    {"name": {"type": "string", "required": True}}
+                ),
+                output_param=restapi.CerberusValidator({"name": {"type": "string"}}),
+            )
+            def rename(self, _id, name):
+                partner = self.env["res.partner"].browse(_id)
+                partner.name = name
+                if name == "invalid":
+                    raise UserError("Invalid name")
+                return {"name": partner.name}
+
+            @restapi.method(
+                [(["/<int:id>/private"], "GET")],
+                output_param=restapi.CerberusValidator({"name": {"type": "string"}}),
+                auth="user",
+            )
+            def private(self, _id):
+                return {"name": self.env["res.partner"].browse(_id).name}
+
+            @restapi.method(
+                [(["/<int:id>/details"], "GET")],
+                output_param=restapi.CerberusValidator(
+                    {"id": {"type": "integer"}, "name": {"type": "string"}}
+                ),
+                sparse_fields=True,
+            )
+            def details(self, _id):
+                partner = self.env["res.partner"].browse(_id)
+                return {"id": partner.id, "name": partner.name}
+
+            @restapi.method(
+                [(["/search"], "GET")],
+                input_param=restapi.KeysetPagination(order="id"),
+                output_param=restapi.KeysetPaginatedList(
+                    restapi.CerberusListValidator({"id": {"type": "integer"}})
+                ),
+            )
+            def search(self):
+                partners = self.work.keyset_page.search(self.env["res.partner"], [])
+                return [{"id": partner.id} for partner in partners]
+
+            @restapi.method(
+                [(["/first"], "GET")],
+                output_param=restapi.KeysetPaginatedList(
+                    restapi.CerberusListValidator({"id": {"type": "integer"}})
+                ),
+            )
+            def first(self):
+                return [{"id": self.env["res.partner"].search([], limit=1).id}]
+
+            @restapi.method(
+                [(["/<int:id>/download"], "GET")],
+                output_param=restapi.BinaryData(),
+            )
+            def download(self, _id):
+                self.env["res.partner"].browse(_id).name = "Downloaded"
+                return Response(b"data", content_type="application/octet-stream")
+
+        self._build_services(self, TestService)
+        self.controller = self._get_controller_for(TestService)()
+        self.partner = self.env.ref("base.main_partner")
+        self.name = self.partner.name
+
+    def tearDown(self):
+        self._teardown_registry(self)
+        super().tearDown()
+
+    def _process_batch(self, requests):
+        with mock_rest_request(self.env, "/test_controller/batch", "POST"):
+            response = self.controller._process_batch(requests=requests)
+        return json.loads(response.get_data())["responses"]
+
+    def test_batch(self):
+        responses = self._process_batch(
+            [
+                {"path": "partner/%s" % self.partner.id},
+                {
+                    "method": "POST",
+                    "path": "partner/%s/rename" % self.partner.id,
+                    "params": {"name": "Renamed"},
+                },
+            ]
+        )
+        self.assertEqual(
+            responses,
+            [
+                {"status": 200, "body": {"name": self.name}},
+                {"status": 200, "body": {"name": "Renamed"}},
+            ],
+        )
+        self.assertEqual(self.partner.name, "Renamed")
+
+    @mute_logger("odoo.addons.base_rest.http")
+    def test_savepoint(self):
+        """The changes of a failed request are rolled back, not the ones of
+        the other requests"""
+        responses = self._process_batch(
+            [
+                {
+                    "method": "POST",
+                    "path": "partner/%s/rename" % self.partner.id,
+                    "params": {"name": "invalid"},
+                },
+                {"path": "partner/%s" % self.partner.id},
+            ]
+        )
+        self.assertEqual(responses[0]["status"], 400)
+        self.assertEqual(responses[0]["body"]["description"], "Invalid name")
+        self.assertEqual(responses[1], {"status": 200, "body": {"name": self.name}})
+        self.assertEqual(self.partner.name, self.name)
+
+    @mute_logger("odoo.addons.base_rest.http")
+    def test_errors(self):
+        """The errors are mapped to responses by the dispatcher"""
+        missing_id = self.env["res.partner"].search([], order="id desc", limit=1).id
+        responses = self._process_batch(
+            [
+                {"path": "partner/%s" % (missing_id + 1)},
+                {"path": "unknown"},
+                {"method": "POST", "path": "partner/%s/rename" % self.partner.id},
+            ]
+        )
+        self.assertEqual(
+            [response["status"] for response in responses], [404, 404, 400]
+        )
+        self.assertEqual(responses[0]["body"]["name"], "Not Found")
+        self.assertEqual(responses[1]["body"]["code"], 404)
+
+    def test_auth(self):
+        """The routes requiring another authentication are refused"""
+        responses = self._process_batch(
+            [{"path": "partner/%s/private" % self.partner.id}]
+        )
+        self.assertEqual(responses[0]["status"], 403)
+
+    def test_max_items(self):
+        requests = [{"path": "partner/%s" % self.partner.id}] * 4
+        with self.assertRaises(BadRequest):
+            self._process_batch(requests)
+        self.assertEqual(len(self._process_batch(requests[:3])), 3)
+
+    def test_converters(self):
+        """The routes are matched with the converters of odoo"""
+        with mock_rest_request(self.env):
+            routing_map = self.controller._get_batch_routing_map()
+            self.assertIn("model", routing_map.converters)
+            endpoint, args = routing_map.bind("").match(
+                "/test_controller/partner/-1", method="GET"
+            )
+        self.assertEqual(endpoint.rest_service_method_name, "get")
+        self.assertEqual(args, {"id": -1})
+
+    def test_work_context(self):
+        """The attributes of the work context set by a request are not
+        shared with the next ones"""
+        responses = self._process_batch(
+            [
+                {"path": "partner/search", "params": {"limit": 1}},
+                {"path": "partner/first"},
+                {
+                    "path": "partner/%s/details" % self.partner.id,
+                    "params": {"fields": "id"},
+                },
+            ]
+        )
+        self.assertEqual([response["status"] for response in responses], [200] * 3)
+        self.assertTrue(responses[0]["body"]["next_cursor"])
+        self.assertIsNone(responses[1]["body"]["next_cursor"])
+        self.assertEqual(responses[2]["body"], {"id": self.partner.id})
+        responses = self._process_batch(
+            [
+                {
+                    "path": "partner/%s/details" % self.partner.id,
+                    "params": {"fields": "id"},
+                },
+                {"path": "partner/%s/details" % self.partner.id},
+            ]
+        )
+        self.assertEqual(responses[0]["body"], {"id": self.partner.id})
+        self.assertEqual(
+            responses[1]["body"], {"id": self.partner.id, "name": self.name}
+        )
+
+    @mute_logger("odoo.addons.base_rest.http")
+    def test_binary(self):
+        """The binary responses are rejected and their request rolled back"""
+        responses = self._process_batch(
+            [{"path": "partner/%s/download" % self.partner.id}]
+        )
+        self.assertEqual(responses[0]["status"], 400)
+        self.assertEqual(self.partner.name, self.name)
@@ -0,0 +1,94 @@
+# Copyright 2026 ACSONE SA/NV
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+
+import io
+from unittest import mock
+
+from werkzeug.datastructures import FileStorage
+from werkzeug.test import EnvironBuilder
+from werkzeug.wrappers import Request
+
+from odoo import http
+from odoo.exceptions import UserError
+from odoo.tests.common import BaseCase, MetaCase
+
+from .. import restapi
+
+
+class TestBinaryData(BaseCase, MetaCase("DummyCase", (object,), {})):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.content = bytes(range(256)) * 4
+
+    def _mock_request(self, **kwargs):
+        request = mock.Mock()
+        request.httprequest = Request(EnvironBuilder(**kwargs).get_environ())
+        request.make_response = lambda data, headers=None, cookies=None: (
+            http.Response(data, headers=headers)
+        )
+        return mock.patch.object(http, "request", request)
+
+    def _to_response(self, result, **kwargs):
+        with self._mock_request(**kwargs):
+            return restapi.BinaryData(mediatypes="application/pdf").to_response(
+                None, result
+            )
+
+    def test_bytes(self):
+        response = self._to_response(self.content)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content_length, len(self.content))
+        self.assertEqual(response.mimetype, "application/pdf")
+        self.assertEqual(response.get_data(), self.content)
+        response = self._to_response(self.content, headers={"Range": "bytes=10-19"})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.headers["Content-Range"], "bytes 10-19/1024")
+        self.assertEqual(b"".join(response.response), self.content[10:20])
+
+    def test_file(self):
+        response = self._to_response(io.BytesIO(self.content))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.direct_passthrough)
+        self.assertEqual(response.content_length, len(self.content))
+        self.assertEqual(response.headers["Accept-Ranges"], "bytes")
+        self.assertEqual(b"".join(response.response), self.content)
+        response = self._to_response(
+            io.BytesIO(self.content), headers={"Range": "bytes=1000-"}
+        )
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.content_length, 24)
+        self.assertEqual(b"".join(response.response), self.content[1000:])
+
+    def test_iterator(self):
+        chunks = (self.content[i : i + 100] for i in range(0, len(self.content), 100))
+        response = self._to_response(chunks, headers={"Range": "bytes=0-9"})
+        # the length is unknown: chunked transfer, ranges not supported
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.content_length)
+        self.assertEqual(b"".join(response.response), self.content)
+
+    def test_upload_spooled(self):
+        binary = restapi.BinaryData(spool_max_size=100, required=True)
+        with self._mock_request(
+            method="POST", data=self.content, content_type="application/pdf"
+        ):
+            upload = binary.from_params(None, {})
+        self.assertIsInstance(upload, FileStorage)
+        self.assertEqual(upload.mimetype, "application/pdf")
+        # rolled over to the disk above the threshold
+        self.assertTrue(upload.stream._rolled)
+        self.assertEqual(upload.read(), self.content)
+        with self._mock_request(method="POST", content_type="application/pdf"):
+            with self.assertRaises(UserError):
+                binary.from_params(None, {})
+
+    def test_upload_params(self):
+        # without spool_max_size, the method receives the params
+        binary = restapi.BinaryData()
+        params = {"name": "test"}
+        self.assertIs(binary.from_params(None, params), params)
+        # the files of a multipart request are given as is
+        part = FileStorage(io.BytesIO(self.content), filename="test.pdf")
+        binary = restapi.BinaryData(spool_max_size=100)
+        self.assertIs(binary.from_params(None, part), part)
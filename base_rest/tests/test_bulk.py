@@ -0,0 +1,108 @@
+# Copyright 2026 ACSONE SA/NV
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+
+from odoo.exceptions import UserError
+
+from odoo.addons.component.core import Component
+
+from ..tools import ROUTING_DECORATOR_ATTR
+from .common import TransactionRestServiceRegistryCase
+
+
+class TestBulk(TransactionRestServiceRegistryCase):
+    def setUp(self):
+        super().setUp()
+        self._setup_registry(self)
+
+        # pylint: disable=R7980
+        class TestService(Component):
+            _inherit = "base.rest.service"
+            _name = "test.partner.service"
+            _usage = "partner"
+            _collection = self._collection_name
+            _description = "test"
+            _bulk_methods = ["create", "update", "delete"]
+            _bulk_max_items = 3
+
+            def create(self, **params):
+                if params["name"] == "error":
+                    raise UserError("Invalid name")
+                return {"id": self.env["res.partner"].create(params).id}
+
+            def update(self, _id, **params):
+                self.env["res.partner"].browse(_id).write(params)
+                return {"id": _id}
+
+            def delete(self, _id):
+                self.env["res.partner"].browse(_id).unlink()
+                return {}
+
+            def _bulk_create(self, items):
+                partners = self.env["res.partner"].create(
+                    [item.params for item in items]
+                )
+                if "error" in partners.mapped("name"):
+                    raise UserError("Invalid name")
+                return [{"id": partner.id} for partner in partners]
+
+            def _validator_create(self):
+                return {"name": {"type": "string", "required": True}}
+
+            def _validator_update(self):
+                return {"name": {"type": "string", "required": True}}
+
+        self._build_services(self, TestService)
+        self.service = self._get_service_component(self, "partner")
+
+    def tearDown(self):
+        self._teardown_registry(self)
+        super().tearDown()
+
+    def test_routes(self):
+        controller = self._get_controller_for(self.service.__class__)
+        routes = self._get_controller_route_methods(controller)
+        for name in ("create", "update", "delete"):
+            routing = getattr(routes["post_bulk_%s" % name], ROUTING_DECORATOR_ATTR)
+            self.assertEqual(
+                routing["routes"], ["/test_controller/partner/bulk_%s" % name]
+            )
+            self.assertEqual(routing["methods"], ["POST"])
+
+    def test_bulk_create(self):
+        res = self.service.dispatch(
+            "bulk_create", params={"items": [{"name": "p1"}, {}, {"name": "error"}]}
+        )
+        results = res["results"]
+        self.assertEqual(len(results), 3)
+        partner = self.env["res.partner"].browse(results[0]["result"]["id"])
+        self.assertEqual(partner.name, "p1")
+        # invalid input
+        self.assertIn("name", results[1]["error"])
+        # isolated failing item
+        self.assertEqual(results[2], {"error": "Invalid name"})
+        self.assertFalse(self.env["res.partner"].search([("name", "=", "error")]))
+        with self.assertRaises(UserError):
+            # _bulk_max_items = 3
+            self.service.dispatch("bulk_create", params={"items": [{"name": "p"}] * 4})
+
+    def test_bulk_update_delete(self):
+        partners = self.env["res.partner"].create([{"name": "p1"}, {"name": "p2"}])
+        res = self.service.dispatch(
+            "bulk_update",
+            params={
+                "items": [
+                    {"id": partners[0].id, "name": "new p1"},
+                    {"name": "no id"},
+                    {"id": partners[1].id, "name": "new p2"},
+                ]
+            },
+        )
+        self.assertEqual(res["results"][0], {"result": {"id": partners[0].id}})
+        self.assertIn("error", res["results"][1])
+        self.assertEqual(partners.mapped("name"), ["new p1", "new p2"])
+        res = self.service.dispatch(
+            "bulk_delete",
+            params={"items": [{"id": partner.id} for partner in partners]},
+        )
+        self.assertEqual(res["results"], [{"result": {}}, {"result": {}}])
+        self.assertFalse(partners.exists())
@@ -0,0 +1,255 @@
+# Copyright 2026 ACSONE SA/NV
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+
+import copy
+import datetime
+import itertools
+import random
+from unittest import mock
+
+from cerberus import Validator
+
+from odoo.tests.common import BaseCase, MetaCase
+
+from ..restapi import BULK_RESULTS_SCHEMA, CerberusListValidator, CerberusValidator
+from ..tools import (
+    CompiledCerberusValidator,
+    _CerberusSchemaCompiler,
+    compile_cerberus_schema,
+    compile_cerberus_validator,
+)
+
+
+def to_int(value):
+    return int(value)
+
+
+SCHEMAS = [
+    {
+        "name": {"type": "string", "required": True, "nullable": True},
+        "title": {"type": "string", "allowed": ["mr", "mm"]},
+        "age": {"type": "integer", "default": 18, "min": 0, "max": 150},
+        "interests": {"type": "list", "schema": {"type": "string"}},
+    },
+    {
+        "name": {"type": "string", "required": True, "empty": False},
+        "country": {
+            "type": "dict",
+            "schema": {
+                "id": {"type": "integer", "required": True, "nullable": False},
+                "name": {"type": "string"},
+            },
+        },
+        "is_company": {"type": "boolean"},
+    },
+    {
+        "code": {"type": "string", "regex": "[A-Z]{2}", "minlength": 2},
+        "ref": {"type": "string", "regex": "[0-9]+$", "maxlength": 4},
+        "qty": {"type": "float", "coerce": float, "nullable": True},
+        "count": {"type": "integer", "coerce": to_int, "default": "1"},
+        "amount": {"type": "number", "min": 0.5},
+        "date": {"type": "date", "nullable": True, "default": None},
+    },
+    {
+        "lines": {
+            "type": "list",
+            "required": True,
+            "minlength": 1,
+            "maxlength": 3,
+            "schema": {
+                "type": "dict",
+                "schema": {
+                    "product_id": {"type": "integer", "required": True},
+                    "qty": {"type": "float", "default": 1.0},
+                    "tags": {
+                        "type": "list",
+                        "allowed": ["a", "b"],
+                        "schema": {"type": "string"},
+                    },
+                },
+            },
+        },
+        "options": {
+            "type": "dict",
+            "purge_unknown": False,
+            "nullable": True,
+            "schema": {"gift": {"type": "boolean", "default": False}},
+        },
+        "ids": {"type": "list", "schema": {"type": "integer", "coerce": int}},
+        "value": {"type": ["string", "integer"], "empty": True, "allowed": ["", 1]},
+        "anything": {"meta": {"description": "no type"}, "minlength": 1},
+    },
+    # no rule on the not null values
+    {
+        "id": {"required": True},
+        "note": {"nullable": True},
+        "any": {},
+        "count": {"coerce": int},
+    },
+    BULK_RESULTS_SCHEMA,
+]
+
+VALUES = [
+    None,
+    "",
+    "mr",
+    "AB",
+    "ab",
+    "1234",
+    "12345",
+    "3",
+    "x",
+    0,
+    1,
+    -1,
+    2,
+    0.25,
+    1.5,
+    True,
+    False,
+    200,
+    [],
+    ["a"],
+    ["a", "c"],
+    [1, "2"],
+    (1, 2),
+    {},
+    {"id": 1},
+    {"id": None, "name": "BE"},
+    {"id": "1", "extra": True},
+    {"gift": True, "extra": 1},
+    [{"product_id": 1}],
+    [{"product_id": 1, "qty": None, "tags": ["a"], "x": 1}, {"product_id": "2"}],
+    [{"qty": 2.0}],
+    [{}, {}, {}, {}],
+    [{"result": {"id": 1}}, {"result": None, "error": "invalid"}],
+    [{"error": 1}],
+    datetime.date(2020, 1, 1),
+]
+
+# documents valid against the schema of the same index
+VALID_DOCUMENTS = [
+    {"name": None, "title": "mm", "age": 18, "interests": ["a", "b"]},
+    {"name": "test", "country": {"id": 1, "name": "BE"}, "is_company": False},
+    {"code": "BE", "ref": "12", "qty": "1.5", "count": 2.0, "amount": 1},
+    {
+        "lines": [
+            {"product_id": 1, "qty": None, "tags": ["a", "b"], "x": 1},
+            {"product_id": 2, "tags": []},
+        ],
+        "options": {"gift": None},
+        "ids": ["1", 2, 3.0],
+        "value": "",
+        "anything": {"a": 1},
+    },
+    {"id": None, "note": None, "any": [1], "count": "2"},
+    {"results": [{"result": {"id": 1}}, {"result": None, "error": "invalid"}]},
+]
+
+
+class TestCerberusCompiler(BaseCase, MetaCase("DummyCase", (object,), {})):
+    """Compare the results of the compiled schemas with the ones of
+    Cerberus"""
+
+    def _get_documents(self, schema, count=300):
+        rnd = random.Random(42)
+        fields = list(schema) + ["unknown"]
+        documents = [
+            document for document in VALID_DOCUMENTS if set(document) <= set(fields)
+        ]
+        for field, value in itertools.product(fields, VALUES):
+            documents.append({field: value})
+        for _i in range(count):
+            documents.append(
+                {
+                    field: rnd.choice(VALUES)
+                    for field in rnd.sample(fields, rnd.randint(0, len(fields)))
+                }
+            )
+        return documents
+
+    def assertSameResult(self, compiled, validator, document):
+        original = copy.deepcopy(document)
+        expected = validator.validate(document)
+        result = compiled.validate(document)
+        msg = "document: %s" % document
+        self.assertEqual(result, expected, msg)
+        self.assertEqual(compiled.document, validator.document, msg)
+        self.assertEqual(compiled.errors, validator.errors, msg)
+        # the given document is not modified
+        self.assertEqual(document, original, msg)
+
+    def test_differential(self):
+        for schema in SCHEMAS:
+            validator = Validator(schema, purge_unknown=True)
+            compiled = compile_cerberus_validator(validator)
+            self.assertIsInstance(compiled, CompiledCerberusValidator)
+            for document in self._get_documents(schema):
+                self.assertSameResult(
+                    compiled, Validator(schema, purge_unknown=True), document
+                )
+
+    def test_valid_documents_not_validated_by_cerberus(self):
+        validator = Validator(SCHEMAS[1], purge_unknown=True)
+        compiled = compile_cerberus_validator(validator)
+        function = compiled.function
+        document = {"name": "test", "country": {"id": 1, "code": "BE"}}
+        self.assertTrue(function(document))
+        self.assertEqual(document, {"name": "test", "country": {"id": 1}})
+        self.assertFalse(function({"name": ""}))
+
+    def test_unsupported_schemas(self):
+        unsupported = [
+            {"name": {"type": "string", "readonly": True}},
+            {"name": {"type": "string", "coerce": "to_int"}},
+            {"name": {"type": "string", "rename": "title"}},
+            {"name": {"type": "objectid"}},
+            {"tags": {"type": "dict", "keysrules": {"type": "string"}}},
+            {"tags": {"type": ["dict", "list"], "schema": {"type": "string"}}},
+            {"tags": {"type": "list", "schema": {"type": "string", "default": ""}}},
+            {"tags": {"type": "dict", "purge_unknown": True}},
+        ]
+        for schema in unsupported:
+            self.assertIsNone(compile_cerberus_schema(schema), schema)
+        # the generated source can't be compiled
+        with mock.patch.object(
+            _CerberusSchemaCompiler, "_not_null_lines", return_value=["if v:"]
+        ), self.assertLogs("odoo.addons.base_rest.tools", "ERROR"):
+            self.assertIsNone(compile_cerberus_schema({"name": {"type": "string"}}))
+        self.assertIsNone(
+            compile_cerberus_validator(Validator(SCHEMAS[0], allow_unknown=True))
+        )
+
+    def test_copy(self):
+        validator = Validator(SCHEMAS[0], purge_unknown=True)
+        compiled = compile_cerberus_validator(validator)
+        compiled_copy = copy.copy(compiled)
+        self.assertTrue(compiled_copy.validate({"name": "test"}))
+        self.assertFalse(compiled.validate({}))
+        self.assertEqual(compiled_copy.document, {"name": "test", "age": 18})
+        self.assertTrue(compiled.errors)
+        self.assertEqual(compiled_copy.schema, validator.schema)
+
+    def test_cerberus_validator_flag(self):
+        v = CerberusValidator(schema=SCHEMAS[0], compiled=True)
+        validator = v.get_cerberus_validator(None, "input")
+        self.assertIsInstance(validator, CompiledCerberusValidator)
+        self.assertEqual(
+            v.from_params(None, {"name": "test", "unknown": 1}),
+            {"name": "test", "age": 18},
+        )
+        v = CerberusValidator(schema=SCHEMAS[0], compiled=False)
+        self.assertIsInstance(v.get_cerberus_validator(None, "input"), Validator)
+        # the schemas not supported are validated by Cerberus
+        v = CerberusValidator(
+            schema={"name": {"type": "string", "readonly": True}}, compiled=True
+        )
+        self.assertIsInstance(v.get_cerberus_validator(None, "input"), Validator)
+        v = CerberusListValidator(schema=SCHEMAS[1], compiled=True)
+        self.assertIsInstance(
+            v.get_cerberus_validator(None, "input"), CompiledCerberusValidator
+        )
+        self.assertEqual(
+            v.from_params(None, [{"name": "a"}, {"name": "b", "is_company": True}]),
+            [{"name": "a"}, {"name": "b", "is_company": True}],
+        )
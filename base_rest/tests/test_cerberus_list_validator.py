@@ -2,6 +2,7 @@
 # License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
 
 import unittest
+from unittest import mock
 
 from cerberus import Validator
 
@@ -9,7 +10,7 @@ from odoo.exceptions import UserError
 from odoo.tests.common import BaseCase, MetaCase
 
 from ..components.cerberus_validator import BaseRestCerberusValidator
-from ..restapi import CerberusListValidator
+from ..restapi import CerberusListValidator, StreamedInput, get_input_stream_options
 
 
 class TestCerberusListValidator(BaseCase, MetaCase("DummyCase", (object,), {})):
@@ -216,6 +217,95 @@ class TestCerberusListValidator(BaseCase, MetaCase("DummyCase", (object,), {})):
             # name required
             self.simple_schema_list_validator.to_response(None, result=[{}])
 
+    def test_to_response_items(self):
+        def result():
+            yield {"name": "test1", "unknown": True}
+            yield {"name": "test2"}
+
+        items = self.simple_schema_list_validator.to_response_items(
+            None, result=result()
+        )
+        # items are validated one by one while iterating
+        self.assertDictEqual(next(items), {"name": "test1"})
+        self.assertListEqual(list(items), [{"name": "test2"}])
+
+    def test_to_response_items_validation(self):
+        with self.assertRaises(SystemError):
+            # minItems = 1
+            list(self.simple_schema_list_validator.to_response_items(None, iter([])))
+        with self.assertRaises(SystemError):
+            # maxItems = 2
+            list(
+                self.simple_schema_list_validator.to_response_items(
+                    None, iter([{"name": "test"}, {"name": "test"}, {"name": "test"}])
+                )
+            )
+        items = self.simple_schema_list_validator.to_response_items(
+            None, iter([{"name": "test"}, {}])
+        )
+        self.assertDictEqual(next(items), {"name": "test"})
+        with self.assertRaises(SystemError):
+            # name required
+            next(items)
+
+    def test_from_params_items(self):
+        lines = [
+            b'{"name": "test1", "unknown": true}\n',
+            b"\n",
+            b'{"title": "mr"}\n',
+            b"{invalid\n",
+            b"[]\n",
+            b'{"name": "test2"}\n',
+            b'{"name": "test3"}\n',
+        ]
+        service = mock.Mock()
+        items = StreamedInput(
+            service,
+            self.nested_schema_list_validator,
+            iter(lines),
+            get_input_stream_options({"commit_every": 2}),
+        )
+        # the lines are read and validated one by one while iterating
+        iterator = iter(items)
+        self.assertDictEqual(next(iterator), {"name": "test1"})
+        self.assertEqual(items.line, 1)
+        self.assertDictEqual(next(iterator), {"name": "test2"})
+        self.assertEqual(items.line, 6)
+        service.env.cr.commit.assert_not_called()
+        self.assertListEqual(list(iterator), [{"name": "test3"}])
+        # committed once 2 items have been processed
+        service.env.cr.commit.assert_called_once_with()
+        report = items.get_report()
+        self.assertEqual(report["processed"], 3)
+        self.assertEqual(report["committed"], 2)
+        self.assertEqual(report["failed"], 3)
+        self.assertEqual([e["line"] for e in report["errors"]], [3, 4, 5])
+        self.assertDictEqual(
+            report["errors"][0]["errors"], {"name": ["required field"]}
+        )
+
+    def test_from_params_items_validation(self):
+        lines = [b'{"name": "test"}'] * 3 + [b"{}"] * 3
+        items = StreamedInput(
+            mock.Mock(),
+            self.simple_schema_list_validator,
+            iter(lines[3:]),
+            get_input_stream_options({"max_errors": 2}),
+        )
+        self.assertListEqual(list(items), [])
+        self.assertEqual(items.failed, 3)
+        self.assertEqual(len(items.errors), 2)
+        with self.assertRaises(UserError):
+            # maxItems = 2
+            list(
+                StreamedInput(
+                    mock.Mock(),
+                    self.simple_schema_list_validator,
+                    iter(lines[:3]),
+                    get_input_stream_options(True),
+                )
+            )
+
     def test_schema_lookup_from_string(self):
         class MyService(object):
             def _get_simple_schema(self):
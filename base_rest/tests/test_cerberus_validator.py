@@ -9,6 +9,8 @@ from odoo.exceptions import UserError
 from odoo.tests.common import BaseCase, MetaCase
 
 from ..components.cerberus_validator import BaseRestCerberusValidator
+from ..components.service import skip_validator_cache
+from ..core import _rest_services_cache
 from ..restapi import CerberusValidator
 from ..tools import cerberus_to_json
 
@@ -332,6 +334,52 @@ class TestCerberusValidator(BaseCase, MetaCase("DummyCase", (object,), {})):
         validator = v.get_cerberus_validator(my_service, "input")
         self.assertTrue(validator.require_all)
 
+    def test_schema_lookup_from_string_cached(self):
+        calls = []
+
+        class MyService(object):
+            def _get_simple_schema(self):
+                calls.append(1)
+                return {"name": {"type": "string", "required": True}}
+
+            def component(self, *args, **kwargs):
+                return BaseRestCerberusValidator(unittest.mock.Mock())
+
+        v = CerberusValidator(schema="_get_simple_schema")
+        validator1 = v.get_cerberus_validator(MyService(), "input")
+        validator2 = v.get_cerberus_validator(MyService(), "input")
+        self.assertEqual(len(calls), 1)
+        # each call get its own validator to not share the validation state
+        self.assertIsNot(validator1, validator2)
+        self.assertTrue(validator1.validate({"name": "test"}))
+        self.assertFalse(validator2.validate({}))
+        self.assertFalse(validator1.errors)
+        self.assertTrue(validator2.errors)
+        # the cache is by direction
+        v.get_cerberus_validator(MyService(), "output")
+        self.assertEqual(len(calls), 2)
+        # and invalidated when the registry is rebuilt
+        _rest_services_cache.invalidate()
+        v.get_cerberus_validator(MyService(), "input")
+        self.assertEqual(len(calls), 3)
+
+    def test_schema_lookup_from_string_skip_cache(self):
+        calls = []
+
+        class MyService(object):
+            @skip_validator_cache
+            def _get_simple_schema(self):
+                calls.append(1)
+                return {"name": {"type": "string", "required": True}}
+
+            def component(self, *args, **kwargs):
+                return BaseRestCerberusValidator(unittest.mock.Mock())
+
+        v = CerberusValidator(schema="_get_simple_schema")
+        v.get_cerberus_validator(MyService(), "input")
+        v.get_cerberus_validator(MyService(), "input")
+        self.assertEqual(len(calls), 2)
+
     def test_cerberus_key_value_mapping_to_openapi(self):
         schema = {
             "indexes": {
@@ -0,0 +1,91 @@
+# Copyright 2026 ACSONE SA/NV
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+
+import gzip
+import json
+from unittest import mock
+
+from werkzeug.test import EnvironBuilder
+from werkzeug.wrappers import Request
+
+from odoo.http import Response
+from odoo.tests.common import BaseCase, MetaCase
+
+from ..http import COMPRESSORS, RestApiDispatcher, get_compression_options
+
+
+class TestCompression(BaseCase, MetaCase("DummyCase", (object,), {})):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.data = {"items": [{"id": i, "name": "Partner %s" % i} for i in range(100)]}
+
+    def _get_dispatcher(self, accept_encoding=None, compression=True):
+        headers = {"Accept-Encoding": accept_encoding} if accept_encoding else {}
+        request = mock.Mock()
+        request.httprequest = Request(EnvironBuilder(headers=headers).get_environ())
+        request.make_response = lambda data, headers=None, cookies=None: Response(
+            data, headers=headers
+        )
+        dispatcher = RestApiDispatcher(request)
+        dispatcher.compression = get_compression_options(compression)
+        return dispatcher
+
+    def test_compression_options(self):
+        self.assertIsNone(get_compression_options(None))
+        self.assertIsNone(get_compression_options(False))
+        options = get_compression_options(True)
+        self.assertEqual(options.min_size, 1024)
+        self.assertEqual(options.level, 5)
+        self.assertEqual(options.encodings, list(COMPRESSORS))
+        options = get_compression_options(
+            {"min_size": 10, "level": 9, "encodings": ["gzip", "unknown"]}
+        )
+        self.assertEqual(options, (10, 9, ["gzip"]))
+
+    def test_gzip(self):
+        dispatcher = self._get_dispatcher("gzip, deflate")
+        response = dispatcher.make_json_response(self.data)
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response.vary)
+        self.assertEqual(json.loads(gzip.decompress(response.get_data())), self.data)
+        self.assertEqual(
+            int(response.headers["Content-Length"]), len(response.get_data())
+        )
+
+    def test_negotiation(self):
+        # brotli is preferred if available
+        dispatcher = self._get_dispatcher("gzip, br")
+        self.assertEqual(dispatcher.get_response_encoding(), next(iter(COMPRESSORS)))
+        dispatcher = self._get_dispatcher("gzip;q=1, br;q=0.5")
+        self.assertEqual(dispatcher.get_response_encoding(), "gzip")
+        dispatcher = self._get_dispatcher("identity")
+        self.assertIsNone(dispatcher.get_response_encoding())
+        response = dispatcher.make_json_response(self.data)
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertIn("Accept-Encoding", response.vary)
+
+    def test_not_compressed(self):
+        # compression disabled on the route
+        dispatcher = self._get_dispatcher("gzip", compression=None)
+        response = dispatcher.make_json_response(self.data)
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertNotIn("Accept-Encoding", response.vary)
+        # small body
+        dispatcher = self._get_dispatcher("gzip", compression={"min_size": 10**6})
+        response = dispatcher.make_json_response(self.data)
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertEqual(json.loads(response.get_data()), self.data)
+        # response already encoded
+        response = Response(b"x" * 2048, headers={"Content-Encoding": "br"})
+        self.assertEqual(dispatcher.compress_response(response).get_data(), b"x" * 2048)
+
+    def test_weak_etag(self):
+        dispatcher = self._get_dispatcher("gzip")
+        response = dispatcher.make_json_response(self.data)
+        dispatcher.set_conditional_headers(response, etag="abc")
+        self.assertEqual(response.get_etag(), ("abc", True))
+        dispatcher = self._get_dispatcher()
+        response = dispatcher.make_json_response(self.data)
+        dispatcher.set_conditional_headers(response, etag="abc")
+        self.assertEqual(response.get_etag(), ("abc", False))
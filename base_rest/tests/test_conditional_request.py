@@ -0,0 +1,176 @@
+# Copyright 2026 ACSONE SA/NV
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+import datetime
+import decimal
+
+from werkzeug.http import http_date
+
+from odoo.addons.component.core import Component
+
+from .. import restapi
+from ..controllers.main import _PseudoCollection
+from .common import TransactionRestServiceRegistryCase, mock_rest_request
+
+
+class TestConditionalRequest(TransactionRestServiceRegistryCase):
+    """Test the validators computed for the conditional requests"""
+
+    def setUp(self):
+        super().setUp()
+        self._setup_registry(self)
+        calls = self.calls = []
+
+        # pylint: disable=R7980
+        class TestService(Component):
+            _inherit = "base.rest.service"
+            _name = "test.partner.service"
+            _usage = "partner"
+            _collection = self._collection_name
+            _description = "test"
+
+            @restapi.method([(["/<int:id>"], "GET")], conditional="_get_last_modified")
+            def get(self, _id):
+                calls.append("get")
+                return {"name": self.env["res.partner"].browse(_id).name}
+
+            @restapi.method([(["/search"], "GET")], conditional="body")
+            def search(self):
+                calls.append("search")
+                return {"count": 1}
+
+            @restapi.method(
+                [(["/names"], "GET")],
+                output_param=restapi.CerberusListValidator(
+                    {"name": {"type": "string"}}
+                ),
+                conditional="body",
+            )
+            def names(self):
+                calls.append("names")
+                return [{"name": "test"}]
+
+            def _get_last_modified(self, _id):
+                return self.env["res.partner"].browse(_id)
+
+        self._build_services(self, TestService)
+        self.service = self._get_service_component(self, "partner")
+        self.controller = self._get_controller_for(TestService)()
+        self.partner = self.env.ref("base.main_partner")
+
+    def tearDown(self):
+        self._teardown_registry(self)
+        super().tearDown()
+
+    def test_dispatch_plan(self):
+        self.assertEqual(
+            self.service._get_dispatch_plan("get").conditional, "_get_last_modified"
+        )
+        self.assertEqual(self.service._get_dispatch_plan("search").conditional, "body")
+
+    def test_write_date_validators(self):
+        partner = self.env.ref("base.main_partner")
+        etag, last_modified = self.service._get_conditional_validators(partner)
+        self.assertTrue(etag)
+        self.assertEqual(last_modified, partner.write_date)
+        self.assertEqual(
+            self.service._get_conditional_validators(partner.write_date),
+            (etag, last_modified),
+        )
+        # the etag depends on the lang
+        env = self.env(context=dict(self.env.context, lang="fr_FR"))
+        collection = _PseudoCollection(self._collection_name, env)
+        service = self._get_service_component(self, "partner", collection=collection)
+        self.assertNotEqual(service._get_conditional_validators(partner)[0], etag)
+
+    def test_no_validator(self):
+        self.assertEqual(
+            self.service._get_conditional_validators(self.env["res.partner"]),
+            (None, None),
+        )
+        etag, last_modified = self.service._get_conditional_validators("v1")
+        self.assertTrue(etag)
+        self.assertIsNone(last_modified)
+
+    def _process_method(self, method_name, *args, headers=None):
+        with mock_rest_request(self.env, headers=headers):
+            return self.controller._process_method(
+                "partner", method_name, *args, params={}
+            )
+
+    def test_if_none_match(self):
+        response = self._process_method("get", self.partner.id)
+        self.assertEqual(response.status_code, 200)
+        etag = response.get_etag()[0]
+        self.assertTrue(etag)
+        self.assertEqual(
+            response.headers["Last-Modified"], http_date(self.partner.write_date)
+        )
+        self.assertEqual(self.calls, ["get"])
+        response = self._process_method(
+            "get", self.partner.id, headers={"If-None-Match": '"%s"' % etag}
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(response.get_data())
+        self.assertEqual(response.get_etag()[0], etag)
+        self.assertIn("Last-Modified", response.headers)
+        # the method is not called
+        self.assertEqual(self.calls, ["get"])
+        # the copy of the client is outdated
+        response = self._process_method(
+            "get", self.partner.id, headers={"If-None-Match": '"other"'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.calls, ["get", "get"])
+
+    def test_if_modified_since(self):
+        headers = {"If-Modified-Since": http_date(self.partner.write_date)}
+        response = self._process_method("get", self.partner.id, headers=headers)
+        self.assertEqual(response.status_code, 304)
+        self.assertTrue(response.get_etag()[0])
+        self.assertFalse(self.calls)
+        self.partner.name = "Modified"
+        self.partner.flush_recordset()
+        self.env.cr.execute(
+            "UPDATE res_partner SET write_date = write_date + interval '1 day' "
+            "WHERE id = %s",
+            (self.partner.id,),
+        )
+        self.partner.invalidate_recordset(["write_date"])
+        response = self._process_method("get", self.partner.id, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), {"name": "Modified"})
+
+    def test_body_etag(self):
+        response = self._process_method("search")
+        self.assertEqual(response.status_code, 200)
+        etag = response.get_etag()[0]
+        response = self._process_method(
+            "search", headers={"If-None-Match": '"%s"' % etag}
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.get_etag()[0], etag)
+        self.assertFalse(response.get_data())
+        # the method is called to compute the etag of its result
+        self.assertEqual(self.calls, ["search", "search"])
+
+    def test_body_etag_names(self):
+        etag = self._process_method("names").get_etag()[0]
+        self.assertTrue(etag)
+        response = self._process_method(
+            "names", headers={"If-None-Match": '"%s"' % etag}
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_body_etag_objects(self):
+        """The results with objects without stable encoding have no ETag"""
+
+        class Values(object):
+            name = "test"
+
+        with mock_rest_request(self.env):
+            self.assertIsNone(self.service._get_body_etag(Values()))
+            self.assertIsNone(self.service._get_body_etag([{"values": Values()}]))
+            data = {"date": datetime.date(2021, 1, 1), "amount": decimal.Decimal("1.5")}
+            etag = self.service._get_body_etag(data)
+            self.assertTrue(etag)
+            self.assertEqual(self.service._get_body_etag(dict(data)), etag)
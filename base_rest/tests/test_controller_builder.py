@@ -1,10 +1,19 @@
 # Copyright 2020 ACSONE SA/NV
 # License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
 from contextlib import contextmanager
+from unittest import mock
+
+from werkzeug.routing import Map, Rule
+
+from odoo import http
 
 from odoo.addons.component.core import Component
+from odoo.addons.component.tests.common import new_rollbacked_env
 
 from .. import restapi
+from ..apispec.restapi_method_route_plugin import RE_URL
+from ..core import _rest_services_cache
+from ..models.rest_service_registration import _inspect_cached_methods
 from ..tools import ROUTING_DECORATOR_ATTR
 from .common import TransactionRestServiceRegistryCase
 
@@ -661,6 +670,208 @@ class TestControllerBuilder2(TransactionRestServiceRegistryCase):
             "my_default_auth",
         )
 
+    def test_07(self):
+        """Test incremental rebuild of the controllers
+
+        The controllers generated for a collection are kept when the registry
+        is rebuilt with the same services definitions and regenerated if the
+        definitions change.
+        """
+
+        # pylint: disable=R7980
+        class TestService(Component):
+            _inherit = "base.rest.service"
+            _name = "test.partner.service"
+            _usage = "partner"
+            _collection = self._collection_name
+            _description = "test"
+
+            @restapi.method([(["/<int:id>/get"], "GET")])
+            def get(self, _id):
+                return {"name": self.env["res.partner"].browse(_id).name}
+
+        self._build_services(self, TestService)
+        controller = self._get_controller_for(TestService)
+        with new_rollbacked_env() as env:
+            env["rest.service.registration"]._build_controllers_routes(
+                self._service_registry
+            )
+        self.assertIs(self._get_controller_for(TestService), controller)
+
+        # pylint: disable=R7980
+        class TestServiceExtended(Component):
+            _inherit = "test.partner.service"
+
+            @restapi.method([(["/<int:id>/name"], "GET")])
+            def name(self, _id):
+                return {"name": self.env["res.partner"].browse(_id).name}
+
+        self._build_services(self, TestServiceExtended)
+        new_controller = self._get_controller_for(TestService)
+        self.assertIsNot(new_controller, controller)
+        self.assertIn("get_name", self._get_controller_route_methods(new_controller))
+        self.assertNotIn(controller, http.Controller.children_classes["base_rest"])
+
+    def test_08(self):
+        """Test the batch route generated if enabled on the controller"""
+        self._BaseTestController._default_auth = "my_default_auth"
+        self._BaseTestController._batch_enabled = True
+
+        # pylint: disable=R7980
+        class TestService(Component):
+            _inherit = "base.rest.service"
+            _name = "test.partner.service"
+            _usage = "partner"
+            _collection = self._collection_name
+            _description = "test"
+
+            @restapi.method([(["/<int:id>/get"], "GET")])
+            def get(self, _id):
+                return {"name": self.env["res.partner"].browse(_id).name}
+
+        self._build_services(self, TestService)
+        controller = self._get_controller_for(TestService)
+        method = self._get_controller_route_methods(controller)["get_get"]
+        self.assertEqual(method.rest_service_name, "partner")
+        self.assertEqual(method.rest_service_method_name, "get")
+        self.assertEqual(method.rest_args, ("id",))
+        batch_controllers = [
+            ctrl
+            for ctrl in http.Controller.children_classes["base_rest"]
+            if "post_batch" in vars(ctrl)
+        ]
+        self.assertEqual(len(batch_controllers), 1)
+        routes = self._get_controller_route_methods(batch_controllers[0])
+        self.assertDictEqual(
+            getattr(routes["post_batch"], ROUTING_DECORATOR_ATTR),
+            {
+                "type": "restapi",
+                "auth": "my_default_auth",
+                "cors": None,
+                "csrf": False,
+                "save_session": True,
+                "methods": ["POST"],
+                "routes": ["/test_controller/batch"],
+            },
+        )
+
+    def test_09(self):
+        """Test the metrics route and the metrics defaults"""
+        self._BaseTestController._metrics_route = True
+        self._BaseTestController._default_metrics = True
+
+        # pylint: disable=R7980
+        class TestService(Component):
+            _inherit = "base.rest.service"
+            _name = "test.partner.service"
+            _usage = "partner"
+            _collection = self._collection_name
+            _description = "test"
+
+            @restapi.method([(["/<int:id>/get"], "GET")], server_timing=True)
+            def get(self, _id):
+                return {"name": self.env["res.partner"].browse(_id).name}
+
+        self._build_services(self, TestService)
+        controller = self._get_controller_for(TestService)
+        routing = getattr(
+            self._get_controller_route_methods(controller)["get_get"],
+            ROUTING_DECORATOR_ATTR,
+        )
+        self.assertTrue(routing["metrics"])
+        self.assertTrue(routing["server_timing"])
+        metrics_controllers = [
+            ctrl
+            for ctrl in http.Controller.children_classes["base_rest"]
+            if "get_metrics" in vars(ctrl)
+        ]
+        self.assertEqual(len(metrics_controllers), 1)
+        routes = self._get_controller_route_methods(metrics_controllers[0])
+        routing = getattr(routes["get_metrics"], ROUTING_DECORATOR_ATTR)
+        self.assertEqual(routing["routes"], ["/test_controller/metrics"])
+        self.assertEqual(routing["methods"], ["GET"])
+
+    def test_10(self):
+        """Test the arguments extracted from the routes with converters"""
+
+        # pylint: disable=R7980
+        class TestService(Component):
+            _inherit = "base.rest.service"
+            _name = "test.partner.service"
+            _usage = "partner"
+            _collection = self._collection_name
+            _description = "test"
+
+            @restapi.method([(["/<int(min=1):id>/tag/<string:name>"], "GET")])
+            def tag(self, _id, name, **params):
+                return {}
+
+            @restapi.method([(["/tags"], "GET")])
+            def tags(self, **params):
+                return {}
+
+        self._build_services(self, TestService)
+        controller = self._get_controller_for(TestService)
+        routes = self._get_controller_route_methods(controller)
+        self.assertEqual(routes["get_tag"].rest_args, ("id", "name"))
+        self.assertEqual(routes["get_tags"].rest_args, ())
+        instance = controller()
+        with mock.patch.object(instance, "_process_method") as process_method:
+            # the args of the route are given as positional args and the
+            # other kwargs as params
+            routes["get_tag"](instance, id=3, name="vip", lang="fr_FR")
+            process_method.assert_called_once_with(
+                "partner", "tag", 3, "vip", collection=None, params={"lang": "fr_FR"}
+            )
+            process_method.reset_mock()
+            routes["get_tags"](instance, lang="fr_FR", collection="collection")
+            process_method.assert_called_once_with(
+                "partner",
+                "tags",
+                collection="collection",
+                params={"lang": "fr_FR"},
+            )
+
+    def test_11(self):
+        """Test the arguments of the routes are the ones parsed by werkzeug"""
+        for route in (
+            "/",
+            "/<int:id>",
+            "/<int(min=1):id>/tag/<string:name>",
+            "/<string(length=2):code>/<path:path>",
+            "/<any(a, b):kind>/<float:value>",
+            "/<id>/sub/<name>",
+        ):
+            rule = Rule(route)
+            Map([rule])
+            self.assertEqual(set(RE_URL.findall(route)), rule.arguments, route)
+
+    def test_12(self):
+        """Test the methods of the services inspected once by registry"""
+
+        # pylint: disable=R7980
+        class TestServiceOldApi(Component):
+            _inherit = "base.rest.service"
+            _name = "test.ping.service"
+            _usage = "ping"
+            _collection = self._collection_name
+            _description = "test"
+
+            def get(self, _id, message):
+                return {}
+
+        self._build_services(self, TestServiceOldApi)
+        service_cls = self._get_service_component(self, "ping").__class__
+        methods = _inspect_cached_methods(service_cls)
+        self.assertIs(_inspect_cached_methods(service_cls), methods)
+        # the methods fixed by the registration are the ones cached
+        self.assertTrue(hasattr(dict(methods)["get"], ROUTING_DECORATOR_ATTR))
+        # the methods are inspected again once the registry is rebuilt
+        _rest_services_cache.invalidate()
+        new_methods = _inspect_cached_methods(service_cls)
+        self.assertIsNot(new_methods, methods)
+        self.assertEqual(new_methods, methods)
+
 
 @contextmanager
 def _add_method(obj, name, method):
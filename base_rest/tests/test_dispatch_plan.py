@@ -0,0 +1,108 @@
+# Copyright 2026 ACSONE SA/NV
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+from unittest import mock
+
+from werkzeug.exceptions import NotFound
+
+from odoo.addons.component.core import Component
+
+from .. import restapi
+from ..components import service as service_module
+from ..core import _rest_services_cache
+from .common import TransactionRestServiceRegistryCase
+
+
+class TestDispatchPlan(TransactionRestServiceRegistryCase):
+    """Test the plans the calls to the methods of the services are
+    dispatched from"""
+
+    def setUp(self):
+        super().setUp()
+        self._setup_registry(self)
+
+        # pylint: disable=R7980
+        class TestService(Component):
+            _inherit = "base.rest.service"
+            _name = "test.partner.service"
+            _usage = "partner"
+            _collection = self._collection_name
+            _description = "test"
+
+            @restapi.method(
+                [(["/<int:id>"], "GET")],
+                input_param=restapi.CerberusValidator({"lang": {"type": "string"}}),
+                output_param=restapi.CerberusValidator({"name": {"type": "string"}}),
+                cache=30,
+            )
+            def get(self, _id, **params):
+                return self._get_partner_values(_id)
+
+            def _get_partner_values(self, _id):
+                return {"name": self.env["res.partner"].browse(_id).name}
+
+        self._build_services(self, TestService)
+        self.service = self._get_service_component(self, "partner")
+        self.partner = self.env.ref("base.main_partner")
+
+    def tearDown(self):
+        self._teardown_registry(self)
+        super().tearDown()
+
+    def test_plan(self):
+        plan = self.service._get_dispatch_plan("get")
+        self.assertEqual(plan.method_name, "get")
+        self.assertEqual(plan.routing["routes"], [(["/<int:id>"], "GET")])
+        self.assertIsInstance(plan.input_param, restapi.CerberusValidator)
+        self.assertIsInstance(plan.output_param, restapi.CerberusValidator)
+        self.assertFalse(plan.skip_secure_params)
+        self.assertFalse(plan.output_stream)
+        self.assertEqual(plan.cache.ttl, 30)
+        self.assertIsNone(plan.single_flight)
+        # the plan is computed once
+        self.assertIs(self.service._get_dispatch_plan("get"), plan)
+        self.assertEqual(
+            self.service.dispatch("get", self.partner.id), {"name": self.partner.name}
+        )
+
+    def test_invalidate(self):
+        plan = self.service._get_dispatch_plan("get")
+        _rest_services_cache.invalidate()
+        new_plan = self.service._get_dispatch_plan("get")
+        self.assertIsNot(new_plan, plan)
+        self.assertEqual(new_plan, plan)
+
+    def test_not_found(self):
+        # not a method
+        self.assertIsNone(self.service._get_dispatch_plan("_usage"))
+        with self.assertRaises(NotFound):
+            self.service.dispatch("_usage")
+        with self.assertRaises(NotFound):
+            self.service.dispatch("unknown")
+        # not a restapi method
+        self.assertIsNone(
+            self.service._get_dispatch_plan("_get_partner_values").routing
+        )
+        with self.assertRaises(NotFound):
+            self.service.dispatch("_get_partner_values", self.partner.id)
+
+    def test_without_plan(self):
+        """The plan of the method is taken from the cache if the callers of
+        _prepare_input_params and _prepare_response don't give it"""
+        self.service._get_dispatch_plan("get")
+        service_module._plan_less_calls.clear()
+        with mock.patch.object(
+            type(self.service),
+            "_build_dispatch_plan",
+            side_effect=AssertionError("Not cached"),
+        ), self.assertLogs(service_module._logger, "WARNING") as logs:
+            self.assertEqual(
+                self.service._prepare_input_params(self.service.get, {"lang": "fr_FR"}),
+                {"lang": "fr_FR"},
+            )
+            self.assertEqual(
+                self.service._prepare_response(self.service.get, {"name": "test"}),
+                {"name": "test"},
+            )
+        # the warning is logged once per method
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("DEPRECATED", logs.output[0])
@@ -0,0 +1,120 @@
+# Copyright 2026 ACSONE SA/NV
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+
+import logging
+import time
+from unittest import mock
+
+from odoo.tests.common import TransactionCase, new_test_user
+
+from ..models.ir_rule import _is_bindable_domain
+
+_logger = logging.getLogger(__name__)
+
+
+class TestIrRule(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = new_test_user(cls.env, login="test_rest_rule_user")
+        cls.rule = cls.env["ir.rule"].create(
+            {
+                "name": "Test authenticated partner rule",
+                "model_id": cls.env.ref("base.model_res_partner_category").id,
+                "domain_force": "[('partner_ids', 'in', [authenticated_partner_id])]",
+            }
+        )
+
+    def _compute_domain(self, partner_id):
+        return (
+            self.env["ir.rule"]
+            .with_user(self.user)
+            .with_context(authenticated_partner_id=partner_id)
+            ._compute_domain("res.partner.category", "read")
+        )
+
+    def _count_evaluations(self):
+        IrRule = type(self.env["ir.rule"])
+        eval_context = IrRule._eval_context
+        calls = []
+
+        def _eval_context(rule):
+            calls.append(rule)
+            return eval_context(rule)
+
+        return calls, mock.patch.object(IrRule, "_eval_context", _eval_context)
+
+    def test_bindable_domain(self):
+        self.assertTrue(
+            _is_bindable_domain("[('partner_id', '=', authenticated_partner_id)]")
+        )
+        self.assertTrue(
+            _is_bindable_domain(
+                "['|', ('partner_id', 'child_of', [authenticated_partner_id]),"
+                " ('user_id', '=', user.id)]"
+            )
+        )
+        self.assertFalse(
+            _is_bindable_domain(
+                "authenticated_partner_id and "
+                "[('partner_id', '=', authenticated_partner_id)] or []"
+            )
+        )
+        self.assertFalse(
+            _is_bindable_domain("[('partner_id', '=', authenticated_partner_id + 1)]")
+        )
+
+    def test_bound_domain(self):
+        partner = self.env["res.partner"].create({"name": "Test"})
+        self.assertIn(
+            ("partner_ids", "in", [partner.id]), self._compute_domain(partner.id)
+        )
+        self.assertIn(("partner_ids", "in", [None]), self._compute_domain(None))
+        category = self.env["res.partner.category"].create(
+            {"name": "Test", "partner_ids": [(4, partner.id)]}
+        )
+        categories = (
+            self.env["res.partner.category"]
+            .with_user(self.user)
+            .with_context(authenticated_partner_id=partner.id)
+            .search([])
+        )
+        self.assertEqual(categories, category)
+
+    def test_domain_cache(self):
+        """Benchmark the cache of the domains with 10k distinct partners"""
+        self.env.registry.clear_caches()
+        nb_partners = 10000
+        calls, patch = self._count_evaluations()
+        with patch:
+            start = time.perf_counter()
+            for partner_id in range(1, nb_partners + 1):
+                domain = self._compute_domain(partner_id)
+                self.assertIn(("partner_ids", "in", [partner_id]), domain)
+            duration = time.perf_counter() - start
+        # the domains are computed once for all the partners
+        self.assertEqual(len(calls), 1)
+        _logger.info(
+            "Record rule domains of %s partners: hit rate %.2f%%, "
+            "%.1f µs per domain",
+            nb_partners,
+            100.0 * (nb_partners - len(calls)) / nb_partners,
+            duration * 1e6 / nb_partners,
+        )
+
+    def test_domain_cache_not_bindable(self):
+        self.env["ir.rule"].create(
+            {
+                "name": "Test conditional authenticated partner rule",
+                "model_id": self.env.ref("base.model_res_partner_category").id,
+                "domain_force": "authenticated_partner_id and "
+                "[('partner_ids', 'in', [authenticated_partner_id])] or []",
+            }
+        )
+        calls, patch = self._count_evaluations()
+        with patch:
+            for partner_id in range(1, 11):
+                domain = self._compute_domain(partner_id)
+                self.assertIn(("partner_ids", "in", [partner_id]), domain)
+        # the domains are computed by partner
+        self.assertEqual(len(calls), 10)
@@ -0,0 +1,115 @@
+# Copyright 2026 ACSONE SA/NV
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+
+import datetime
+import decimal
+import json
+from unittest import mock
+
+from odoo.tests.common import BaseCase, MetaCase
+from odoo.tools import date_utils
+from odoo.tools.translate import _lt
+
+from ..http import (
+    JSON_CODECS,
+    JSONCodec,
+    RestApiDispatcher,
+    dispatcher_json_default,
+    get_json_codec,
+    json_default,
+)
+
+
+class TestJSONCodec(BaseCase, MetaCase("DummyCase", (object,), {})):
+    """Test that all the available codecs encode and decode the data as
+    ``request.make_json_response`` and the standard library"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.data = {
+            "name": "Test é/ü",
+            "datetime": datetime.datetime(2021, 3, 4, 5, 6, 7, 8),
+            "date": datetime.date(2021, 3, 4),
+            "amount": decimal.Decimal("12.50"),
+            "label": _lt("Name"),
+            "float": 1.1,
+            "big_int": 2**70 + 1,
+            "items": [1, None, True, {"nested": "value"}],
+        }
+
+    def _make_json_response_data(self, data):
+        # the encoding of the responses by request.make_json_response
+        return json.dumps(data, ensure_ascii=False, default=date_utils.json_default)
+
+    def test_dumps_baseline(self):
+        expected = self._make_json_response_data(self.data)
+        self.assertEqual(get_json_codec("json").dumps(self.data), expected)
+        self.assertIn('"datetime": "2021-03-04 05:06:07"', expected)
+        self.assertIn('"date": "2021-03-04"', expected)
+        self.assertIn('"amount": "12.50"', expected)
+        self.assertIn('"label": "Name"', expected)
+
+    def test_dumps(self):
+        expected = json.loads(self._make_json_response_data(self.data))
+        for name, codec in JSON_CODECS.items():
+            res = json.loads(codec.dumps(self.data))
+            if name == "ujson":
+                # the decimals are encoded as numbers by ujson
+                self.assertIn(res.pop("amount"), (12.5, expected["amount"]))
+                res["amount"] = expected["amount"]
+            self.assertEqual(res, expected, name)
+
+    def test_dumps_options(self):
+        expected = json.dumps(self.data, indent=4, sort_keys=True, default=str)
+        for name, codec in JSON_CODECS.items():
+            res = codec.dumps(self.data, indent=4, sort_keys=True, default=str)
+            self.assertEqual(json.loads(res), json.loads(expected), name)
+            self.assertEqual(
+                list(json.loads(res).keys()), sorted(self.data.keys()), name
+            )
+
+    def test_loads(self):
+        data = self._make_json_response_data(self.data)
+        for name, codec in JSON_CODECS.items():
+            res = codec.loads(data)
+            self.assertEqual(res, json.loads(data), name)
+            # not decoded as a float
+            self.assertEqual(res["big_int"], 2**70 + 1, name)
+            self.assertEqual(codec.loads(data.encode("utf-8")), res, name)
+
+    def test_get_json_codec(self):
+        self.assertIsInstance(get_json_codec("json"), JSONCodec)
+        self.assertEqual(get_json_codec("json").name, "json")
+        # the preferred codec is returned if the requested one is not available
+        self.assertEqual(get_json_codec("unknown"), get_json_codec())
+        self.assertEqual(get_json_codec(), next(iter(JSON_CODECS.values())))
+        self.assertNotEqual(get_json_codec().name, "ujson")
+
+    def test_dispatcher_encoding(self):
+        """The dates and decimals given to the dispatcher are encoded as
+        before the codecs unless the encoding of the results of the services
+        is requested"""
+        data = {
+            "datetime": self.data["datetime"],
+            "date": self.data["date"],
+            "amount": self.data["amount"],
+        }
+        dispatcher = RestApiDispatcher(mock.Mock())
+        dispatcher.make_json_response(data)
+        encoded = dispatcher.request.make_response.call_args[0][0]
+        self.assertEqual(
+            json.loads(encoded),
+            {
+                "datetime": "2021-03-04T05:06:07.000008",
+                "date": "2021-03-04",
+                "amount": 12.5,
+            },
+        )
+        dispatcher.make_json_response(data, default=json_default)
+        encoded = dispatcher.request.make_response.call_args[0][0]
+        self.assertEqual(
+            json.loads(encoded), json.loads(self._make_json_response_data(data))
+        )
+        with self.assertRaises(TypeError):
+            dispatcher_json_default(object())
@@ -0,0 +1,141 @@
+# Copyright 2026 ACSONE SA/NV
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+
+import types
+
+from odoo.exceptions import UserError
+from odoo.tests.common import TransactionCase
+
+from ..restapi import (
+    CerberusListValidator,
+    CerberusValidator,
+    KeysetPage,
+    KeysetPaginatedList,
+    KeysetPagination,
+)
+
+
+class TestKeysetPagination(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.domain = [("name", "like", "Keyset Test")]
+        cls.partners = cls.env["res.partner"].create(
+            [
+                {
+                    "name": "Keyset Test %s" % (i % 7),
+                    "ref": "REF%s" % (i % 4) if i % 3 else False,
+                    "is_company": not i % 5,
+                }
+                for i in range(30)
+            ]
+        )
+
+    def _get_service(self):
+        return types.SimpleNamespace(work=types.SimpleNamespace(), env=self.env)
+
+    def _read_all_pages(self, order, limit):
+        service = self._get_service()
+        pagination = KeysetPagination(order=order)
+        ids = []
+        cursor = None
+        while True:
+            pagination.from_params(service, {"cursor": cursor, "limit": limit})
+            page = service.work.keyset_page
+            records = page.search(self.env["res.partner"], self.domain)
+            self.assertLessEqual(len(records), limit)
+            ids += records.ids
+            # no record is read twice
+            self.assertEqual(len(ids), len(set(ids)))
+            cursor = page.next_cursor
+            if not cursor:
+                return ids
+
+    def test_pages(self):
+        for order in ("name", "name desc", "ref, name desc", "ref desc, id desc"):
+            expected = self.env["res.partner"].search(
+                self.domain,
+                order=KeysetPage(KeysetPagination(order=order)._order, 1).order_spec,
+            )
+            self.assertEqual(self._read_all_pages(order, 7), expected.ids, order)
+            self.assertEqual(self._read_all_pages(order, 30), expected.ids, order)
+            self.assertEqual(self._read_all_pages(order, 100), expected.ids, order)
+
+    def test_boolean_pages(self):
+        """The pages sorted by a boolean field are read once, even if a page
+        is filled with False values"""
+        for order in ("is_company, id", "is_company desc, name", "is_company desc"):
+            expected = self.env["res.partner"].search(
+                self.domain,
+                order=KeysetPage(KeysetPagination(order=order)._order, 1).order_spec,
+            )
+            self.assertEqual(self._read_all_pages(order, 4), expected.ids, order)
+
+    def test_null_numeric_pages(self):
+        """The NULL values of a numeric field are not read as 0 in the cursor"""
+        partners = self.partners.sorted("id")
+        for i, partner in enumerate(partners):
+            partner.color = i % 3
+        self.env.flush_all()
+        self.env.cr.execute(
+            "UPDATE res_partner SET color = NULL WHERE id IN %s",
+            (tuple(partners[::4].ids),),
+        )
+        self.env.invalidate_all()
+        for order in ("color", "color desc", "color, name desc", "color desc, id"):
+            expected = self.env["res.partner"].search(
+                self.domain,
+                order=KeysetPage(KeysetPagination(order=order)._order, 1).order_spec,
+            )
+            self.assertEqual(self._read_all_pages(order, 3), expected.ids, order)
+            self.assertEqual(self._read_all_pages(order, 7), expected.ids, order)
+
+    def test_order(self):
+        self.assertEqual(
+            KeysetPagination(order="name desc")._order, [("name", True), ("id", False)]
+        )
+        self.assertEqual(KeysetPagination(order="id desc")._order, [("id", True)])
+        with self.assertRaises(ValueError):
+            KeysetPagination(order="name up")
+        page = KeysetPage([("parent_id", False), ("id", False)], 10)
+        with self.assertRaises(UserError):
+            page.search(self.env["res.partner"])
+
+    def test_invalid_params(self):
+        pagination = KeysetPagination(order="name", max_limit=50)
+        service = self._get_service()
+        for params in ({"limit": 0}, {"limit": 51}, {"limit": "abc"}):
+            with self.assertRaises(UserError):
+                pagination.from_params(service, params)
+        for cursor in (
+            "abc",
+            "e30=",
+            KeysetPage([("ref", False), ("id", False)], 1)._encode_cursor([None, 1]),
+        ):
+            with self.assertRaises(UserError):
+                pagination.from_params(service, {"cursor": cursor})
+        pagination.from_params(service, {"limit": "5"})
+        self.assertEqual(service.work.keyset_page.limit, 5)
+        pagination.from_params(service, {})
+        self.assertEqual(service.work.keyset_page.limit, 100)
+
+    def test_envelope(self):
+        service = self._get_service()
+        pagination = KeysetPagination(
+            CerberusValidator({"name": {"type": "string"}}), order="name"
+        )
+        output = KeysetPaginatedList(CerberusListValidator({"id": {"type": "integer"}}))
+        params = pagination.from_params(
+            service, {"name": "Keyset", "limit": 2, "unknown": 1}
+        )
+        self.assertEqual(params, {"name": "Keyset"})
+        records = service.work.keyset_page.search(self.env["res.partner"], self.domain)
+        response = output.to_response(service, [{"id": r.id} for r in records])
+        self.assertEqual(response["items"], [{"id": r.id} for r in records])
+        self.assertTrue(response["next_cursor"])
+        json_schema = output.to_json_schema(service, None, "output")
+        self.assertEqual(json_schema["properties"]["items"]["type"], "array")
+        self.assertEqual(
+            [p["name"] for p in pagination.to_openapi_query_parameters(service, None)],
+            ["name", "cursor", "limit"],
+        )
@@ -0,0 +1,64 @@
+# Copyright 2026 ACSONE SA/NV
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+
+import os
+
+from odoo.tests.common import BaseCase, MetaCase
+
+from ..metrics import (
+    NULL_STAGE_TIMER,
+    STAGE_DURATION_METRIC,
+    MetricsRegistry,
+    StageTimer,
+    get_stage_timer,
+)
+
+
+class TestMetrics(BaseCase, MetaCase("DummyCase", (object,), {})):
+    def test_counter(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("test_total", "Test counter")
+        self.assertIs(registry.counter("test_total", "Test counter"), counter)
+        counter.inc((("usage", "partner"),))
+        counter.inc((("usage", "partner"),), 2)
+        self.assertEqual(counter.get((("usage", "partner"),)), 3)
+        self.assertEqual(
+            registry.to_prometheus(),
+            "# HELP test_total Test counter\n"
+            "# TYPE test_total counter\n"
+            'test_total{pid="%s",usage="partner"} 3\n' % os.getpid(),
+        )
+
+    def test_histogram(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram("test_seconds", "Test", buckets=(0.1, 1.0))
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        self.assertEqual(histogram.get(), (0.55, 2))
+        lines = registry.to_prometheus().splitlines()
+        pid = os.getpid()
+        self.assertIn('test_seconds_bucket{pid="%s",le="0.1"} 1' % pid, lines)
+        self.assertIn('test_seconds_bucket{pid="%s",le="1.0"} 2' % pid, lines)
+        self.assertIn('test_seconds_count{pid="%s"} 2' % pid, lines)
+
+    def test_stage_timer(self):
+        registry = MetricsRegistry()
+        timer = StageTimer()
+        timer.set_labels("collection", "partner", "get")
+        with timer.stage("method"):
+            pass
+        timer.start()
+        timer.stop("encoding")
+        self.assertEqual([d[0] for d in timer.durations], ["method", "encoding"])
+        self.assertTrue(timer.server_timing().startswith("method;dur="))
+        timer.observe(registry)
+        histogram = registry.histogram(STAGE_DURATION_METRIC, "")
+        labels = timer.labels + (("stage", "method"),)
+        self.assertEqual(histogram.get(labels)[1], 1)
+
+    def test_no_request(self):
+        timer = get_stage_timer()
+        self.assertIs(timer, NULL_STAGE_TIMER)
+        self.assertFalse(timer)
+        with timer.stage("method"):
+            pass
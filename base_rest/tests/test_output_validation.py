@@ -0,0 +1,134 @@
+# Copyright 2026 ACSONE SA/NV
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+from unittest import mock
+
+from odoo.addons.component.core import Component
+
+from .. import restapi
+from ..components.service import _output_validation_failures
+from ..restapi import get_output_validation_policy
+from .common import TransactionRestServiceRegistryCase
+
+
+class TestOutputValidation(TransactionRestServiceRegistryCase):
+    """Test the validation policies of the output of the methods"""
+
+    def setUp(self):
+        super().setUp()
+        self._setup_registry(self)
+
+        # pylint: disable=R7980
+        class TestService(Component):
+            _inherit = "base.rest.service"
+            _name = "test.partner.service"
+            _usage = "partner"
+            _collection = self._collection_name
+            _description = "test"
+
+            @restapi.method(
+                [(["/always"], "GET")],
+                output_param=restapi.CerberusValidator("_get_schema"),
+            )
+            def always(self):
+                return {"name": 1}
+
+            @restapi.method(
+                [(["/off"], "GET")],
+                output_param=restapi.CerberusValidator("_get_schema"),
+                output_validation="off",
+            )
+            def off(self):
+                return {"name": 1, "secret": "value"}
+
+            @restapi.method(
+                [(["/off_list"], "GET")],
+                output_param=restapi.CerberusListValidator("_get_schema"),
+                output_validation="off",
+            )
+            def off_list(self):
+                return [{"name": "a", "secret": "value"}]
+
+            @restapi.method(
+                [(["/sampled"], "GET")],
+                output_param=restapi.CerberusValidator("_get_schema"),
+                output_validation=100,
+            )
+            def sampled(self):
+                return {"name": 1, "secret": "value"}
+
+            def _get_schema(self):
+                return {"name": {"type": "string"}}
+
+        self._build_services(self, TestService)
+        self.service = self._get_service_component(self, "partner")
+
+    def tearDown(self):
+        self._teardown_registry(self)
+        super().tearDown()
+
+    def _not_forced(self):
+        return mock.patch.object(
+            type(self.service), "_is_output_validation_forced", return_value=False
+        )
+
+    def test_forced_in_tests(self):
+        with self.assertRaises(SystemError):
+            self.service.dispatch("off")
+
+    def test_always(self):
+        with self._not_forced(), self.assertRaises(SystemError):
+            self.service.dispatch("always")
+
+    def test_off(self):
+        with self._not_forced():
+            # the output is not validated but the unknown fields are purged
+            self.assertEqual(self.service.dispatch("off"), {"name": 1})
+            self.assertEqual(self.service.dispatch("off_list"), [{"name": "a"}])
+
+    def test_sampled(self):
+        labels = (
+            ("collection", self._collection_name),
+            ("usage", "partner"),
+            ("method", "sampled"),
+        )
+        failures = _output_validation_failures
+        count = failures.get(labels)
+        with self._not_forced(), mock.patch(
+            "odoo.addons.base_rest.components.service._logger"
+        ) as logger:
+            self.assertEqual(self.service.dispatch("sampled"), {"name": 1})
+        logger.exception.assert_called_once()
+        self.assertEqual(failures.get(labels), count + 1)
+
+    def test_policy(self):
+        self.assertEqual(
+            self.service._get_dispatch_plan("sampled").output_validation, 100.0
+        )
+        self.assertEqual(get_output_validation_policy("off"), "off")
+        self.assertEqual(get_output_validation_policy("12.5"), 12.5)
+        self.assertIsNone(get_output_validation_policy(None))
+        for policy in ("sometimes", -1, 101, True, [50]):
+            with self.assertRaises(ValueError):
+                get_output_validation_policy(policy)
+
+    def test_invalid_policy(self):
+        """An invalid policy is rejected when the plan is built"""
+
+        # pylint: disable=R7980
+        class TestServiceInvalid(Component):
+            _inherit = "base.rest.service"
+            _name = "test.invalid.service"
+            _usage = "invalid"
+            _collection = self._collection_name
+            _description = "test"
+
+            @restapi.method(
+                [(["/"], "GET")],
+                output_param=restapi.CerberusValidator({"name": {"type": "string"}}),
+                output_validation="sometimes",
+            )
+            def get(self):
+                return {"name": "test"}
+
+        with self.assertRaises(ValueError):
+            self._build_services(self, TestServiceInvalid)
@@ -0,0 +1,255 @@
+# Copyright 2026 ACSONE SA/NV
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+
+import json
+import os
+import sqlite3
+import stat
+import tempfile
+import uuid
+from unittest import mock
+
+from werkzeug.exceptions import TooManyRequests
+from werkzeug.test import EnvironBuilder
+from werkzeug.wrappers import Request
+
+from odoo.exceptions import AccessDenied
+from odoo.tests.common import BaseCase, MetaCase
+from odoo.tools import mute_logger
+
+from odoo.addons.base.models.ir_http import IrHttp
+from odoo.addons.component.core import Component
+
+from .. import rate_limit, restapi
+from ..rate_limit import (
+    MemoryRateLimit,
+    SQLiteRateLimit,
+    check_rate_limit,
+    get_rate_limit_key,
+    get_rate_limit_options,
+)
+from .common import TransactionRestServiceRegistryCase, mock_rest_request
+
+
+class TestRateLimit(BaseCase, MetaCase("DummyCase", (object,), {})):
+    def setUp(self):
+        super().setUp()
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.backends = [
+            MemoryRateLimit(size=2),
+            SQLiteRateLimit(path=os.path.join(tmp_dir.name, "rate_limit")),
+        ]
+
+    def test_consume(self):
+        for backend in self.backends:
+            # 1 token per second, 2 at once
+            self.assertEqual(backend.consume("key", 1, 2), 0)
+            self.assertEqual(backend.consume("key", 1, 2), 0)
+            retry_after = backend.consume("key", 1, 2)
+            self.assertGreater(retry_after, 0)
+            self.assertLessEqual(retry_after, 1)
+            # the buckets are by key
+            self.assertEqual(backend.consume("other", 1, 2), 0)
+            backend.clear()
+            self.assertEqual(backend.consume("key", 1, 2), 0)
+
+    def test_refill(self):
+        for backend in self.backends:
+            self.assertEqual(backend.consume("key", 1000, 1), 0)
+            with mock.patch.object(
+                rate_limit.time,
+                "monotonic",
+                return_value=rate_limit.time.monotonic() + 1,
+            ), mock.patch.object(
+                rate_limit.time, "time", return_value=rate_limit.time.time() + 1
+            ):
+                self.assertEqual(backend.consume("key", 1000, 1), 0)
+
+    def test_memory_size(self):
+        backend = self.backends[0]
+        backend.consume("key1", 1, 1)
+        backend.consume("key2", 1, 1)
+        backend.consume("key3", 1, 1)
+        # the least recently used bucket is dropped
+        self.assertEqual(backend.consume("key1", 1, 1), 0)
+        self.assertGreater(backend.consume("key3", 1, 1), 0)
+
+    def test_options(self):
+        self.assertIsNone(get_rate_limit_options(None))
+        self.assertEqual(
+            get_rate_limit_options(100),
+            rate_limit.RateLimitOptions(100, 60, 100, "api_key"),
+        )
+        self.assertEqual(
+            get_rate_limit_options(
+                {"requests": 10, "period": 1, "burst": 20, "key": "partner"}
+            ),
+            rate_limit.RateLimitOptions(10, 1, 20, "partner"),
+        )
+        with self.assertRaises(ValueError):
+            get_rate_limit_options({"requests": 10, "key": "user"})
+
+    def test_key(self):
+        httprequest = Request(
+            EnvironBuilder(
+                headers={"Api-Key": "secret"}, environ_base={"REMOTE_ADDR": "1.2.3.4"}
+            ).get_environ()
+        )
+        options = get_rate_limit_options(10)
+        self.assertEqual(
+            get_rate_limit_key(options, httprequest, api_key_id=7), "api_key:7"
+        )
+        # the key sent by the client isn't used before its authentication
+        self.assertEqual(get_rate_limit_key(options, httprequest), "ip:1.2.3.4")
+        options = get_rate_limit_options({"requests": 10, "key": "partner"})
+        self.assertEqual(get_rate_limit_key(options, httprequest, 42), "partner:42")
+        # fall back on the IP
+        self.assertEqual(get_rate_limit_key(options, httprequest), "ip:1.2.3.4")
+
+    def test_check(self):
+        options = get_rate_limit_options({"requests": 1, "period": 10})
+        counter = rate_limit._rate_limit_requests
+        rejected = (("route", "/test/route"), ("result", "rejected"))
+        count = counter.get(rejected)
+        with mock.patch.object(rate_limit, "_rate_limit", self.backends[0]):
+            check_rate_limit("db", "/test/route", options, "ip:1.2.3.4")
+            with self.assertRaises(TooManyRequests) as cm:
+                check_rate_limit("db", "/test/route", options, "ip:1.2.3.4")
+        self.assertEqual(cm.exception.get_response().headers["Retry-After"], "10")
+        self.assertEqual(counter.get(rejected), count + 1)
+
+    def test_fail_open(self):
+        """The requests are allowed if the backend fails"""
+        options = get_rate_limit_options(1)
+        backend = mock.Mock()
+        backend.consume.side_effect = sqlite3.OperationalError("database is locked")
+        counter = rate_limit._rate_limit_requests
+        error = (("route", "/test/route"), ("result", "error"))
+        count = counter.get(error)
+        with mock.patch.object(rate_limit, "_rate_limit", backend), self.assertLogs(
+            rate_limit._logger, "ERROR"
+        ):
+            check_rate_limit("db", "/test/route", options, "ip:1.2.3.4")
+        self.assertEqual(counter.get(error), count + 1)
+
+    def test_default_path(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        with mock.patch.dict(rate_limit.config.options, {"data_dir": tmp_dir.name}):
+            backend = SQLiteRateLimit()
+        self.assertTrue(backend.path.startswith(tmp_dir.name))
+        # only accessible by the user running odoo
+        self.assertEqual(stat.S_IMODE(os.stat(backend.path).st_mode), 0o600)
+
+
+class TestRateLimitDispatch(TransactionRestServiceRegistryCase):
+    """Test the rate limits checked while dispatching the requests"""
+
+    def setUp(self):
+        super().setUp()
+        self._setup_registry(self)
+        self._BaseTestController._batch_enabled = True
+
+        # pylint: disable=R7980
+        class TestService(Component):
+            _inherit = "base.rest.service"
+            _name = "test.partner.service"
+            _usage = "partner"
+            _collection = self._collection_name
+            _description = "test"
+
+            @restapi.method(
+                [(["/<int:id>"], "GET")],
+                output_param=restapi.CerberusValidator({"name": {"type": "string"}}),
+                rate_limit=1,
+            )
+            def get(self, _id):
+                return {"name": self.env["res.partner"].browse(_id).name}
+
+        self._build_services(self, TestService)
+        self.controller = self._get_controller_for(TestService)()
+        self.partner = self.env.ref("base.main_partner")
+        patcher = mock.patch.object(rate_limit, "_rate_limit", MemoryRateLimit())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self._teardown_registry(self)
+        super().tearDown()
+
+    def _authenticate(
+        self, rate_limit_option, partner_id=None, api_key_id=None, error=None
+    ):
+        endpoint = mock.Mock(
+            routing={
+                "routes": ["/test_controller/partner"],
+                "auth": "public",
+                "rate_limit": rate_limit_option,
+            }
+        )
+        headers = {"Api-Key": "key-%s" % uuid.uuid4()}
+        with mock_rest_request(self.env, headers=headers) as request:
+            request.auth_api_key_id = None
+
+            def authenticate(endpoint):
+                # as auth_api_key
+                if error:
+                    raise error
+                request.auth_api_key_id = api_key_id
+
+            with mock.patch.object(IrHttp, "_authenticate", side_effect=authenticate):
+                self.env["ir.http"]._authenticate(endpoint)
+            if partner_id:
+                request.dispatcher.check_partner_rate_limit(partner_id)
+
+    def test_authenticate(self):
+        """The limits by IP are checked before the authentication"""
+        options = {"requests": 1, "key": "ip"}
+        self._authenticate(options)
+        with self.assertRaises(TooManyRequests):
+            self._authenticate(options, error=AssertionError("Authenticated"))
+
+    def test_api_key(self):
+        """The requests are counted by API key once authenticated"""
+        self._authenticate(1, api_key_id=1)
+        with self.assertRaises(TooManyRequests):
+            self._authenticate(1, api_key_id=1)
+        self._authenticate(1, api_key_id=2)
+        # the requests with a random key are counted by IP
+        self._authenticate(1)
+        with self.assertRaises(TooManyRequests):
+            self._authenticate(1)
+
+    def test_api_key_failed(self):
+        """The failed authentications are counted by IP"""
+        with self.assertRaises(AccessDenied):
+            self._authenticate(1, error=AccessDenied())
+        with self.assertRaises(TooManyRequests):
+            self._authenticate(1, error=AccessDenied())
+
+    def test_partner(self):
+        """The limits by partner are checked once the partner is known"""
+        options = {"requests": 1, "key": "partner"}
+        # no token is consumed before the partner is known
+        self._authenticate(options)
+        self._authenticate(options, partner_id=self.partner.id)
+        with self.assertRaises(TooManyRequests):
+            self._authenticate(options, partner_id=self.partner.id)
+        # the requests are counted by partner
+        self._authenticate(options, partner_id=self.env.ref("base.partner_root").id)
+
+    @mute_logger("odoo.addons.base_rest.http")
+    def test_batch(self):
+        """Each request of a batch consumes a token of its route"""
+        path = "partner/%s" % self.partner.id
+        with mock_rest_request(self.env, "/test_controller/batch", "POST") as request:
+            request.auth_api_key_id = None
+            response = self.controller._process_batch(
+                requests=[{"path": path}, {"path": path}]
+            )
+        responses = json.loads(response.get_data())["responses"]
+        self.assertEqual(
+            responses[0], {"status": 200, "body": {"name": self.partner.name}}
+        )
+        self.assertEqual(responses[1]["status"], 429)
@@ -0,0 +1,29 @@
+# Copyright 2026 ACSONE SA/NV
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+
+from odoo.tests.common import TransactionCase
+
+
+class TestResLang(TransactionCase):
+    def _get_lang(self, accept_language):
+        return self.env["res.lang"]._base_rest_get_lang_from_accept_language(
+            accept_language
+        )
+
+    def test_lang_from_accept_language(self):
+        self.assertEqual(self._get_lang("fr-BE,fr;q=0.9,en;q=0.8"), "en_US")
+        self.assertIsNone(self._get_lang("xx-YY"))
+        # the cached resolution is invalidated when a language is installed
+        self.env["res.lang"]._activate_lang("fr_BE")
+        self.assertEqual(self._get_lang("fr-BE,fr;q=0.9,en;q=0.8"), "fr_BE")
+        self.assertEqual(self._get_lang("fr-FR,en;q=0.8"), "fr_BE")
+
+    def test_q_values(self):
+        self.env["res.lang"]._activate_lang("fr_BE")
+        # the languages are sorted by q-value, not by position
+        self.assertEqual(self._get_lang("en;q=0.5,fr-BE;q=0.9"), "fr_BE")
+        self.assertEqual(self._get_lang("fr-BE;q=0.5,en;q=0.9"), "en_US")
+        # the default q-value is 1
+        self.assertEqual(self._get_lang("en;q=0.9,fr"), "fr_BE")
+        # the languages which are not installed are skipped
+        self.assertEqual(self._get_lang("de;q=0.9,en;q=0.1"), "en_US")
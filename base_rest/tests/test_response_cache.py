@@ -0,0 +1,207 @@
+# Copyright 2026 ACSONE SA/NV
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+
+import os
+import stat
+import tempfile
+from unittest import mock
+
+from odoo.tests.common import BaseCase, MetaCase, TransactionCase
+
+from odoo.addons.component.core import Component
+
+from .. import cache, restapi
+from ..cache import (
+    RESPONSE_CACHE_SIGNALING_SEQUENCE,
+    CachedResponse,
+    MemoryResponseCache,
+    SQLiteResponseCache,
+    _response_cache_models,
+    check_response_cache_signaling,
+    get_response_cache,
+    get_response_cache_options,
+    get_response_cache_tag,
+)
+from .common import TransactionRestServiceRegistryCase, mock_rest_request
+
+
+class TestResponseCacheBackends(BaseCase, MetaCase("DummyCase", (object,), {})):
+    def setUp(self):
+        super().setUp()
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.backends = [
+            MemoryResponseCache(size=2),
+            SQLiteResponseCache(path=os.path.join(tmp_dir.name, "cache"), size=2),
+        ]
+        self.response = CachedResponse(
+            b'{"name": "test"}', 200, [("Content-Type", "application/json")]
+        )
+
+    def test_get_set(self):
+        for backend in self.backends:
+            self.assertIsNone(backend.get("key"))
+            backend.set("key", self.response, 60, [])
+            self.assertEqual(backend.get("key"), self.response)
+            # expired
+            backend.set("key", self.response, -1, [])
+            self.assertIsNone(backend.get("key"))
+
+    def test_size(self):
+        for backend in self.backends:
+            backend.set("key1", self.response, 60, [])
+            backend.set("key2", self.response, 60, [])
+            backend.set("key3", self.response, 60, [])
+            self.assertIsNone(backend.get("key1"))
+            self.assertEqual(backend.get("key3"), self.response)
+
+    def test_invalidate(self):
+        for backend in self.backends:
+            backend.set("key1", self.response, 60, ["db:res.partner"])
+            backend.set("key2", self.response, 60, ["db:res.country"])
+            backend.invalidate(["db:res.partner"])
+            self.assertIsNone(backend.get("key1"))
+            self.assertEqual(backend.get("key2"), self.response)
+
+    def test_default_path(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        with mock.patch.dict(cache.config.options, {"data_dir": tmp_dir.name}):
+            backend = SQLiteResponseCache()
+        self.assertTrue(backend.path.startswith(tmp_dir.name))
+        # only accessible by the user running odoo
+        self.assertEqual(stat.S_IMODE(os.stat(backend.path).st_mode), 0o600)
+        directory = os.path.dirname(backend.path)
+        self.assertEqual(stat.S_IMODE(os.stat(directory).st_mode), 0o700)
+
+    def test_options(self):
+        self.assertIsNone(get_response_cache_options(None))
+        options = get_response_cache_options(30)
+        self.assertEqual(options.ttl, 30)
+        self.assertIn("params", options.vary_by)
+        options = get_response_cache_options(
+            {"vary_by": ["lang"], "models": ["res.country"]}
+        )
+        self.assertEqual(options.ttl, 60)
+        self.assertEqual(options.vary_by, ("lang",))
+        self.assertIn("res.country", _response_cache_models)
+        with self.assertRaises(ValueError):
+            get_response_cache_options({"vary_by": ["unknown"]})
+
+
+class TestResponseCacheInvalidation(TransactionCase):
+    def test_write_invalidate(self):
+        get_response_cache_options({"models": ["res.country"]})
+        cache = get_response_cache()
+        tag = get_response_cache_tag(self.env.cr.dbname, "res.country")
+        response = CachedResponse(b"[]", 200, [])
+        cache.set("test_write_invalidate", response, 60, [tag])
+        self.env.ref("base.be").write({"name": "Belgium"})
+        self.assertIsNone(cache.get("test_write_invalidate"))
+
+    def test_signaling(self):
+        """The cache of the worker is cleared once another worker invalidated
+        responses"""
+        backend = MemoryResponseCache()
+        response = CachedResponse(b"[]", 200, [])
+        with mock.patch.object(cache, "_response_cache", backend), mock.patch.dict(
+            cache._response_cache_signals, clear=True
+        ):
+            check_response_cache_signaling(self.env.cr)
+            backend.set("key", response, 60, [])
+            check_response_cache_signaling(self.env.cr)
+            self.assertEqual(backend.get("key"), response)
+            self.env.cr.execute(
+                "SELECT nextval(%s)", (RESPONSE_CACHE_SIGNALING_SEQUENCE,)
+            )
+            check_response_cache_signaling(self.env.cr)
+            self.assertIsNone(backend.get("key"))
+
+
+class TestResponseCacheController(TransactionRestServiceRegistryCase):
+    """Test the responses cached by the controller"""
+
+    def setUp(self):
+        super().setUp()
+        self._setup_registry(self)
+        calls = self.calls = []
+
+        # pylint: disable=R7980
+        class TestService(Component):
+            _inherit = "base.rest.service"
+            _name = "test.partner.service"
+            _usage = "partner"
+            _collection = self._collection_name
+            _description = "test"
+
+            @restapi.method(
+                [(["/<int:id>"], "GET")],
+                input_param=restapi.CerberusValidator({"suffix": {"type": "string"}}),
+                output_param=restapi.CerberusValidator({"name": {"type": "string"}}),
+                cache={"vary_by": ["params"], "models": ["res.partner"]},
+            )
+            def get(self, _id, suffix=""):
+                calls.append(_id)
+                return {"name": self.env["res.partner"].browse(_id).name + suffix}
+
+        self._build_services(self, TestService)
+        self.controller = self._get_controller_for(TestService)()
+        self.partner = self.env.ref("base.main_partner")
+        backend = MemoryResponseCache()
+        patcher = mock.patch.object(cache, "_response_cache", backend)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self._teardown_registry(self)
+        super().tearDown()
+
+    def _get(self, lang="en_US", **params):
+        env = self.env(context=dict(self.env.context, lang=lang))
+        with mock_rest_request(env):
+            response = self.controller._process_method(
+                "partner", "get", self.partner.id, params=params
+            )
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()
+
+    def test_cache_hit(self):
+        name = self.partner.name
+        self.assertEqual(self._get(), {"name": name})
+        self.assertEqual(self._get(), {"name": name})
+        self.assertEqual(len(self.calls), 1)
+
+    def test_vary_by(self):
+        name = self.partner.name
+        self.assertEqual(self._get(suffix="-1"), {"name": name + "-1"})
+        self.assertEqual(self._get(suffix="-2"), {"name": name + "-2"})
+        self.assertEqual(len(self.calls), 2)
+        # the responses don't depend on the lang
+        self.assertEqual(self._get(lang="fr_FR", suffix="-1"), {"name": name + "-1"})
+        self.assertEqual(len(self.calls), 2)
+
+    def test_invalidation(self):
+        self._get()
+        self.partner.name = "Renamed"
+        self.assertEqual(self._get(), {"name": "Renamed"})
+        self.assertEqual(len(self.calls), 2)
+
+    def test_not_updated(self):
+        """The cache is disabled until the signaling sequence is created by
+        the update of base_rest"""
+        self.env.cr.execute("DROP SEQUENCE %s" % RESPONSE_CACHE_SIGNALING_SEQUENCE)
+        with mock.patch.dict(
+            cache._response_cache_signals, clear=True
+        ), mock.patch.object(cache, "_response_cache_unsignaled_dbs", set()):
+            with self.assertLogs(cache._logger, "WARNING"):
+                self._get()
+            self._get()
+        self.assertEqual(len(self.calls), 2)
+
+    def test_recompute_invalidation(self):
+        """The responses are invalidated by the low level writes (stored
+        computed fields)"""
+        self._get()
+        self.partner._write({"comment": "recomputed"})
+        self._get()
+        self.assertEqual(len(self.calls), 2)
@@ -1,6 +1,8 @@
 # Copyright 2021 ACSONE SA/NV
 # License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
-from odoo.addons.component.core import Component
+from unittest import mock
+
+from odoo.addons.component.core import Component, WorkContext
 from odoo.addons.website.tools import MockRequest
 
 from .. import restapi
@@ -142,6 +144,40 @@ class TestServiceContextProvider(TransactionRestServiceRegistryCase):
         ) as service:
             self.assertEqual(service.work.authenticated_partner_id, 9999)
 
+    def test_04(self):
+        """Test the cache of the component classes
+
+        In this case we check that the classes of the service context provider
+        and of the service are only looked up on the first request
+        """
+
+        # pylint: disable=R7980
+        class TestServiceNewApi(Component):
+            _inherit = "base.rest.service"
+            _name = "test.partner.service"
+            _usage = "partner"
+            _collection = self._collection_name
+            _description = "test"
+
+            @restapi.method(
+                [(["/<int:id>/get", "/<int:id>"], "GET")],
+                output_param=restapi.CerberusValidator("_get_partner_schema"),
+                auth="public",
+            )
+            def get(self, _id):
+                return {"name": self.env["res.partner"].browse(_id).name}
+
+        self._build_services(self, TestServiceNewApi)
+        controller = self._get_controller_for(TestServiceNewApi)
+        with MockRequest(self.env):
+            with controller().service_component("partner") as service:
+                service_class = service.__class__
+            with mock.patch.object(
+                WorkContext, "component", side_effect=AssertionError("Not cached")
+            ), controller().service_component("partner") as service:
+                self.assertIs(service.__class__, service_class)
+                self.assertFalse(service.work.authenticated_partner_id)
+
 
 class CommonCase(BaseRestCase):
 
@@ -0,0 +1,231 @@
+# Copyright 2026 ACSONE SA/NV
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+
+import threading
+from unittest import mock
+
+from werkzeug.exceptions import NotFound
+
+from odoo.tests.common import BaseCase, MetaCase
+
+from odoo.addons.component.core import Component
+
+from .. import restapi
+from ..cache import RESPONSE_CACHE_VARY_BY, CachedResponse
+from ..single_flight import (
+    Flight,
+    SingleFlightGroup,
+    SingleFlightOptions,
+    get_single_flight_options,
+)
+from .common import TransactionRestServiceRegistryCase, mock_rest_request
+
+
+class TestSingleFlight(BaseCase, MetaCase("DummyCase", (object,), {})):
+    def setUp(self):
+        super().setUp()
+        self.group = SingleFlightGroup()
+        self.response = CachedResponse(
+            b'{"name": "test"}', 200, [("Content-Type", "application/json")]
+        )
+
+    def _wait_in_thread(self, key, timeout=5):
+        results = []
+        joined = threading.Event()
+
+        def wait():
+            flight, leader = self.group.join(key)
+            joined.set()
+            results.append((leader, flight.wait(timeout)))
+
+        thread = threading.Thread(target=wait)
+        thread.start()
+        joined.wait()
+        return thread, results
+
+    def test_shared(self):
+        flight, leader = self.group.join("key")
+        self.assertTrue(leader)
+        thread, results = self._wait_in_thread("key")
+        flight.response = self.response
+        self.group.leave("key", flight)
+        thread.join()
+        self.assertEqual(results, [(False, self.response)])
+        # the next request is a new leader
+        flight, leader = self.group.join("key")
+        self.assertTrue(leader)
+        self.group.leave("key", flight)
+
+    def test_not_shared(self):
+        flight, leader = self.group.join("key")
+        # the requests with another key are not coalesced
+        self.assertTrue(self.group.join("other")[1])
+        thread, results = self._wait_in_thread("key")
+        # the leader failed
+        self.group.leave("key", flight)
+        thread.join()
+        self.assertEqual(results, [(False, None)])
+
+    def test_timeout(self):
+        flight, leader = self.group.join("key")
+        thread, results = self._wait_in_thread("key", timeout=0.01)
+        thread.join()
+        self.assertEqual(results, [(False, None)])
+        self.group.leave("key", flight)
+
+    def test_options(self):
+        self.assertIsNone(get_single_flight_options(None))
+        self.assertEqual(
+            get_single_flight_options(True),
+            SingleFlightOptions(vary_by=RESPONSE_CACHE_VARY_BY, timeout=5),
+        )
+        self.assertEqual(
+            get_single_flight_options({"vary_by": ["lang"], "timeout": 5}),
+            SingleFlightOptions(vary_by=("lang",), timeout=5),
+        )
+        with self.assertRaises(ValueError):
+            get_single_flight_options({"vary_by": ["unknown"]})
+
+
+class TestSingleFlightController(TransactionRestServiceRegistryCase):
+    """Test the coalescing of the requests processed by the controller"""
+
+    def setUp(self):
+        super().setUp()
+        self._setup_registry(self)
+        calls = self.calls = []
+        # called by the method of the first request
+        hooks = self.hooks = []
+
+        def call(name):
+            calls.append(name)
+            if hooks:
+                hooks.pop()()
+
+        # pylint: disable=R7980
+        class TestService(Component):
+            _inherit = "base.rest.service"
+            _name = "test.partner.service"
+            _usage = "partner"
+            _collection = self._collection_name
+            _description = "test"
+
+            @restapi.method(
+                [(["/<int:id>"], "GET")],
+                output_param=restapi.CerberusValidator({"name": {"type": "string"}}),
+                conditional="body",
+                single_flight=True,
+            )
+            def get(self, _id):
+                call("get")
+                return {"name": self.env["res.partner"].browse(_id).name}
+
+            @restapi.method(
+                [(["/missing"], "GET")],
+                output_param=restapi.CerberusValidator({"name": {"type": "string"}}),
+                single_flight=True,
+            )
+            def missing(self):
+                call("missing")
+                raise NotFound()
+
+            @restapi.method(
+                [(["/export"], "GET")],
+                output_param=restapi.CerberusListValidator(
+                    {"name": {"type": "string"}}
+                ),
+                output_stream=True,
+                single_flight=True,
+            )
+            def export(self):
+                call("export")
+                return iter([{"name": "test"}])
+
+        self._build_services(self, TestService)
+        self.controller = self._get_controller_for(TestService)()
+        self.partner = self.env.ref("base.main_partner")
+
+    def tearDown(self):
+        self._teardown_registry(self)
+        super().tearDown()
+
+    def _process_method(self, method_name, *args, headers=None):
+        with mock_rest_request(self.env, headers=headers):
+            return self.controller._process_method(
+                "partner", method_name, *args, params={}
+            )
+
+    def _process_concurrently(self, method_name, *args, headers=None):
+        """Process a request (the leader) and an identical one (the
+        follower) received while the method is called by the leader
+
+        :return: the (response or exception) of the leader and the follower
+        """
+        results = {}
+        waiting = threading.Event()
+        wait = Flight.wait
+
+        def follower_wait(flight, timeout=None):
+            waiting.set()
+            return wait(flight, timeout)
+
+        def follower():
+            try:
+                results["follower"] = self._process_method(
+                    method_name, *args, headers=headers
+                )
+            except Exception as e:
+                results["follower"] = e
+            finally:
+                waiting.set()
+
+        def start_follower():
+            results["thread"] = threading.Thread(target=follower)
+            results["thread"].start()
+            # the leader returns once the follower waits for its response
+            waiting.wait(5)
+
+        self.hooks.append(start_follower)
+        with mock.patch.object(Flight, "wait", follower_wait):
+            try:
+                leader = self._process_method(method_name, *args)
+            except Exception as e:
+                leader = e
+            results["thread"].join()
+        return leader, results["follower"]
+
+    def test_shared(self):
+        """The follower gets the body of the leader"""
+        leader, follower = self._process_concurrently("get", self.partner.id)
+        self.assertEqual(self.calls, ["get"])
+        self.assertEqual(leader.status_code, 200)
+        self.assertEqual(follower.status_code, 200)
+        self.assertEqual(follower.get_data(), leader.get_data())
+        self.assertEqual(follower.get_json(), {"name": self.partner.name})
+
+    def test_not_modified(self):
+        """The shared response answers the conditional requests"""
+        etag = self._process_method("get", self.partner.id).get_etag()[0]
+        self.calls.clear()
+        leader, follower = self._process_concurrently(
+            "get", self.partner.id, headers={"If-None-Match": '"%s"' % etag}
+        )
+        self.assertEqual(self.calls, ["get"])
+        self.assertEqual(leader.status_code, 200)
+        self.assertEqual(follower.status_code, 304)
+        self.assertFalse(follower.get_data())
+        self.assertEqual(follower.get_etag()[0], etag)
+
+    def test_not_shared_error(self):
+        """The follower calls the method if the leader fails"""
+        leader, follower = self._process_concurrently("missing")
+        self.assertIsInstance(leader, NotFound)
+        self.assertIsInstance(follower, NotFound)
+        self.assertEqual(self.calls, ["missing", "missing"])
+
+    def test_not_shared_stream(self):
+        """The streamed responses are not shared"""
+        leader, follower = self._process_concurrently("export")
+        self.assertTrue(leader.direct_passthrough)
+        self.assertTrue(follower.direct_passthrough)
+        self.assertEqual(self.calls, ["export", "export"])
@@ -0,0 +1,129 @@
+# Copyright 2026 ACSONE SA/NV
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl).
+
+import types
+
+from odoo.exceptions import UserError
+from odoo.tests.common import BaseCase, MetaCase
+
+from .. import restapi
+from ..restapi import CerberusListValidator, CerberusValidator, parse_sparse_fields
+from ..tools import prune_cerberus_schema, prune_document
+
+
+class TestSparseFields(BaseCase, MetaCase("DummyCase", (object,), {})):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.schema = {
+            "id": {"type": "integer", "required": True},
+            "name": {"type": "string", "required": True},
+            "ref": {"type": "string", "required": True},
+            "country": {
+                "type": "dict",
+                "required": True,
+                "schema": {
+                    "code": {"type": "string", "required": True},
+                    "name": {"type": "string", "required": True},
+                },
+            },
+            "tags": {
+                "type": "list",
+                "schema": {
+                    "type": "dict",
+                    "schema": {
+                        "id": {"type": "integer"},
+                        "name": {"type": "string", "required": True},
+                    },
+                },
+            },
+        }
+        cls.document = {
+            "id": 1,
+            "name": "Partner",
+            "ref": "P1",
+            "country": {"code": "BE", "name": "Belgium"},
+            "tags": [{"id": 1, "name": "A"}, {"id": 2, "name": "B"}],
+        }
+
+    def _get_service(self, fields):
+        return types.SimpleNamespace(
+            work=types.SimpleNamespace(sparse_fields=parse_sparse_fields(fields))
+        )
+
+    def test_parse_sparse_fields(self):
+        self.assertIsNone(parse_sparse_fields(None))
+        self.assertIsNone(parse_sparse_fields(""))
+        self.assertEqual(
+            parse_sparse_fields("name, country.code,tags.name,"),
+            {"name": True, "country": {"code": True}, "tags": {"name": True}},
+        )
+        self.assertEqual(
+            parse_sparse_fields(["country", "country.code"]), {"country": True}
+        )
+        self.assertEqual(
+            parse_sparse_fields(["country.code", "country"]), {"country": True}
+        )
+        for value in ("name,country..code", "name;ref", {"name": 1}, [1]):
+            with self.assertRaises(UserError):
+                parse_sparse_fields(value)
+
+    def test_prune(self):
+        fields = parse_sparse_fields("name,country.code,tags.name,unknown")
+        schema = prune_cerberus_schema(self.schema, fields)
+        self.assertEqual(list(schema), ["name", "country"] + ["tags"])
+        self.assertEqual(list(schema["country"]["schema"]), ["code"])
+        self.assertEqual(list(schema["tags"]["schema"]["schema"]), ["name"])
+        # the original schema is not modified
+        self.assertEqual(len(self.schema["country"]["schema"]), 2)
+        self.assertEqual(
+            prune_document(self.document, fields),
+            {
+                "name": "Partner",
+                "country": {"code": "BE"},
+                "tags": [{"name": "A"}, {"name": "B"}],
+            },
+        )
+
+    def test_cerberus_validator(self):
+        validator = CerberusValidator(self.schema)
+        service = self._get_service("id,country.name")
+        expected = {"id": 1, "country": {"name": "Belgium"}}
+        self.assertEqual(validator.to_response(service, self.document), expected)
+        self.assertEqual(
+            validator.to_response_unvalidated(service, self.document), expected
+        )
+        # the validation is restricted to the requested fields
+        self.assertEqual(
+            validator.to_response(service, {"id": 1, "country": {"name": "B"}}),
+            {"id": 1, "country": {"name": "B"}},
+        )
+        with self.assertRaises(SystemError):
+            validator.to_response(service, {"id": "1", "country": {"name": "B"}})
+        # all the fields are returned without sparse fieldset
+        self.assertEqual(
+            validator.to_response(self._get_service(None), self.document),
+            self.document,
+        )
+        # the input is not pruned
+        self.assertEqual(validator.from_params(service, self.document), self.document)
+
+    def test_cerberus_list_validator(self):
+        validator = CerberusListValidator(self.schema, compiled=True)
+        service = self._get_service("name")
+        self.assertEqual(
+            validator.to_response(service, [self.document, self.document]),
+            [{"name": "Partner"}, {"name": "Partner"}],
+        )
+
+    def test_sparse_validators_cache(self):
+        validator = CerberusValidator(self.schema)
+        service = self._get_service("name")
+        validator.to_response(service, self.document)
+        validator.to_response(service, self.document)
+        self.assertEqual(len(validator._sparse_validators), 1)
+        for i in range(restapi.SPARSE_VALIDATORS_CACHE_SIZE + 10):
+            validator.to_response(self._get_service("name,f%s" % i), self.document)
+        self.assertEqual(
+            len(validator._sparse_validators), restapi.SPARSE_VALIDATORS_CACHE_SIZE
+        )
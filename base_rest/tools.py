@@ -1,8 +1,16 @@
 # Copyright 2018 ACSONE SA/NV
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html).
+import copy
 import inspect
 import logging
+import os
+import re
 from collections import OrderedDict
+from collections.abc import Iterable, Mapping, Sized
+
+from cerberus import Validator
+
+from odoo.tools.config import config
 
 _logger = logging.getLogger(__name__)
 
@@ -145,3 +153,406 @@ def _inspect_methods(cls):
         results.append((name, method))
     results.sort(key=lambda pair: pair[0])
     return results
+
+
+# Cerberus rules supported by ``compile_cerberus_schema``. A schema using any
+# other rule is validated by Cerberus.
+COMPILED_CERBERUS_RULES = {
+    "allowed",
+    "coerce",
+    "default",
+    "empty",
+    "max",
+    "maxlength",
+    "meta",
+    "min",
+    "minlength",
+    "nullable",
+    "purge_unknown",
+    "regex",
+    "required",
+    "schema",
+    "type",
+}
+
+
+class _UnsupportedSchema(Exception):
+    pass
+
+
+class _CerberusSchemaCompiler(object):
+    """Generate the source of the Python functions normalizing and validating
+    a document according to a Cerberus schema.
+
+    The generated functions normalize the given dict in place and return
+    whether the document is valid. They stop at the first error since the
+    errors are reported by Cerberus.
+    """
+
+    def __init__(self, types_mapping):
+        self.types_mapping = types_mapping
+        self.namespace = {
+            "Iterable": Iterable,
+            "Sized": Sized,
+            "str": str,
+        }
+        self.functions = []
+        self._counter = 0
+
+    def constant(self, value):
+        self._counter += 1
+        name = "_c%d" % self._counter
+        self.namespace[name] = value
+        return name
+
+    def compile_mapping(self, schema, purge_unknown):
+        """Add the function processing a mapping and return its name"""
+        if not isinstance(schema, Mapping):
+            raise _UnsupportedSchema()
+        self._counter += 1
+        name = "_mapping%d" % self._counter
+        lines = ["def %s(m):" % name]
+        fields = self.constant(frozenset(schema))
+        if purge_unknown:
+            lines.append("    for k in [k for k in m if k not in %s]:" % fields)
+            lines.append("        del m[k]")
+        else:
+            lines.append("    for k in m:")
+            lines.append("        if k not in %s:" % fields)
+            lines.append("            return False")
+        for field, rules in schema.items():
+            if not isinstance(field, str) or not isinstance(rules, Mapping):
+                raise _UnsupportedSchema()
+            lines.extend(
+                "    " + line for line in self._field_lines(field, rules, purge_unknown)
+            )
+        lines.append("    return True")
+        self.functions.append("\n".join(lines))
+        return name
+
+    def _field_lines(self, field, rules, purge_unknown):
+        unsupported = set(rules) - COMPILED_CERBERUS_RULES
+        if unsupported:
+            raise _UnsupportedSchema()
+        key = repr(field)
+        nullable = bool(rules.get("nullable", False))
+        lines = []
+        # defaults are applied to the missing fields and to the null values
+        # of the not nullable fields
+        if "default" in rules:
+            default = self.constant(rules["default"])
+            if nullable:
+                lines.append("if %s not in m:" % key)
+            else:
+                lines.append("if m.get(%s) is None:" % key)
+            lines.append("    m[%s] = %s" % (key, default))
+        lines.append("if %s in m:" % key)
+        lines.append("    v = m[%s]" % key)
+        lines.extend("    " + line for line in self.value_lines(rules, purge_unknown))
+        lines.append("    m[%s] = v" % key)
+        if rules.get("required"):
+            lines.append("else:")
+            lines.append("    return False")
+        return lines
+
+    def value_lines(self, rules, purge_unknown):  # noqa: C901
+        """Return the lines normalizing and validating the value ``v``"""
+        nullable = bool(rules.get("nullable", False))
+        lines = []
+        if "coerce" in rules:
+            coerce = rules["coerce"]
+            if not callable(coerce):
+                raise _UnsupportedSchema()
+            lines.append("try:")
+            lines.append("    v = %s(v)" % self.constant(coerce))
+            lines.append("except Exception:")
+            if nullable:
+                lines.append("    if v is not None:")
+                lines.append("        return False")
+            else:
+                lines.append("    return False")
+        lines.append("if v is None:")
+        lines.append("    %s" % ("pass" if nullable else "return False"))
+        not_null_lines = self._not_null_lines(rules, purge_unknown)
+        if not_null_lines:
+            lines.append("else:")
+            lines.extend("    " + line for line in not_null_lines)
+        return lines
+
+    def _not_null_lines(self, rules, purge_unknown):  # noqa: C901
+        lines = []
+        types = rules.get("type")
+        if isinstance(types, str):
+            types = (types,)
+        types = tuple(types or ())
+        if types:
+            conditions = []
+            for _type in types:
+                definition = self.types_mapping.get(_type)
+                if definition is None:
+                    raise _UnsupportedSchema()
+                condition = "isinstance(v, %s)" % self.constant(
+                    definition.included_types
+                )
+                if definition.excluded_types:
+                    condition += " and not isinstance(v, %s)" % self.constant(
+                        definition.excluded_types
+                    )
+                conditions.append("(%s)" % condition)
+            lines.append("if not (%s):" % " or ".join(conditions))
+            lines.append("    return False")
+        if "schema" in rules:
+            lines.extend(self._schema_lines(rules, types, purge_unknown))
+        elif "purge_unknown" in rules:
+            raise _UnsupportedSchema()
+        for rule in ("min", "max"):
+            if rule in rules:
+                lines.append("try:")
+                lines.append(
+                    "    if v %s %s:"
+                    % ("<" if rule == "min" else ">", self.constant(rules[rule]))
+                )
+                lines.append("        return False")
+                lines.append("except TypeError:")
+                lines.append("    pass")
+        # these rules are not checked on the empty values when the 'empty'
+        # rule is given
+        checks = []
+        if "allowed" in rules:
+            allowed = self.constant(rules["allowed"])
+            checks.append("if isinstance(v, Iterable) and not isinstance(v, str):")
+            checks.append("    for x in v:")
+            checks.append("        if x not in %s:" % allowed)
+            checks.append("            return False")
+            checks.append("elif v not in %s:" % allowed)
+            checks.append("    return False")
+        for rule in ("minlength", "maxlength"):
+            if rule in rules:
+                checks.append(
+                    "if isinstance(v, Iterable) and len(v) %s %s:"
+                    % ("<" if rule == "minlength" else ">", self.constant(rules[rule]))
+                )
+                checks.append("    return False")
+        if "regex" in rules:
+            pattern = rules["regex"]
+            if not pattern.endswith("$"):
+                pattern += "$"
+            regex = self.constant(re.compile(pattern))
+            checks.append("if isinstance(v, str) and not %s.match(v):" % regex)
+            checks.append("    return False")
+        if "empty" in rules:
+            lines.append("if isinstance(v, Sized) and len(v) == 0:")
+            lines.append("    %s" % ("pass" if rules["empty"] else "return False"))
+            if checks:
+                lines.append("else:")
+                lines.extend("    " + line for line in checks)
+        else:
+            lines.extend(checks)
+        return lines
+
+    def _schema_lines(self, rules, types, purge_unknown):
+        schema = rules["schema"]
+        lines = []
+        # the containers of another type than dict and list are left to
+        # Cerberus since they are normalized into a value of the same type
+        if types == ("dict",):
+            function = self.compile_mapping(
+                schema, rules.get("purge_unknown", purge_unknown)
+            )
+            lines.append("if type(v) is not dict:")
+            lines.append("    return False")
+            lines.append("v = dict(v)")
+            lines.append("if not %s(v):" % function)
+            lines.append("    return False")
+        elif types == ("list",):
+            if not isinstance(schema, Mapping) or "purge_unknown" in rules:
+                raise _UnsupportedSchema()
+            if set(schema) - COMPILED_CERBERUS_RULES:
+                raise _UnsupportedSchema()
+            if "default" in schema:
+                raise _UnsupportedSchema()
+            self._counter += 1
+            function = "_item%d" % self._counter
+            item_lines = ["def %s(v):" % function]
+            item_lines.extend(
+                "    " + line for line in self.value_lines(schema, purge_unknown)
+            )
+            item_lines.append("    return True, v")
+            # the nested functions return False on error
+            source = "\n".join(item_lines).replace("return False", "return False, None")
+            self.functions.append(source)
+            lines.append("if type(v) is not list:")
+            lines.append("    return False")
+            lines.append("items = []")
+            lines.append("for item in v:")
+            lines.append("    valid, item = %s(item)" % function)
+            lines.append("    if not valid:")
+            lines.append("        return False")
+            lines.append("    items.append(item)")
+            lines.append("v = items")
+        else:
+            raise _UnsupportedSchema()
+        return lines
+
+
+def compile_cerberus_schema(schema, purge_unknown=True, types_mapping=None):
+    """Compile a Cerberus schema to a Python function.
+
+    The function takes a dict, normalizes it in place and returns whether it
+    is valid according to the schema. A False result means that the document
+    must be processed by Cerberus to get the errors or to apply the rules
+    whose behaviour on invalid values is not replicated by the function.
+
+    Only the rules into ``COMPILED_CERBERUS_RULES`` and the builtin types are
+    supported.
+
+    :param schema: the Cerberus schema (as normalized by cerberus.Validator)
+    :param purge_unknown: whether the unknown fields are removed
+    :param types_mapping: the types_mapping of the Validator class
+    :return: the function or None if the schema can't be compiled
+    """
+    if types_mapping is None:
+        types_mapping = Validator.types_mapping
+    compiler = _CerberusSchemaCompiler(types_mapping)
+    try:
+        name = compiler.compile_mapping(schema, purge_unknown)
+        namespace = compiler.namespace
+        # pylint: disable=exec-used
+        exec("\n\n".join(compiler.functions), namespace)
+    except _UnsupportedSchema:
+        return None
+    except SyntaxError:
+        _logger.exception("Failed to compile the Cerberus schema %s", schema)
+        return None
+    return namespace[name]
+
+
+class CompiledCerberusValidator(object):
+    """Cerberus validator running the function compiled from its schema.
+
+    The documents rejected by the compiled function are validated by the
+    wrapped Cerberus validator in order to get the same errors (and the same
+    result in the corner cases the function doesn't handle).
+    """
+
+    def __init__(self, validator, function):
+        self.validator = validator
+        self.function = function
+        self.document = None
+        self.errors = {}
+
+    def __getattr__(self, name):
+        if name.startswith("__") or name in ("validator", "function"):
+            raise AttributeError(name)
+        return getattr(self.validator, name)
+
+    def validate(self, document):
+        if type(document) is dict:
+            document = dict(document)
+            if self.function(document):
+                self.document = document
+                self.errors = {}
+                return True
+        # the wrapped validator is shared by the copies of this validator
+        validator = copy.copy(self.validator)
+        result = validator.validate(document)
+        self.document = validator.document
+        self.errors = validator.errors
+        return result
+
+    __call__ = validate
+
+    def normalized(self, document, *args, **kwargs):
+        # the wrapped validator is shared by the copies of this validator
+        return copy.copy(self.validator).normalized(document, *args, **kwargs)
+
+
+def compile_cerberus_validator(validator):
+    """Return a CompiledCerberusValidator for the given validator or None if
+    its schema or its configuration are not supported by the compiler"""
+    if (
+        validator.allow_unknown
+        or validator.require_all
+        or validator.ignore_none_values
+        or validator.purge_readonly
+    ):
+        return None
+    function = compile_cerberus_schema(
+        validator.schema,
+        purge_unknown=validator.purge_unknown,
+        types_mapping=validator.types_mapping,
+    )
+    if function is None:
+        return None
+    return CompiledCerberusValidator(validator, function)
+
+
+def prune_cerberus_schema(schema, fields):
+    """Return the Cerberus schema restricted to a sparse fieldset
+
+    :param schema: the Cerberus schema
+    :param fields: the sparse fieldset: a dict of field name: True (the whole
+                   field) or the sparse fieldset of the nested documents
+    """
+    result = {}
+    for name, sub_fields in fields.items():
+        rules = schema.get(name)
+        if rules is None:
+            continue
+        if isinstance(sub_fields, dict):
+            nested = rules.get("schema")
+            if rules.get("type") == "dict" and isinstance(nested, Mapping):
+                rules = dict(rules, schema=prune_cerberus_schema(nested, sub_fields))
+            elif (
+                rules.get("type") == "list"
+                and isinstance(nested, Mapping)
+                and nested.get("type") == "dict"
+                and isinstance(nested.get("schema"), Mapping)
+            ):
+                nested = dict(
+                    nested, schema=prune_cerberus_schema(nested["schema"], sub_fields)
+                )
+                rules = dict(rules, schema=nested)
+        result[name] = rules
+    return result
+
+
+def prune_document(data, fields):
+    """Return the document (or the list of documents) restricted to a sparse
+    fieldset (see prune_cerberus_schema)"""
+    if isinstance(data, list):
+        return [prune_document(item, fields) for item in data]
+    if not isinstance(data, dict):
+        return data
+    result = {}
+    for name, sub_fields in fields.items():
+        if name in data:
+            value = data[name]
+            if isinstance(sub_fields, dict):
+                value = prune_document(value, sub_fields)
+            result[name] = value
+    return result
+
+
+def sparse_fields_to_paths(fields, prefix=""):
+    """Return the dotted paths of the fields of a sparse fieldset"""
+    paths = []
+    for name, sub_fields in fields.items():
+        if isinstance(sub_fields, dict):
+            paths += sparse_fields_to_paths(sub_fields, prefix + name + ".")
+        else:
+            paths.append(prefix + name)
+    return paths
+
+
+def get_private_file_path(filename):
+    """Return the path of a file of base_rest into the data directory of odoo
+
+    The file is created if needed. The file and its directory are only
+    accessible by the user running odoo.
+    """
+    directory = os.path.join(config["data_dir"], "base_rest")
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    path = os.path.join(directory, filename)
+    os.close(os.open(path, os.O_CREAT | os.O_RDWR, 0o600))
+    return path
@@ -9,6 +9,7 @@ from odoo import _
 from odoo.exceptions import UserError
 
 from odoo.addons.base_rest import restapi
+from odoo.addons.base_rest.tools import prune_document, sparse_fields_to_paths
 
 
 class Datamodel(restapi.RestMethodParam):
@@ -41,17 +42,64 @@ class Datamodel(restapi.RestMethodParam):
 
     def to_response(self, service, result):
         ModelClass = service.env.datamodels[self._name]
+        fields = self._get_sparse_fields(service)
         if self._is_list:
             json = [i.dump() for i in result]
         else:
             json = result.dump()
-        errors = ModelClass.validate(
-            json, many=self._is_list, unknown=marshmallow.EXCLUDE
-        )
+        if fields:
+            json = prune_document(json, fields)
+            errors = self._get_sparse_schema(ModelClass, fields).validate(
+                json, many=self._is_list
+            )
+        else:
+            errors = ModelClass.validate(
+                json, many=self._is_list, unknown=marshmallow.EXCLUDE
+            )
         if errors:
             raise SystemError(_("Invalid Response %s") % errors)
         return json
 
+    def to_response_unvalidated(self, service, result):
+        fields = self._get_sparse_fields(service)
+        if self._is_list:
+            json = [i.dump() for i in result]
+        else:
+            json = result.dump()
+        if fields:
+            return prune_document(json, fields)
+        return json
+
+    def _get_sparse_schema(self, ModelClass, fields):
+        """Return the schema of the datamodel restricted to a sparse
+        fieldset"""
+        try:
+            return ModelClass.get_schema(
+                only=sparse_fields_to_paths(fields), unknown=marshmallow.EXCLUDE
+            )
+        except ValueError as e:
+            raise UserError(_("Invalid fields %s") % e) from e
+
+    def to_response_items(self, service, result):
+        if not self._is_list:
+            return super().to_response_items(service, result)
+        return self._iter_response_items(service, result)
+
+    def _iter_response_items(self, service, result):
+        ModelClass = service.env.datamodels[self._name]
+        fields = self._get_sparse_fields(service)
+        schema = self._get_sparse_schema(ModelClass, fields) if fields else None
+        for item in result:
+            json = item.dump()
+            if fields:
+                json = prune_document(json, fields)
+                errors = schema.validate(json)
+            else:
+                errors = ModelClass.validate(json, unknown=marshmallow.EXCLUDE)
+            if errors:
+                raise SystemError(_("Invalid Response %s") % errors)
+            yield json
+
     def to_openapi_query_parameters(self, service, spec):
         converter = self._get_converter()
         schema = self._get_schema(service)
@@ -75,3 +75,22 @@ class TestDataModel(common.DatamodelRegistryCase):
             schema = self.env.datamodels[datamodel_name].get_schema()
             # schema 'unknown' is back to "raise"
             self.assertEqual(schema.unknown, "raise")
+
+    def test_to_response_sparse_fields(self):
+        class Datamodel4(Datamodel):
+            _name = "datamodel4"
+
+            name = fields.String(required=True, allow_none=False)
+            ref = fields.String(required=True, allow_none=False)
+
+        Datamodel4._build_datamodel(self.datamodel_registry)
+        instance = self.env.datamodels["datamodel4"](name="Instance 4", ref="I4")
+        mock_service = mock.Mock()
+        mock_service.env = self.env
+        mock_service.work.sparse_fields = {"name": True}
+        res = restapi.Datamodel("datamodel4").to_response(mock_service, instance)
+        self.assertEqual(res, {"name": "Instance 4"})
+        res = restapi.Datamodel("datamodel4", is_list=True).to_response(
+            mock_service, [instance]
+        )
+        self.assertEqual(res, [{"name": "Instance 4"}])
@@ -6,6 +6,7 @@ from odoo import _
 from odoo.exceptions import UserError
 
 from odoo.addons.base_rest import restapi
+from odoo.addons.base_rest.tools import prune_document
 
 from pydantic import BaseModel, ValidationError
 
@@ -59,6 +60,18 @@ class PydanticModel(restapi.RestMethodParam):
             self._model_cls.model_validate_json(to_validate_jsonified)
         except ValidationError as validation_error:
             raise SystemError(_("Invalid Response")) from validation_error
+        return self._prune(service, json_dict)
+
+    def to_response_unvalidated(self, service, result):
+        return self._prune(service, result.model_dump())
+
+    def _prune(self, service, json_dict):
+        # the model is validated as a whole before being restricted to the
+        # sparse fieldset requested by the client: a model restricted to the
+        # requested fields would lose the validators of the model
+        fields = self._get_sparse_fields(service)
+        if fields:
+            return prune_document(json_dict, fields)
         return json_dict
 
     def to_openapi_query_parameters(self, servic, spec):
@@ -160,6 +173,18 @@ class PydanticModelList(PydanticModel):
             for param in params
         ]
 
+    def from_params_items(self, service, items):
+        count = 0
+        for item in items:
+            try:
+                document = self._model_cls(**item)
+            except ValidationError as ve:
+                yield None, json.loads(ve.json())
+                continue
+            count += 1
+            self._check_max_items(count, "input")
+            yield document, None
+
     def to_response(self, service, result):
         self._do_validate(result, "output")
         return [
@@ -167,24 +192,49 @@ class PydanticModelList(PydanticModel):
             for r in result
         ]
 
+    def to_response_unvalidated(self, service, result):
+        return [
+            super(PydanticModelList, self).to_response_unvalidated(
+                service=service, result=r
+            )
+            for r in result
+        ]
+
+    def to_response_items(self, service, result):
+        count = 0
+        for item in result:
+            count += 1
+            self._check_max_items(count, "output")
+            yield super(PydanticModelList, self).to_response(
+                service=service, result=item
+            )
+        self._check_min_items(count, "output")
+
     def to_openapi_query_parameters(self, service, spec):
         raise NotImplementedError("List are not (?yet?) supported as query paramters")
 
     def _do_validate(self, values, direction):
-        ExceptionClass = UserError if direction == "input" else SystemError
-        if self._min_items is not None and len(values) < self._min_items:
+        self._check_min_items(len(values), direction)
+        self._check_max_items(len(values), direction)
+
+    def _check_min_items(self, count, direction):
+        if self._min_items is not None and count < self._min_items:
+            ExceptionClass = UserError if direction == "input" else SystemError
             raise ExceptionClass(
                 _(
                     "BadRequest: Not enough items in the list (%(current)s < %(expected)s)",
-                    current=len(values),
+                    current=count,
                     expected=self._min_items,
                 )
             )
-        if self._max_items is not None and len(values) > self._max_items:
+
+    def _check_max_items(self, count, direction):
+        if self._max_items is not None and count > self._max_items:
+            ExceptionClass = UserError if direction == "input" else SystemError
             raise ExceptionClass(
                 _(
                     "BadRequest: Too many items in the list (%(current)s > %(expected)s)",
-                    current=len(values),
+                    current=count,
                     expected=self._max_items,
                 )
             )
@@ -67,3 +67,23 @@ class TestPydantic(TransactionCase):
         self.assertEqual(len(instances), 2)
         self.assertEqual(instances[0].name, params[0]["name"])
         self.assertEqual(instances[0].description, params[0]["description"])
+
+    def test_from_params_items(self):
+        restapi_pydantic = restapi.PydanticModelList(self.Model1, max_items=2)
+        mock_service = mock.Mock()
+        mock_service.env = self.env
+        items = restapi_pydantic.from_params_items(
+            mock_service,
+            iter([{"name": "Instance Name"}, {"description": "Description"}]),
+        )
+        instance, errors = next(items)
+        self.assertEqual(instance.name, "Instance Name")
+        self.assertIsNone(errors)
+        instance, errors = next(items)
+        self.assertIsNone(instance)
+        self.assertEqual(errors[0]["loc"], ["name"])
+        items = restapi_pydantic.from_params_items(
+            mock_service, iter([{"name": "Instance Name"}] * 3)
+        )
+        with self.assertRaises(UserError):
+            list(items)
@@ -48,3 +48,51 @@ class TestPydantic(TransactionCase):
         res = self._to_response_list(instances)
         self.assertEqual(len(res), 2)
         self.assertSetEqual({r["name"] for r in res}, {"Instance 1", "Instance 2"})
+
+    def test_to_response_sparse_fields(self):
+        class Country(BaseModel):
+            code: str
+            name: str
+
+        class Model1(BaseModel):
+            name: str
+            ref: str
+            country: Country
+
+        instance = Model1(
+            name="Instance 1", ref="I1", country=Country(code="BE", name="Belgium")
+        )
+        mock_service = mock.Mock()
+        mock_service.env = self.env
+        mock_service.work.sparse_fields = {"name": True, "country": {"code": True}}
+        expected = {"name": "Instance 1", "country": {"code": "BE"}}
+        restapi_pydantic = restapi.PydanticModel(Model1)
+        self.assertEqual(restapi_pydantic.to_response(mock_service, instance), expected)
+        restapi_pydantic = restapi.PydanticModelList(Model1)
+        self.assertEqual(
+            restapi_pydantic.to_response(mock_service, [instance]), [expected]
+        )
+
+    def test_to_response_items(self):
+        class Model1(BaseModel):
+            name: str
+
+        mock_service = mock.Mock()
+        mock_service.env = self.env
+        restapi_pydantic = restapi.PydanticModelList(Model1, min_items=2, max_items=2)
+        items = restapi_pydantic.to_response_items(
+            mock_service, iter([Model1(name="Instance 1"), Model1(name="Instance 2")])
+        )
+        self.assertEqual([r["name"] for r in items], ["Instance 1", "Instance 2"])
+        items = restapi_pydantic.to_response_items(
+            mock_service, iter([Model1(name="Instance")] * 3)
+        )
+        with self.assertRaisesRegex(
+            SystemError, r"Too many items in the list \(3 > 2\)"
+        ):
+            list(items)
+        items = restapi_pydantic.to_response_items(
+            mock_service, iter([Model1(name="Instance")])
+        )
+        with self.assertRaisesRegex(SystemError, r"Not enough items in the list"):
+            list(items)